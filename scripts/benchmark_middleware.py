@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+请求网关中间件开销压测：纯 ASGI 中间件 vs BaseHTTPMiddleware
+
+直接以 ASGI 调用应用（不经网络与 HTTP 客户端），请求一个空路由，比较三种布局：
+- bare：无中间件的 FastAPI 应用（下限）
+- asgi：当前 create_app()，网关为纯 ASGI 中间件
+- base_http：在网关外再套一层直通的 @app.middleware("http")，即改造前的 BaseHTTPMiddleware 开销
+
+输出单请求平均耗时（串行）以及并发下的吞吐、p50、p99。
+
+示例：
+    python scripts/benchmark_middleware.py --requests 20000 --concurrency 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+from cyberYJ.api.http_app import create_app
+
+API_KEY = "benchmark-key"
+PATH = "/v1/ping"
+
+
+async def _ping() -> Response:
+    return Response(content=b"{}", media_type="application/json")
+
+
+def _build(layout: str) -> Any:
+    if layout == "bare":
+        app = FastAPI()
+    else:
+        app = create_app(api_key=API_KEY, rate_limit_max=10**9)
+        if layout == "base_http":
+
+            @app.middleware("http")
+            async def passthrough(request, call_next):  # type: ignore[no-untyped-def]
+                return await call_next(request)
+
+    app.add_api_route(PATH, _ping, methods=["GET"])
+    return app
+
+
+async def _call(app: Any) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": PATH,
+        "raw_path": PATH.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-api-key", API_KEY.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    status: List[int] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def _run(layout: str, total: int, concurrency: int) -> Dict[str, Any]:
+    app = _build(layout)
+    for _ in range(200):  # 预热：构建中间件栈、路由匹配缓存
+        assert await _call(app) == 200
+
+    started = time.perf_counter()
+    for _ in range(total):
+        await _call(app)
+    serial_us = (time.perf_counter() - started) / total * 1e6
+
+    latencies: List[float] = []
+    remaining = [total]
+
+    async def worker() -> None:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            began = time.perf_counter()
+            await _call(app)
+            latencies.append(time.perf_counter() - began)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "layout": layout,
+        "serial_us_per_request": round(serial_us, 1),
+        "concurrency": concurrency,
+        "throughput_rps": round(total / elapsed),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--layouts", nargs="+", default=["bare", "asgi", "base_http"])
+    parser.add_argument(
+        "--with-logging",
+        action="store_true",
+        help="启用 INFO 级结构化日志（写入 NullHandler），计入日志入队开销",
+    )
+    args = parser.parse_args()
+
+    if args.with_logging:
+        logger = logging.getLogger("cyberyj-http-api")
+        logger.setLevel(logging.INFO)
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+
+    runs = [asyncio.run(_run(layout, args.requests, args.concurrency)) for layout in args.layouts]
+    print(json.dumps({"runs": runs}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+解卦响应编码开销对比：FastAPI 默认序列化 vs 编码模板缓存
+
+- fastapi_default：jsonable_encoder + JSONResponse（改造前 interpret 路由的路径）
+- learning_default：to_learning_response + jsonable_encoder + JSONResponse（改造前 learning 路由）
+- stdlib_dumps / codec_dumps：单次编码（标准库 / json_codec，已装 orjson 时走 orjson）
+- cached_render：EncodedResponseCache 命中（模板拼接时间字段）
+
+示例：
+    python scripts/benchmark_response_encoding.py --rounds 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from cyberYJ.api import json_codec
+from cyberYJ.api.divination_service import DivinationService
+from cyberYJ.api.learning_output import sanitize_text, to_learning_response
+from cyberYJ.api.response_store import EncodedResponseCache, SlotRenderer
+
+
+def _per_call_us(func, rounds: int) -> float:
+    return round(timeit.timeit(func, number=rounds) / rounds * 1e6, 2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    service = DivinationService()
+    raw = service.interpret([6, 7, 8, 9, 7, 7], None, "career")
+    interpret_cache = EncodedResponseCache(16)
+    interpret_key = interpret_cache.key([6, 7, 8, 9, 7, 7], None, "career")
+    interpret_cache.put(interpret_key, service.interpret([6, 7, 8, 9, 7, 7], None, "career"))
+    learning_cache = EncodedResponseCache(16, SlotRenderer(text_filter=sanitize_text))
+    learning_key = learning_cache.key([6, 7, 8, 9, 7, 7], None, "career")
+    learning_cache.put(learning_key, to_learning_response(service.interpret([6, 7, 8, 9, 7, 7], None, "career")))
+
+    rounds = args.rounds
+    report = {
+        "json_backend": json_codec.JSON_BACKEND,
+        "body_bytes": len(json_codec.dumps(raw)),
+        "per_call_us": {
+            "fastapi_default": _per_call_us(lambda: JSONResponse(jsonable_encoder(raw)), rounds),
+            "learning_default": _per_call_us(
+                lambda: JSONResponse(jsonable_encoder(to_learning_response(raw))), rounds
+            ),
+            "stdlib_dumps": _per_call_us(lambda: json_codec.dumps_stdlib(raw), rounds),
+            "codec_dumps": _per_call_us(lambda: json_codec.dumps(raw), rounds),
+            "cached_render": _per_call_us(lambda: interpret_cache.get(interpret_key), rounds),
+            "learning_cached_render": _per_call_us(lambda: learning_cache.get(learning_key), rounds),
+        },
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
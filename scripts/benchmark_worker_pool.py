@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+解卦接口并发压测：对比不同工作池大小下的吞吐
+
+在进程内通过 ASGI 直连调用 /v1/divination/interpret，不经网络。
+线程池受 GIL 限制，纯 Python 计算的吞吐主要随进程池（--kind process）和 CPU 核数增长。
+
+示例：
+    python scripts/benchmark_worker_pool.py --kind process --sizes 1 2 4 --requests 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import httpx
+
+from cyberYJ.api.http_app import create_app
+
+API_KEY = "benchmark-key"
+PAYLOADS = [
+    {"coins": [6, 7, 8, 9, 7, 7], "scene_type": "career"},
+    {"coins": [7, 7, 7, 8, 8, 8]},
+    {"coins": [9, 8, 7, 6, 9, 8], "question": "近期财运如何"},
+    {"coins": [8, 8, 9, 7, 7, 6], "scene_type": "love"},
+]
+
+
+async def _run(kind: str, size: int, total: int, concurrency: int) -> dict:
+    app = create_app(
+        api_key=API_KEY,
+        rate_limit_max=total * 2,
+        worker_pool_size=size,
+        worker_pool_kind=kind,
+        worker_queue_limit=concurrency,
+    )
+    transport = httpx.ASGITransport(app=app)
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(total):
+        queue.put_nowait(PAYLOADS[index % len(PAYLOADS)])
+    latencies = []
+    statuses: dict = {}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 预热：进程池需要各工作进程加载数据
+        await asyncio.gather(*(
+            client.post("/v1/divination/interpret", headers={"X-API-Key": API_KEY}, json=PAYLOADS[0])
+            for _ in range(size)
+        ))
+
+        async def worker() -> None:
+            while not queue.empty():
+                payload = queue.get_nowait()
+                started = time.perf_counter()
+                resp = await client.post(
+                    "/v1/divination/interpret", headers={"X-API-Key": API_KEY}, json=payload
+                )
+                latencies.append(time.perf_counter() - started)
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    app.state.worker_pool.shutdown()
+    latencies.sort()
+    return {
+        "kind": kind,
+        "pool_size": size,
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        "status_codes": statuses,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kind", choices=("thread", "process"), default="process")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    report = {
+        "cpu_count": os.cpu_count(),
+        "runs": [
+            asyncio.run(_run(args.kind, size, args.requests, args.concurrency))
+            for size in args.sizes
+        ],
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+用宅盘生成表核对 data/fengshui/flying_stars_house.json
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from cyberYJ.utils.data_loader import DataLoader
+
+
+def main() -> int:
+    loader = DataLoader(ROOT / "data")
+    report = {
+        "validation": loader.validate_flying_star_house_rules(),
+        "verification": loader.get_flying_star_tables().verify_house_table(),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    passed = report["validation"]["is_valid"] and report["verification"]["is_consistent"]
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+生成罗盘细分层数据 data/fengshui/luopan_rings.json
+
+- 七十二龙：每 30° 的“干维山 + 地支山”一组六龙，干维山为 [甲/乙支, 正干, 丙/丁支]，
+  地支山为 [戊/己支, 庚/辛支, 壬/癸支]，每龙 5°
+- 百二十分金：每山 5 个分金，每个 3°，干维山与其后地支山共用该地支的五个干支
+- 三百八十四爻：伏羲六十四卦圆图，正北 0° 起顺时针依次为 复…乾（东半周）、姤…坤（西半周），
+  每卦 5.625°，卦内自初爻至上爻顺时针排列，每爻 0.9375°
+
+各层均以 luopan.json 的二十四山边界为准（壬山 352.5°-7.5°）。
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from cyberYJ.utils.data_loader import DataLoader
+
+BRANCHES = "子丑寅卯辰巳午未申酉戌亥"
+YANG_STEMS = "甲丙戊庚壬"
+YIN_STEMS = "乙丁己辛癸"
+
+# 三爻自下而上（1=阳）
+TRIGRAM_LINES = {
+    "乾": (1, 1, 1), "兑": (1, 1, 0), "离": (1, 0, 1), "震": (1, 0, 0),
+    "巽": (0, 1, 1), "坎": (0, 1, 0), "艮": (0, 0, 1), "坤": (0, 0, 0),
+}
+YAO_POSITIONS = ("初", "二", "三", "四", "五", "上")
+
+
+def _deg(value: float) -> float:
+    value = round(value % 360, 4)
+    return 0.0 if value == 360 else value
+
+
+def _branch_stems(branch: str) -> str:
+    return YANG_STEMS if BRANCHES.index(branch) % 2 == 0 else YIN_STEMS
+
+
+def _mountain_pairs(luopan):
+    """按罗盘顺序两两成组：(干维山, 地支山)"""
+    return [(luopan[i], luopan[i + 1]) for i in range(0, len(luopan), 2)]
+
+
+def build_dragons(luopan):
+    segments = []
+    for stem_mountain, branch_mountain in _mountain_pairs(luopan):
+        branch = branch_mountain["name"]
+        stems = _branch_stems(branch)
+        names = (
+            [(stem_mountain, f"{stems[0]}{branch}"), (stem_mountain, f"正{stem_mountain['name']}"),
+             (stem_mountain, f"{stems[1]}{branch}")] +
+            [(branch_mountain, f"{stem}{branch}") for stem in stems[2:]]
+        )
+        for slot, (mountain, name) in enumerate(names):
+            start = mountain["start_deg"] + (slot % 3) * 5
+            segments.append({
+                "name": name,
+                "mountain": mountain["name"],
+                "start_deg": _deg(start),
+                "end_deg": _deg(start + 5),
+            })
+    return segments
+
+
+def build_fen_jin(luopan):
+    segments = []
+    for stem_mountain, branch_mountain in _mountain_pairs(luopan):
+        branch = branch_mountain["name"]
+        for mountain in (stem_mountain, branch_mountain):
+            for slot, stem in enumerate(_branch_stems(branch)):
+                start = mountain["start_deg"] + slot * 3
+                segments.append({
+                    "name": f"{stem}{branch}",
+                    "mountain": mountain["name"],
+                    "start_deg": _deg(start),
+                    "end_deg": _deg(start + 3),
+                })
+    return segments
+
+
+def _hexagram_for_value(loader, value):
+    """六爻值（初爻为最高位）→ 卦"""
+    lines = tuple((value >> (5 - i)) & 1 for i in range(6))
+    by_lines = {v: k for k, v in TRIGRAM_LINES.items()}
+    lower, upper = by_lines[lines[:3]], by_lines[lines[3:]]
+    return loader.get_hexagram_by_trigrams(upper, lower), lines
+
+
+def build_yao(loader):
+    order = list(range(32, 64)) + list(range(31, -1, -1))
+    hexagram_span = 360 / 64
+    yao_span = hexagram_span / 6
+    segments = []
+    for slot, value in enumerate(order):
+        hexagram, lines = _hexagram_for_value(loader, value)
+        for position, line in enumerate(lines):
+            start = slot * hexagram_span + position * yao_span
+            number = "九" if line else "六"
+            label = YAO_POSITIONS[position]
+            yao_name = f"{label}{number}" if position in (0, 5) else f"{number}{label}"
+            segments.append({
+                "name": f"{hexagram['name']}·{yao_name}",
+                "hexagram": hexagram["name"],
+                "hexagram_id": hexagram["id"],
+                "yao": position + 1,
+                "start_deg": _deg(start),
+                "end_deg": _deg(start + yao_span),
+            })
+    return segments
+
+
+def main() -> int:
+    loader = DataLoader(ROOT / "data")
+    luopan = loader.get_luopan()
+    rings = {
+        "version": "v1",
+        "source_ref": "convention",
+        "rings": [
+            {"id": "dragons_72", "name": "七十二龙", "segments": build_dragons(luopan)},
+            {"id": "fen_jin_120", "name": "百二十分金", "segments": build_fen_jin(luopan)},
+            {"id": "yao_384", "name": "三百八十四爻", "segments": build_yao(loader)},
+        ],
+    }
+    output = ROOT / "data" / "fengshui" / "luopan_rings.json"
+    output.write_text(json.dumps(rings, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    counts = ", ".join(f"{ring['id']}={len(ring['segments'])}" for ring in rings["rings"])
+    print(f"written: {output} ({counts})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+由 NOAA/BGS 发布的世界地磁模型系数文件（WMM.COF）生成 data/fengshui/magnetic_model.json
+
+用法：python scripts/generate_magnetic_model.py path/to/WMM.COF
+
+COF 首行为“历元 模型名 发布日期”（只取前两项），其后每行为 n m g h g_dot h_dot（nT、nT/年），
+以一行 9 结尾。模型有效期为历元起 5 年。
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MODEL_LIFETIME_YEARS = 5
+
+
+def parse_cof(text: str):
+    lines = [line.split() for line in text.splitlines() if line.strip()]
+    epoch = float(lines[0][0])
+    name = lines[0][1].replace("-", "")
+
+    coefficients = []
+    for parts in lines[1:]:
+        if parts[0].startswith("9999"):
+            break
+        n, m = int(parts[0]), int(parts[1])
+        g, h, g_dot, h_dot = (float(value) for value in parts[2:6])
+        coefficients.append([n, m, g, h, g_dot, h_dot])
+    return {
+        "model": name,
+        "epoch": epoch,
+        "valid_until": epoch + MODEL_LIFETIME_YEARS,
+        "max_degree": max(row[0] for row in coefficients),
+        "source_ref": "noaa_wmm",
+        "coefficients": coefficients,
+    }
+
+
+def main(argv) -> int:
+    if len(argv) != 2:
+        print(__doc__)
+        return 2
+    model = parse_cof(Path(argv[1]).read_text(encoding="utf-8"))
+    output = ROOT / "data" / "fengshui" / "magnetic_model.json"
+    rows = ",\n".join("    " + json.dumps(row) for row in model.pop("coefficients"))
+    header = json.dumps(model, ensure_ascii=False, indent=2)[:-2]
+    output.write_text(f'{header},\n  "coefficients": [\n{rows}\n  ]\n}}\n', encoding="utf-8")
+    print(f"written: {output} ({model['model']}, epoch {model['epoch']})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
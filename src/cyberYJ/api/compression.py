@@ -0,0 +1,191 @@
+"""
+Response compression with Accept-Encoding negotiation.
+
+Compresses complete (non-streaming) responses above a size threshold with
+brotli when the package is installed and the client accepts it, otherwise
+gzip. Routes whose responses stay equivalent over a window (the cached
+interpret responses) name that identity in ``request.state.compression_key``;
+compressed variants are kept in an LRU keyed by it, so a hot response is
+compressed once per window and then served from memory.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Collection, Dict, Hashable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cyberYJ.api.metrics import Counter
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+# 优先顺序：同等 q 值时先选 br
+ENCODINGS: Tuple[str, ...] = (("br",) if BROTLI_AVAILABLE else ()) + ("gzip",)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# 路由在 request.state 上设置的压缩变体标识（同一标识的响应体视为等价）
+COMPRESSION_KEY_STATE = "compression_key"
+
+
+def choose_encoding(accept_encoding: Optional[str], encodings: Collection[str] = ENCODINGS) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name] = quality
+
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in encodings:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0：相同输入得到相同字节
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"unsupported content encoding: {encoding}")
+
+
+class CompressedBodyCache:
+    """LRU of compressed variants keyed by (encoding, response identity)."""
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError(f"compressed body cache size must not be negative: {maxsize}")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, Hashable], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_compress(self, key: Hashable, body: bytes, encoding: str) -> bytes:
+        """Compressed variant for ``key``; ``body`` is compressed only on a miss."""
+        key = (encoding, key)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return compressed
+            self._misses += 1
+        compressed = compress(body, encoding)
+        if self.maxsize:
+            with self._lock:
+                self._entries[key] = compressed
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return compressed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+class CompressionMiddleware:
+    """Compress complete responses of compressible types; streamed bodies pass through."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        min_size: int,
+        cache: CompressedBodyCache,
+        bytes_in: Counter,
+        bytes_out: Counter,
+    ) -> None:
+        self.app = app
+        self._min_size = min_size
+        self._cache = cache
+        self._bytes_in = bytes_in
+        self._bytes_out = bytes_out
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # 等首个 body 消息确定是否为完整响应后再发响应头
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start)
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self._min_size
+                or not content_type.startswith(_COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            vary = {token.strip().lower() for token in headers.get("vary", "").split(",")}
+            if "accept-encoding" not in vary and "*" not in vary:
+                headers.add_vary_header("Accept-Encoding")
+            if encoding is not None:
+                cache_key = scope.get("state", {}).get(COMPRESSION_KEY_STATE)
+                if cache_key is not None:
+                    compressed = self._cache.get_or_compress(cache_key, body, encoding)
+                else:
+                    compressed = compress(body, encoding)
+                self._bytes_in.inc(encoding, amount=len(body))
+                self._bytes_out.inc(encoding, amount=len(compressed))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                message = {"type": "http.response.body", "body": compressed, "more_body": False}
+            passthrough = True
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+        if start is not None and not passthrough:
+            # 没有 body 消息的响应（极少见）：照常发出响应头
+            await send(start)
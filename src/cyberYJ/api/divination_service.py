@@ -2,11 +2,13 @@
 Service adapter for Wechat mini-program divination HTTP API.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
 
 from cyberYJ.api.coin_mapper import TRIGRAM_FROM_BITS, map_coins_to_divination_input
 from cyberYJ.api.consistency_guard import apply_consistency_guard
 from cyberYJ.api.scene_output import build_scene_enhancements
+from cyberYJ.api.single_flight import SingleFlight
+from cyberYJ.core.time_context import TimeContext
 from cyberYJ.server.handlers.fengshui import FengshuiHandler
 from cyberYJ.utils.data_loader import DataLoader, get_data_loader
 
@@ -33,12 +35,45 @@ class DivinationService:
     ) -> None:
         self._handler = handler or FengshuiHandler()
         self._data_loader = data_loader or get_data_loader()
+        # 并发的相同请求只计算一次；调用方会修改结果，等待方各拿一份拷贝
+        self.single_flight = SingleFlight(copy_result=True)
+
+    @staticmethod
+    def request_key(
+        coins: Sequence[int],
+        question: Optional[str],
+        scene_type: Optional[str],
+    ) -> Tuple[Hashable, ...]:
+        """Normalized request identity: the question only matters when no scene is given."""
+        return tuple(coins), (question or None) if scene_type is None else None, scene_type
 
     def interpret(
         self,
         coins: List[int],
         question: Optional[str] = None,
         scene_type: Optional[str] = None,
+        time_context: Optional[TimeContext] = None,
+        solar_term_info: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        # 指定时间上下文的调用只与同一时刻的调用合并
+        time_key = None if time_context is None else (time_context.timezone, time_context.epoch)
+        return self.single_flight.run(
+            (self.request_key(coins, question, scene_type), time_key),
+            self._interpret,
+            coins,
+            question,
+            scene_type,
+            time_context,
+            solar_term_info,
+        )
+
+    def _interpret(
+        self,
+        coins: List[int],
+        question: Optional[str],
+        scene_type: Optional[str],
+        time_context: Optional[TimeContext],
+        solar_term_info: Optional[Dict[str, Any]],
     ) -> Dict[str, Any]:
         mapped = map_coins_to_divination_input(coins)
         question_type = self.SCENE_TO_QUESTION_TYPE.get(scene_type) if scene_type else None
@@ -49,7 +84,9 @@ class DivinationService:
                 "changing_line": mapped["primary_changing_line"],
                 "question_type": question_type,
                 "question_text": question,
-            }
+            },
+            time_context=time_context,
+            solar_term_info=solar_term_info,
         )
         resolved_scene_type = (
             tool_result.get("scenario", {}).get("code")
@@ -2,74 +2,62 @@
 FastAPI app for Wechat mini-program integration.
 """
 
+import asyncio
 import json
 import logging
 import os
-import threading
-import time
-import uuid
-from typing import Dict, Optional, Tuple
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, AsyncIterator, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from starlette.routing import Match
 
+from cyberYJ.api.compression import COMPRESSION_KEY_STATE, CompressedBodyCache, CompressionMiddleware
 from cyberYJ.api.divination_service import DivinationService
-from cyberYJ.api.learning_output import to_learning_response
-from cyberYJ.api.models import DivinationRequest
-
-
-class FixedWindowRateLimiter:
-    """Simple in-memory fixed-window limiter keyed by client id."""
-
-    def __init__(self, max_requests: int, window_seconds: int) -> None:
-        self._max_requests = max_requests
-        self._window_seconds = window_seconds
-        self._buckets: Dict[str, Tuple[int, float]] = {}
-        self._lock = threading.Lock()
-
-    def allow(self, client_id: str) -> Tuple[bool, int, int]:
-        now = time.time()
-        with self._lock:
-            count, window_start = self._buckets.get(client_id, (0, now))
-            elapsed = now - window_start
-            if elapsed >= self._window_seconds:
-                count = 0
-                window_start = now
-                elapsed = 0
-
-            if count >= self._max_requests:
-                reset_in = max(1, int(self._window_seconds - elapsed))
-                return False, 0, reset_in
-
-            count += 1
-            self._buckets[client_id] = (count, window_start)
-            remaining = max(0, self._max_requests - count)
-            reset_in = max(1, int(self._window_seconds - elapsed))
-            return True, remaining, reset_in
-
-
-class ErrorTracker:
-    """In-memory error tracker for quick observability."""
-
-    def __init__(self) -> None:
-        self._counts: Dict[str, int] = {}
-        self._lock = threading.Lock()
-
-    def record(self, code: str) -> None:
-        with self._lock:
-            self._counts[code] = self._counts.get(code, 0) + 1
-
-    def snapshot(self) -> Dict[str, int]:
-        with self._lock:
-            return dict(self._counts)
+from cyberYJ.api.json_codec import dumps
+from cyberYJ.api.learning_output import sanitize_text, to_learning_response
+from cyberYJ.api.log_pipeline import StructuredLogPipeline
+from cyberYJ.api.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry
+from cyberYJ.api.middleware import (
+    ErrorTracker,
+    RequestGatewayMiddleware,
+    error_response,
+    resolve_request_id,
+)
+from cyberYJ.api.models import (
+    DivinationBatchRequest,
+    DivinationRequest,
+    LuopanBatchItem,
+    LuopanBatchRequest,
+)
+from cyberYJ.api.rate_limit import create_rate_limiter
+from cyberYJ.api.response_store import (
+    EncodedResponseCache,
+    InterpretResponseStore,
+    SlotRenderer,
+    resource_etag,
+)
+from cyberYJ.api.single_flight import SingleFlight
+from cyberYJ.api.worker_pool import (
+    BlockingWorkerPool,
+    WorkerPoolBusy,
+    default_pool_size,
+    interpret_in_process,
+)
+from cyberYJ.core.almanac import AlmanacGenerator
+from cyberYJ.core.orientation_optimizer import OrientationOptimizer
+from cyberYJ.core.time_context import DEFAULT_TIMEZONE, TimeContext
+from cyberYJ.server.handlers.compass import CompassHandler
+from cyberYJ.server.validation import get_timezone
+from cyberYJ.utils.data_loader import get_data_loader
 
 
 def _resolve_request_id(request: Request) -> str:
-    request_id = (request.headers.get("X-Request-ID") or "").strip()
-    if request_id:
-        return request_id[:128]
-    return uuid.uuid4().hex
+    return resolve_request_id(request.headers.get("X-Request-ID"))
 
 
 def _get_request_id(request: Request) -> str:
@@ -79,28 +67,44 @@ def _get_request_id(request: Request) -> str:
     return _resolve_request_id(request)
 
 
-def _log_structured(logger: logging.Logger, level: int, event: str, **kwargs: object) -> None:
-    payload = {"event": event, "timestamp_ms": int(time.time() * 1000)}
-    payload.update(kwargs)
-    logger.log(level, json.dumps(payload, ensure_ascii=False))
+class FeatureUnavailable(RuntimeError):
+    """An endpoint whose optional dependency is not installed."""
 
 
-def _error_response(
-    status_code: int,
-    code: str,
-    message: str,
-    request_id: Optional[str] = None,
-) -> JSONResponse:
-    error = {"code": code, "message": message}
-    if request_id:
-        error["request_id"] = request_id
-    return JSONResponse(
-        status_code=status_code,
-        content={"error": error},
-    )
+def _ndjson_lines(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    for record in records:
+        yield (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _luopan_batch_lines(
+    records: Iterable[Dict[str, Any]],
+    invalid: Dict[int, str],
+) -> Iterator[Dict[str, Any]]:
+    for record in records:
+        message = invalid.get(record["index"], record.get("error"))
+        if message is not None:
+            yield {
+                "index": record["index"],
+                "error": {"code": "INVALID_INPUT", "message": message},
+            }
+        else:
+            yield {"index": record["index"], "data": record["result"]}
+
 
+def _batch_item_error(outcome: Union[str, BaseException]) -> Tuple[str, str]:
+    """Map a failed batch item to (error code, message) as the single-item routes would."""
+    if isinstance(outcome, str):
+        return "INVALID_INPUT", outcome
+    if not isinstance(outcome, Exception):
+        raise outcome
+    if isinstance(outcome, WorkerPoolBusy):
+        return "SERVER_BUSY", str(outcome)
+    if isinstance(outcome, ValueError):
+        return "INVALID_INPUT", str(outcome)
+    return "INTERNAL_ERROR", str(outcome)
 
-def _validation_message(exc: RequestValidationError) -> str:
+
+def _validation_message(exc: Union[RequestValidationError, ValidationError]) -> str:
     errors = exc.errors()
     if not errors:
         return "请求参数校验失败"
@@ -123,16 +127,259 @@ def _validation_message(exc: RequestValidationError) -> str:
     return "请求参数校验失败"
 
 
+def _route_label(app: FastAPI, scope: Dict[str, Any]) -> str:
+    # 用路由模板做标签，避免路径参数撑大基数；鉴权/限流拒绝的请求未经过路由，这里补做匹配
+    route = scope.get("route")
+    if route is None:
+        for candidate in app.router.routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "unmatched")
+
+
+def _resource_request(coin_code: str, scene: str) -> DivinationRequest:
+    # 路径形式：6 位爻值（初爻 -> 上爻）+ 场景，general 表示不指定场景
+    if len(coin_code) != 6 or not coin_code.isdigit():
+        raise ValueError("coin_code 必须为 6 位爻值 (6/7/8/9)")
+    try:
+        return DivinationRequest(
+            coins=[int(value) for value in coin_code],
+            scene_type=None if scene == "general" else scene,
+        )
+    except ValidationError as exc:
+        raise ValueError(_validation_message(exc)) from None
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match 使用弱比较
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _build_metrics(
+    error_tracker: ErrorTracker,
+    worker_pool: BlockingWorkerPool,
+    log_pipeline: StructuredLogPipeline,
+    response_caches: Dict[str, EncodedResponseCache],
+    response_store: Optional[InterpretResponseStore],
+    single_flight: SingleFlight,
+    compressed_cache: CompressedBodyCache,
+) -> MetricsRegistry:
+    """Registry with collectors for state the other components already track."""
+    metrics = MetricsRegistry()
+
+    def cache_stats() -> Dict[str, Dict[str, Any]]:
+        stats = {name: cache.stats() for name, cache in response_caches.items()}
+        if response_store is not None:
+            stats["precomputed"] = response_store.stats()
+        return stats
+
+    def hit_ratio(stats: Dict[str, Any]) -> float:
+        total = stats["hits"] + stats["misses"]
+        return stats["hits"] / total if total else 0.0
+
+    metrics.collector(
+        "cyberyj_errors_total",
+        "Error responses by error code.",
+        "counter",
+        lambda: [((code,), count) for code, count in error_tracker.snapshot().items()],
+        ("code",),
+    )
+    metrics.collector(
+        "cyberyj_response_cache_hits_total",
+        "Response cache hits.",
+        "counter",
+        lambda: [((name,), stats["hits"]) for name, stats in cache_stats().items()],
+        ("cache",),
+    )
+    metrics.collector(
+        "cyberyj_response_cache_misses_total",
+        "Response cache misses.",
+        "counter",
+        lambda: [((name,), stats["misses"]) for name, stats in cache_stats().items()],
+        ("cache",),
+    )
+    metrics.collector(
+        "cyberyj_response_cache_hit_ratio",
+        "Response cache hits / lookups since start.",
+        "gauge",
+        lambda: [((name,), hit_ratio(stats)) for name, stats in cache_stats().items()],
+        ("cache",),
+    )
+    metrics.collector(
+        "cyberyj_interpret_coalesced_total",
+        "Interpret calls served by an identical in-flight computation instead of their own.",
+        "counter",
+        lambda: [((), single_flight.stats()["coalesced"])],
+    )
+    metrics.collector(
+        "cyberyj_worker_pool_in_flight",
+        "Interpret calls running or queued on the worker pool.",
+        "gauge",
+        lambda: [((), worker_pool.stats()["in_flight"])],
+    )
+    metrics.collector(
+        "cyberyj_worker_pool_rejected_total",
+        "Interpret calls rejected because the worker pool was full.",
+        "counter",
+        lambda: [((), worker_pool.stats()["rejected"])],
+    )
+    metrics.collector(
+        "cyberyj_log_queue_depth",
+        "Structured log records waiting to be written.",
+        "gauge",
+        lambda: [((), log_pipeline.stats()["queued"])],
+    )
+    metrics.collector(
+        "cyberyj_log_records_dropped_total",
+        "Structured log records dropped because the queue was full.",
+        "counter",
+        lambda: [((), log_pipeline.stats()["dropped"])],
+    )
+    metrics.collector(
+        "cyberyj_compression_cache_hits_total",
+        "Compressed response bodies served from the compressed variant cache.",
+        "counter",
+        lambda: [((), compressed_cache.stats()["hits"])],
+    )
+    metrics.collector(
+        "cyberyj_compression_cache_misses_total",
+        "Compressed variant cache lookups that had to compress the body.",
+        "counter",
+        lambda: [((), compressed_cache.stats()["misses"])],
+    )
+    return metrics
+
+
 def create_app(
     api_key: Optional[str] = None,
     rate_limit_max: Optional[int] = None,
     rate_limit_window_seconds: Optional[int] = None,
+    rate_limit_max_clients: Optional[int] = None,
+    rate_limit_backend: Optional[str] = None,
+    almanac_max_days: Optional[int] = None,
+    luopan_batch_max_items: Optional[int] = None,
+    divination_batch_max_items: Optional[int] = None,
+    worker_pool_size: Optional[int] = None,
+    worker_pool_kind: Optional[str] = None,
+    worker_queue_limit: Optional[int] = None,
+    precompute_responses: Optional[bool] = None,
+    log_received_sample_rate: Optional[float] = None,
+    response_cache_size: Optional[int] = None,
+    compression_min_size: Optional[int] = None,
+    compression_cache_size: Optional[int] = None,
 ) -> FastAPI:
-    app = FastAPI(title="CyberYJ Wechat API", version="1.0.0")
+    # 解卦含 ephem 计算，放到有界工作池执行，避免阻塞事件循环
+    worker_pool = BlockingWorkerPool(
+        max_workers=(
+            worker_pool_size
+            if worker_pool_size is not None
+            else int(os.getenv("CYBERYJ_WORKER_POOL_SIZE", str(default_pool_size())))
+        ),
+        max_queue=(
+            worker_queue_limit
+            if worker_queue_limit is not None
+            else int(os.getenv("CYBERYJ_WORKER_QUEUE_LIMIT", "64"))
+        ),
+        kind=worker_pool_kind or os.getenv("CYBERYJ_WORKER_POOL_KIND", "thread"),
+    )
+
     service = DivinationService()
-    logger = logging.getLogger("cyberyj-http-api")
+    if precompute_responses is None:
+        precompute_responses = os.getenv("CYBERYJ_PRECOMPUTE_RESPONSES", "0").lower() in ("1", "true", "yes")
+    # 响应体按模板编码缓存，只有时间相关的三个字段按秒重新渲染
+    slot_renderer = SlotRenderer()
+    effective_response_cache_size = (
+        response_cache_size
+        if response_cache_size is not None
+        else int(os.getenv("CYBERYJ_RESPONSE_CACHE_SIZE", "4096"))
+    )
+    interpret_cache = EncodedResponseCache(effective_response_cache_size, slot_renderer)
+    learning_cache = EncodedResponseCache(
+        effective_response_cache_size,
+        SlotRenderer(solar_calculator=slot_renderer.solar_calculator, text_filter=sanitize_text),
+    )
+    # 预计算当前节气下全部 coins × scene 的响应字节，启动后在后台构建，交节时自动重建
+    response_store = (
+        InterpretResponseStore(service, slot_renderer=slot_renderer) if precompute_responses else None
+    )
+
+    # 结构化日志入队后由后台线程批量编码写出，不占用事件循环
+    log_pipeline = StructuredLogPipeline(
+        logging.getLogger("cyberyj-http-api"),
+        max_queue=int(os.getenv("CYBERYJ_LOG_QUEUE_SIZE", "10000")),
+        batch_size=int(os.getenv("CYBERYJ_LOG_BATCH_SIZE", "256")),
+        received_sample_rate=(
+            log_received_sample_rate
+            if log_received_sample_rate is not None
+            else float(os.getenv("CYBERYJ_LOG_RECEIVED_SAMPLE_RATE", "1.0"))
+        ),
+    )
+
+    # 可缓存路由的压缩结果按响应等价标识缓存，热点响应在有效期内只压缩一次
+    compressed_cache = CompressedBodyCache(
+        compression_cache_size
+        if compression_cache_size is not None
+        else int(os.getenv("CYBERYJ_COMPRESSION_CACHE_SIZE", "1024"))
+    )
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        if response_store is not None:
+            response_store.refresh_in_background()
+        yield
+        worker_pool.shutdown()
+        log_pipeline.close()
+
+    app = FastAPI(title="CyberYJ Wechat API", version="1.0.0", lifespan=lifespan)
+    app.state.worker_pool = worker_pool
+    app.state.log_pipeline = log_pipeline
+    app.state.response_store = response_store
+    app.state.response_caches = {"interpret": interpret_cache, "learning": learning_cache}
+    interpret_call = interpret_in_process if worker_pool.kind == "process" else service.interpret
     error_tracker = ErrorTracker()
     app.state.error_tracker = error_tracker
+    metrics = _build_metrics(
+        error_tracker,
+        worker_pool,
+        log_pipeline,
+        {"interpret": interpret_cache, "learning": learning_cache},
+        response_store,
+        service.single_flight,
+        compressed_cache,
+    )
+    app.state.metrics = metrics
+    app.state.compressed_cache = compressed_cache
+    requests_total = metrics.counter(
+        "cyberyj_http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status")
+    )
+    request_duration = metrics.histogram(
+        "cyberyj_http_request_duration_seconds",
+        "Time until response headers, by route.",
+        ("route",),
+    )
+    requests_in_flight = metrics.gauge("cyberyj_http_requests_in_flight", "HTTP requests being handled.")
+    rate_limit_rejections = metrics.counter(
+        "cyberyj_rate_limit_rejections_total", "Requests rejected by the rate limiter."
+    )
+    compression_bytes_in = metrics.counter(
+        "cyberyj_compression_bytes_in_total", "Response bytes before compression, by encoding.", ("encoding",)
+    )
+    compression_bytes_out = metrics.counter(
+        "cyberyj_compression_bytes_out_total", "Response bytes after compression, by encoding.", ("encoding",)
+    )
     expected_api_key = (
         api_key if api_key is not None else os.getenv("CYBERYJ_API_KEY", "cyberyj-dev-key")
     )
@@ -146,121 +393,87 @@ def create_app(
         if rate_limit_window_seconds is not None
         else int(os.getenv("CYBERYJ_RATE_LIMIT_WINDOW_SECONDS", "60"))
     )
-    rate_limiter = FixedWindowRateLimiter(
+    effective_almanac_max_days = (
+        almanac_max_days
+        if almanac_max_days is not None
+        else int(os.getenv("CYBERYJ_ALMANAC_MAX_DAYS", "36525"))
+    )
+    effective_luopan_batch_max_items = (
+        luopan_batch_max_items
+        if luopan_batch_max_items is not None
+        else int(os.getenv("CYBERYJ_LUOPAN_BATCH_MAX_ITEMS", str(CompassHandler.MAX_BATCH_ITEMS)))
+    )
+    effective_divination_batch_max_items = (
+        divination_batch_max_items
+        if divination_batch_max_items is not None
+        else int(os.getenv("CYBERYJ_DIVINATION_BATCH_MAX_ITEMS", "50"))
+    )
+    # 多 worker 部署时用 shared（本机共享内存）或 redis，使限额在进程间共享
+    rate_limiter = create_rate_limiter(
+        rate_limit_backend or os.getenv("CYBERYJ_RATE_LIMIT_BACKEND", "memory"),
         max_requests=max(1, effective_rate_limit_max),
         window_seconds=max(1, effective_rate_limit_window_seconds),
+        max_clients=max(
+            1,
+            rate_limit_max_clients
+            if rate_limit_max_clients is not None
+            else int(os.getenv("CYBERYJ_RATE_LIMIT_MAX_CLIENTS", "100000")),
+        ),
+        shared_path=os.getenv("CYBERYJ_RATE_LIMIT_SHARED_PATH"),
+        redis_url=os.getenv("CYBERYJ_REDIS_URL"),
+    )
+    optimizer_holder: Dict[str, OrientationOptimizer] = {}
+
+    def get_orientation_optimizer() -> OrientationOptimizer:
+        # 首次请求时构建（需要 NumPy），之后只读复用
+        if "optimizer" not in optimizer_holder:
+            try:
+                optimizer_holder["optimizer"] = OrientationOptimizer()
+            except ImportError as exc:
+                raise FeatureUnavailable(
+                    '最佳坐向搜索需要 NumPy，请安装: pip install -e ".[numpy]"'
+                ) from exc
+        return optimizer_holder["optimizer"]
+
+    compass_holder: Dict[str, CompassHandler] = {}
+
+    def get_compass_handler() -> CompassHandler:
+        if "handler" not in compass_holder:
+            compass_holder["handler"] = CompassHandler()
+        return compass_holder["handler"]
+
+    # 先注册的在内层：网关在最外层，看到的是压缩后的响应头
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=(
+            compression_min_size
+            if compression_min_size is not None
+            else int(os.getenv("CYBERYJ_COMPRESSION_MIN_SIZE", "1024"))
+        ),
+        cache=compressed_cache,
+        bytes_in=compression_bytes_in,
+        bytes_out=compression_bytes_out,
+    )
+    app.add_middleware(
+        RequestGatewayMiddleware,
+        api_key=expected_api_key,
+        rate_limiter=rate_limiter,
+        rate_limit_max=effective_rate_limit_max,
+        error_tracker=error_tracker,
+        log_pipeline=log_pipeline,
+        route_label=lambda scope: _route_label(app, scope),
+        requests_total=requests_total,
+        request_duration=request_duration,
+        requests_in_flight=requests_in_flight,
+        rate_limit_rejections=rate_limit_rejections,
     )
-
-    @app.middleware("http")
-    async def auth_and_rate_limit(request: Request, call_next):  # type: ignore[no-untyped-def]
-        request_id = _resolve_request_id(request)
-        request.state.request_id = request_id
-        request_started_at = time.perf_counter()
-        client_host = request.client.host if request.client else "unknown"
-
-        _log_structured(
-            logger,
-            logging.INFO,
-            "request.received",
-            request_id=request_id,
-            method=request.method,
-            path=request.url.path,
-            client_ip=client_host,
-        )
-
-        if request.url.path.startswith("/v1/"):
-            provided_api_key = request.headers.get("X-API-Key")
-            if expected_api_key and provided_api_key != expected_api_key:
-                error_tracker.record("UNAUTHORIZED")
-                response = _error_response(
-                    status_code=401,
-                    code="UNAUTHORIZED",
-                    message="missing or invalid X-API-Key",
-                    request_id=request_id,
-                )
-                response.headers["X-Request-ID"] = request_id
-                _log_structured(
-                    logger,
-                    logging.WARNING,
-                    "request.rejected",
-                    request_id=request_id,
-                    method=request.method,
-                    path=request.url.path,
-                    status_code=401,
-                    error_code="UNAUTHORIZED",
-                    client_ip=client_host,
-                )
-                return response
-
-            client_id = f"{provided_api_key or 'no-key'}:{client_host}"
-            allowed, remaining, reset_in = rate_limiter.allow(client_id)
-            if not allowed:
-                error_tracker.record("RATE_LIMITED")
-                response = _error_response(
-                    status_code=429,
-                    code="RATE_LIMITED",
-                    message=f"rate limit exceeded, retry in {reset_in}s",
-                    request_id=request_id,
-                )
-                response.headers["Retry-After"] = str(reset_in)
-                response.headers["X-RateLimit-Limit"] = str(effective_rate_limit_max)
-                response.headers["X-RateLimit-Remaining"] = "0"
-                response.headers["X-Request-ID"] = request_id
-                _log_structured(
-                    logger,
-                    logging.WARNING,
-                    "request.rejected",
-                    request_id=request_id,
-                    method=request.method,
-                    path=request.url.path,
-                    status_code=429,
-                    error_code="RATE_LIMITED",
-                    client_ip=client_host,
-                )
-                return response
-
-            response = await call_next(request)
-            response.headers["X-RateLimit-Limit"] = str(effective_rate_limit_max)
-            response.headers["X-RateLimit-Remaining"] = str(remaining)
-            response.headers["X-RateLimit-Reset"] = str(reset_in)
-            response.headers["X-Request-ID"] = request_id
-            duration_ms = int((time.perf_counter() - request_started_at) * 1000)
-            _log_structured(
-                logger,
-                logging.INFO,
-                "request.completed",
-                request_id=request_id,
-                method=request.method,
-                path=request.url.path,
-                status_code=response.status_code,
-                duration_ms=duration_ms,
-                client_ip=client_host,
-            )
-            return response
-
-        response = await call_next(request)
-        response.headers["X-Request-ID"] = request_id
-        duration_ms = int((time.perf_counter() - request_started_at) * 1000)
-        _log_structured(
-            logger,
-            logging.INFO,
-            "request.completed",
-            request_id=request_id,
-            method=request.method,
-            path=request.url.path,
-            status_code=response.status_code,
-            duration_ms=duration_ms,
-            client_ip=client_host,
-        )
-        return response
 
     @app.exception_handler(RequestValidationError)
     async def handle_validation_error(request: Request, exc: RequestValidationError) -> JSONResponse:
         request_id = _get_request_id(request)
         error_tracker.record("INVALID_INPUT")
         message = _validation_message(exc)
-        _log_structured(
-            logger,
+        log_pipeline.log(
             logging.WARNING,
             "request.error",
             request_id=request_id,
@@ -269,7 +482,7 @@ def create_app(
             status_code=400,
             error_code="INVALID_INPUT",
         )
-        response = _error_response(
+        response = error_response(
             status_code=400,
             code="INVALID_INPUT",
             message=message,
@@ -282,8 +495,7 @@ def create_app(
     async def handle_value_error(request: Request, exc: ValueError) -> JSONResponse:
         request_id = _get_request_id(request)
         error_tracker.record("INVALID_INPUT")
-        _log_structured(
-            logger,
+        log_pipeline.log(
             logging.WARNING,
             "request.error",
             request_id=request_id,
@@ -293,7 +505,7 @@ def create_app(
             error_code="INVALID_INPUT",
             detail=str(exc),
         )
-        response = _error_response(
+        response = error_response(
             status_code=400,
             code="INVALID_INPUT",
             message=str(exc),
@@ -302,12 +514,58 @@ def create_app(
         response.headers["X-Request-ID"] = request_id
         return response
 
+    @app.exception_handler(WorkerPoolBusy)
+    async def handle_worker_pool_busy(request: Request, exc: WorkerPoolBusy) -> JSONResponse:
+        request_id = _get_request_id(request)
+        error_tracker.record("SERVER_BUSY")
+        log_pipeline.log(
+            logging.WARNING,
+            "request.rejected",
+            request_id=request_id,
+            method=request.method,
+            path=request.url.path,
+            status_code=503,
+            error_code="SERVER_BUSY",
+            detail=str(exc),
+        )
+        response = error_response(
+            status_code=503,
+            code="SERVER_BUSY",
+            message=str(exc),
+            request_id=request_id,
+        )
+        response.headers["Retry-After"] = "1"
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+    @app.exception_handler(FeatureUnavailable)
+    async def handle_feature_unavailable(request: Request, exc: FeatureUnavailable) -> JSONResponse:
+        request_id = _get_request_id(request)
+        error_tracker.record("FEATURE_UNAVAILABLE")
+        log_pipeline.log(
+            logging.WARNING,
+            "request.error",
+            request_id=request_id,
+            method=request.method,
+            path=request.url.path,
+            status_code=501,
+            error_code="FEATURE_UNAVAILABLE",
+            detail=str(exc),
+        )
+        response = error_response(
+            status_code=501,
+            code="FEATURE_UNAVAILABLE",
+            message=str(exc),
+            request_id=request_id,
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
     @app.exception_handler(Exception)
     async def handle_unexpected_error(request: Request, exc: Exception) -> JSONResponse:
         request_id = _get_request_id(request)
         error_tracker.record("INTERNAL_ERROR")
-        _log_structured(
-            logger,
+        log_pipeline.log(
             logging.ERROR,
             "request.error",
             request_id=request_id,
@@ -318,7 +576,7 @@ def create_app(
             exception_type=type(exc).__name__,
             detail=str(exc),
         )
-        response = _error_response(
+        response = error_response(
             status_code=500,
             code="INTERNAL_ERROR",
             message=str(exc),
@@ -327,13 +585,201 @@ def create_app(
         response.headers["X-Request-ID"] = request_id
         return response
 
+    @app.get("/metrics")
+    async def metrics_endpoint() -> PlainTextResponse:
+        return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+    def interpret_etag(key: Hashable) -> str:
+        term, slots = slot_renderer.render()
+        return resource_etag(get_data_loader().snapshot_hash(), key, term, slots)
+
+    def mark_compression_key(request: Request, route: str, etag: str) -> None:
+        # 与资源 ETag 同一等价标识：节气或其倒计天数变化前压缩结果可复用（trace 行取首次压缩时的值）
+        setattr(request.state, COMPRESSION_KEY_STATE, (route, etag))
+
+    def lookup_interpret(req: DivinationRequest, key: Hashable) -> Optional[bytes]:
+        body = None
+        if response_store is not None:
+            body = response_store.lookup(req.coins, req.question, req.scene_type)
+        if body is None:
+            body = interpret_cache.get(key)
+        return body
+
+    async def encode_interpret(req: DivinationRequest, key: Hashable) -> bytes:
+        raw = await worker_pool.run(interpret_call, req.coins, req.question, req.scene_type)
+        return interpret_cache.put(key, raw)
+
     @app.post("/v1/divination/interpret")
-    async def interpret(req: DivinationRequest) -> dict:
-        return service.interpret(req.coins, req.question, req.scene_type)
+    async def interpret(req: DivinationRequest, request: Request) -> Response:
+        key = interpret_cache.key(req.coins, req.question, req.scene_type)
+        mark_compression_key(request, "interpret", interpret_etag(key))
+        body = lookup_interpret(req, key)
+        if body is None:
+            # 并发的相同请求共用一次计算与编码，等待方不占工作池执行位
+            body = await service.single_flight.run_async(("interpret", key), encode_interpret, req, key)
+        return Response(content=body, media_type="application/json")
+
+    @app.get("/v1/divination/{coin_code}/{scene}")
+    async def interpret_resource(coin_code: str, scene: str, request: Request) -> Response:
+        req = _resource_request(coin_code, scene)
+        key = interpret_cache.key(req.coins, None, req.scene_type)
+        # 节气或其倒计天数变化前响应保持等价（trace 行除外），CDN/反向代理可据此缓存与再验证
+        headers = {
+            "ETag": interpret_etag(key),
+            "Cache-Control": f"public, max-age={slot_renderer.valid_for()}",
+            # 304 须与 200 带相同的 Vary（压缩中间件不会重复追加）
+            "Vary": "Accept-Encoding",
+        }
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        mark_compression_key(request, "interpret", headers["ETag"])
+        body = lookup_interpret(req, key)
+        if body is None:
+            body = await service.single_flight.run_async(("interpret", key), encode_interpret, req, key)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.post("/v1/divination/batch")
+    async def divination_batch(req: DivinationBatchRequest, request: Request) -> Response:
+        if len(req.items) > effective_divination_batch_max_items:
+            raise ValueError(f"批量条目数不能超过 {effective_divination_batch_max_items}")
+        request_id = _get_request_id(request)
+
+        # 条目逐个校验；相同 (coins, scene) 的条目只计算一次
+        keys: List[Optional[Hashable]] = []
+        invalid: Dict[int, str] = {}
+        unique: Dict[Hashable, DivinationRequest] = {}
+        for index, raw_item in enumerate(req.items):
+            try:
+                item = DivinationRequest.model_validate(raw_item)
+            except ValidationError as exc:
+                invalid[index] = _validation_message(exc)
+                keys.append(None)
+                continue
+            key = interpret_cache.key(item.coins, item.question, item.scene_type)
+            keys.append(key)
+            unique.setdefault(key, item)
+
+        # 整批共用一个时间上下文与节气信息
+        time_context = TimeContext.now(DEFAULT_TIMEZONE)
+        solar_term_info = slot_renderer.solar_calculator.get_current_solar_term(time_context=time_context)
+        # 单个批次最多占用 max_workers 个执行位，其余条目在批次内排队，不挤占其他请求的队列
+        slots = asyncio.Semaphore(worker_pool.max_workers)
+
+        async def encode_item(item: DivinationRequest, key: Hashable) -> bytes:
+            async with slots:
+                raw = await worker_pool.run(
+                    interpret_call,
+                    item.coins,
+                    item.question,
+                    item.scene_type,
+                    time_context,
+                    solar_term_info,
+                )
+            return interpret_cache.put(key, raw)
+
+        async def compute(key: Hashable, item: DivinationRequest) -> bytes:
+            body = lookup_interpret(item, key)
+            if body is not None:
+                return body
+            return await service.single_flight.run_async(("interpret", key), encode_item, item, key)
+
+        outcomes = await asyncio.gather(
+            *(compute(key, item) for key, item in unique.items()), return_exceptions=True
+        )
+        results = dict(zip(unique, outcomes))
+
+        lines: List[bytes] = []
+        for index, key in enumerate(keys):
+            outcome: Any = invalid[index] if key is None else results[key]
+            if isinstance(outcome, bytes):
+                lines.append(b'{"index":%d,"data":%s}' % (index, outcome))
+                continue
+            code, message = _batch_item_error(outcome)
+            error_tracker.record(code)
+            log_pipeline.log(
+                logging.WARNING if code != "INTERNAL_ERROR" else logging.ERROR,
+                "request.item_error",
+                request_id=request_id,
+                path=request.url.path,
+                index=index,
+                error_code=code,
+                detail=message,
+            )
+            lines.append(dumps({"index": index, "error": {"code": code, "message": message}}))
+        return Response(content=b'{"results":[' + b",".join(lines) + b"]}", media_type="application/json")
+
+    async def encode_learning(req: DivinationRequest, key: Hashable) -> bytes:
+        raw = await worker_pool.run(interpret_call, req.coins, req.question, req.scene_type)
+        return learning_cache.put(key, to_learning_response(raw, in_place=True))
 
     @app.post("/v1/learning/interpret")
-    async def learning_interpret(req: DivinationRequest) -> dict:
-        raw = service.interpret(req.coins, req.question, req.scene_type)
-        return to_learning_response(raw)
+    async def learning_interpret(req: DivinationRequest, request: Request) -> Response:
+        key = learning_cache.key(req.coins, req.question, req.scene_type)
+        mark_compression_key(request, "learning", interpret_etag(key))
+        body = learning_cache.get(key)
+        if body is None:
+            body = await service.single_flight.run_async(("learning", key), encode_learning, req, key)
+        return Response(content=body, media_type="application/json")
+
+    @app.get("/v1/almanac")
+    async def almanac(start: date, end: date, timezone: Optional[str] = None) -> StreamingResponse:
+        tz_name = get_timezone(timezone)
+        if start > end:
+            raise ValueError("start 不能晚于 end")
+        # 流式响应开始后无法再返回错误，年份范围须在此之前校验
+        AlmanacGenerator.check_range(start, end)
+        span_days = (end - start).days + 1
+        if span_days > effective_almanac_max_days:
+            raise ValueError(f"日期跨度不能超过 {effective_almanac_max_days} 天")
+
+        # 每个请求独立的生成器：节气表缓存不跨线程共享，内存随跨度保持常量
+        generator = AlmanacGenerator(timezone=tz_name)
+        return StreamingResponse(
+            _ndjson_lines(generator.iter_days(start, end)),
+            media_type="application/x-ndjson",
+        )
+
+    @app.get("/v1/orientation/best")
+    def best_orientation(
+        year: int,
+        building_type: str = "住宅",
+        owner_birth: Optional[date] = None,
+        gender: str = "male",
+        resolution: float = 1.0,
+        top_n: Optional[int] = None,
+    ) -> dict:
+        if top_n is not None and top_n < 1:
+            raise ValueError("top_n 必须为正整数")
+        return get_orientation_optimizer().optimize(
+            year,
+            building_type=building_type,
+            owner_birth=owner_birth,
+            gender=gender,
+            resolution=resolution,
+            top_n=top_n,
+        )
+
+    @app.post("/v1/luopan/batch")
+    def luopan_batch(req: LuopanBatchRequest) -> StreamingResponse:
+        # 条目逐个校验：模型校验失败的条目以该条的错误行返回，不影响整批
+        items: List[Dict[str, Any]] = []
+        invalid: Dict[int, str] = {}
+        for index, raw_item in enumerate(req.items):
+            try:
+                items.append(LuopanBatchItem.model_validate(raw_item).model_dump(exclude_none=True))
+            except ValidationError as exc:
+                invalid[index] = _validation_message(exc)
+                items.append(raw_item)
+        arguments = req.model_dump(exclude_none=True)
+        arguments["items"] = items
+        # 批次级参数在开始输出前校验（400），条目级错误逐行返回
+        records = get_compass_handler().execute_batch(
+            arguments,
+            max_items=effective_luopan_batch_max_items,
+        )
+        return StreamingResponse(
+            _ndjson_lines(_luopan_batch_lines(records, invalid)),
+            media_type="application/x-ndjson",
+        )
 
     return app
@@ -0,0 +1,35 @@
+"""
+JSON body encoding for HTTP responses.
+
+Uses orjson when it is installed and falls back to the standard library.
+Both produce compact UTF-8 with non-ASCII text kept as is, the same bytes as
+Starlette's JSONResponse.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+JSON_BACKEND = "orjson" if ORJSON_AVAILABLE else "json"
+
+
+def dumps_stdlib(value: Any) -> bytes:
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(value: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # 超出 64 位的整数等 orjson 不支持的值交给标准库
+            pass
+    return dumps_stdlib(value)
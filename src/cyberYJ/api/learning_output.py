@@ -4,6 +4,8 @@ Learning-mode response transformer for mini-program compliance.
 
 from __future__ import annotations
 
+import re
+from functools import lru_cache
 from typing import Any, Dict, List
 
 
@@ -21,6 +23,16 @@ _TEXT_REPLACEMENTS = (
     ("能否", "如何理解"),
 )
 
+_REPLACEMENT_MAP = dict(_TEXT_REPLACEMENTS)
+# 一次扫描完成全部替换：较长的词排在前面，同一位置取最长匹配（“趋吉避凶”先于“吉凶”）。
+# 替换结果不会再构成任何词，因此与逐条 str.replace 的输出一致。
+_REPLACEMENT_PATTERN = re.compile(
+    "|".join(re.escape(old) for old in sorted(_REPLACEMENT_MAP, key=len, reverse=True))
+)
+
+# 同一卦辞、爻辞等文本在不同结果间大量重复，按原文缓存替换结果
+SANITIZE_CACHE_SIZE = 8192
+
 _TONE_TO_READING_STYLE = {
     "attack": "主动阅读",
     "guard": "审慎阅读",
@@ -28,11 +40,14 @@ _TONE_TO_READING_STYLE = {
 }
 
 
-def to_learning_response(raw: Dict[str, Any]) -> Dict[str, Any]:
+def to_learning_response(raw: Dict[str, Any], in_place: bool = False) -> Dict[str, Any]:
     """
     Transform divination response into learning-oriented response schema.
+
+    With ``in_place=True`` the caller hands over ``raw`` (e.g. a freshly
+    computed result) and it is rewritten and returned instead of copied.
     """
-    data = _sanitize_obj(raw)
+    data = _sanitize_in_place(raw) if in_place else _sanitize_obj(raw)
     analysis = data.get("analysis") if isinstance(data.get("analysis"), dict) else {}
 
     learning_points = _build_learning_points(data.get("do_dont"))
@@ -88,14 +103,37 @@ def _build_reading_style(consistency: Any) -> str:
     return _TONE_TO_READING_STYLE.get(tone, "平衡阅读")
 
 
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+def sanitize_text(text: str) -> str:
+    """
+    Apply learning-mode wording replacements to a single string.
+    """
+    return _REPLACEMENT_PATTERN.sub(_replacement, text)
+
+
+def _replacement(match: "re.Match[str]") -> str:
+    return _REPLACEMENT_MAP[match.group(0)]
+
+
+def _sanitize_in_place(value: Any) -> Any:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            value[key] = _sanitize_in_place(item)
+        return value
+    if isinstance(value, list):
+        for index, item in enumerate(value):
+            value[index] = _sanitize_in_place(item)
+        return value
+    if isinstance(value, str):
+        return sanitize_text(value)
+    return value
+
+
 def _sanitize_obj(value: Any) -> Any:
     if isinstance(value, dict):
         return {k: _sanitize_obj(v) for k, v in value.items()}
     if isinstance(value, list):
         return [_sanitize_obj(item) for item in value]
     if isinstance(value, str):
-        text = value
-        for old, new in _TEXT_REPLACEMENTS:
-            text = text.replace(old, new)
-        return text
+        return sanitize_text(value)
     return value
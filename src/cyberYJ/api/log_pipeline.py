@@ -0,0 +1,161 @@
+"""
+Queue-based structured logging for the HTTP middleware.
+
+The request path only builds a dict and enqueues it. A background thread
+drains the queue in batches, encodes each record to a single JSON line and
+hands it to the logger, so JSON encoding and handler I/O stay off the event
+loop. When the queue is full, records are dropped and counted rather than
+blocking requests.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cyberYJ.api.json_codec import dumps
+
+
+RECEIVED_EVENT = "request.received"
+
+_Record = Tuple[int, Dict[str, Any]]
+
+
+class StructuredLogPipeline:
+    """Batching structured logger with sampling of request.received and drop accounting."""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        max_queue: int = 10_000,
+        batch_size: int = 256,
+        received_sample_rate: float = 1.0,
+    ) -> None:
+        if max_queue < 1 or batch_size < 1:
+            raise ValueError("log queue size and batch size must be positive")
+        if not 0.0 <= received_sample_rate <= 1.0:
+            raise ValueError(f"received sample rate must be within [0, 1]: {received_sample_rate}")
+        self._logger = logger
+        self._batch_size = batch_size
+        self._received_sample_rate = received_sample_rate
+        self._queue: "queue.Queue[Optional[_Record]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self._emitted = 0
+        self._dropped = 0
+        self._reported_dropped = 0
+        self._sampled_out = 0
+
+    def log(self, level: int, event: str, **fields: Any) -> bool:
+        """Enqueue one event; return False when it is sampled out, filtered or dropped."""
+        if self._closed or not self._logger.isEnabledFor(level):
+            return False
+        if (
+            event == RECEIVED_EVENT
+            and self._received_sample_rate < 1.0
+            and random.random() >= self._received_sample_rate
+        ):
+            self._sampled_out += 1
+            return False
+
+        payload = {"event": event, "timestamp_ms": int(time.time() * 1000)}
+        payload.update(fields)
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((level, payload))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every enqueued record has been written."""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush and stop the background writer."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+            self._closed = True
+        if worker is not None:
+            self._queue.put(None)
+            worker.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "emitted": self._emitted,
+                "dropped": self._dropped,
+                "sampled_out": self._sampled_out,
+            }
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None and not self._closed:
+                self._worker = threading.Thread(
+                    target=self._run, name="cyberyj-log-pipeline", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch: List[Optional[_Record]] = [first]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            written = 0
+            try:
+                for record in batch:
+                    if record is None:
+                        stop = True
+                        continue
+                    level, payload = record
+                    self._write(level, payload)
+                    written += 1
+                self._report_drops()
+            except Exception:
+                # handler 自身出错时丢弃本批剩余记录，写出线程继续运行
+                pass
+            finally:
+                with self._lock:
+                    self._emitted += written
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, level: int, payload: Dict[str, Any]) -> None:
+        try:
+            message = dumps(payload).decode("utf-8")
+        except (TypeError, ValueError):
+            message = dumps({key: str(value) for key, value in payload.items()}).decode("utf-8")
+        self._logger.log(level, message)
+
+    def _report_drops(self) -> None:
+        with self._lock:
+            dropped = self._dropped - self._reported_dropped
+            self._reported_dropped = self._dropped
+        if dropped:
+            self._write(
+                logging.WARNING,
+                {"event": "log.dropped", "timestamp_ms": int(time.time() * 1000), "count": dropped},
+            )
@@ -0,0 +1,228 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms write to a per-thread shard without taking a
+lock; a scrape sums the shards. Values that other components already track
+(error counts, cache hits, worker pool and log queue state) are read through
+collectors at scrape time instead of being mirrored on the request path.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 秒；覆盖缓存命中（亚毫秒）到实时解卦和大批量流式输出
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[Labels, float]
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, labelnames: Sequence[str]) -> None:
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        values = self._registry._shard()
+        key = (self.name, labels)
+        values[key] = values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Gauge kept as summed deltas, so inc/dec may happen on different threads."""
+
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        values = self._registry._shard()
+        key = (self.name, labels)
+        values[key] = values.get(key, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float],
+    ) -> None:
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        if not self.buckets:
+            raise ValueError("histogram needs at least one bucket")
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self._registry._shard()
+        key = (self.name, labels)
+        state = values.get(key)
+        if state is None:
+            # 各桶计数（最后一格为 +Inf）+ 观测值总和
+            state = values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+
+class _Collected(_Metric):
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help: str,
+        kind: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], Iterable[Sample]],
+    ) -> None:
+        super().__init__(registry, name, help, labelnames)
+        self.kind = kind
+        self.collect = collect
+
+
+class MetricsRegistry:
+    """Metric definitions plus per-thread value shards."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, Labels], Any]] = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help, labelnames, buckets))
+
+    def collector(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        collect: Callable[[], Iterable[Sample]],
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        """Register a metric whose samples are read from ``collect`` at scrape time."""
+        if kind not in ("counter", "gauge"):
+            raise ValueError(f"unsupported collector kind: {kind}")
+        self._register(_Collected(self, name, help, kind, labelnames, collect))
+
+    def render(self) -> str:
+        merged = self._merge()
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if isinstance(metric, _Collected):
+                samples = sorted(metric.collect())
+                for labels, value in samples:
+                    lines.append(_sample(metric.name, metric.labelnames, labels, value))
+            elif isinstance(metric, Histogram):
+                for labels, state in sorted(merged.get(metric.name, {}).items()):
+                    lines.extend(_histogram_samples(metric, labels, state))
+            else:
+                for labels, value in sorted(merged.get(metric.name, {}).items()):
+                    lines.append(_sample(metric.name, metric.labelnames, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Any) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def _shard(self) -> Dict[Tuple[str, Labels], Any]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict[Tuple[str, Labels], Any] = {}
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def _merge(self) -> Dict[str, Dict[Labels, Any]]:
+        with self._lock:
+            shards = list(self._shards)
+        merged: Dict[str, Dict[Labels, Any]] = {}
+        for shard in shards:
+            # 拷贝在 GIL 下完成；直方图各格可能与正在写入的观测相差一次，可接受
+            for (name, labels), value in list(shard.items()):
+                by_labels = merged.setdefault(name, {})
+                if isinstance(value, list):
+                    current = by_labels.get(labels)
+                    if current is None:
+                        by_labels[labels] = list(value)
+                    else:
+                        for index, count in enumerate(value):
+                            current[index] += count
+                else:
+                    by_labels[labels] = by_labels.get(labels, 0) + value
+        return merged
+
+
+def _histogram_samples(metric: Histogram, labels: Labels, state: List[float]) -> Iterable[str]:
+    names = metric.labelnames + ("le",)
+    cumulative = 0
+    for bound, count in zip(metric.buckets + (math.inf,), state):
+        cumulative += count
+        yield _sample(f"{metric.name}_bucket", names, labels + (_format_value(bound),), cumulative)
+    yield _sample(f"{metric.name}_sum", metric.labelnames, labels, state[-1])
+    yield _sample(f"{metric.name}_count", metric.labelnames, labels, cumulative)
+
+
+def _sample(name: str, labelnames: Sequence[str], labels: Labels, value: float) -> str:
+    if not labelnames:
+        return f"{name} {_format_value(value)}"
+    pairs = ",".join(
+        f'{key}="{_escape_label(str(label))}"' for key, label in zip(labelnames, labels)
+    )
+    return f"{name}{{{pairs}}} {_format_value(value)}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if math.isnan(value):
+            return "NaN"
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
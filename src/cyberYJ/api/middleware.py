@@ -0,0 +1,222 @@
+"""
+Request gateway for the HTTP app as a plain ASGI middleware.
+
+Assigns the request id, checks the API key and rate limit for ``/v1/``
+routes, adds the ``X-Request-ID`` / ``X-RateLimit-*`` headers when the
+response starts, and records request logs and metrics. Unlike
+``@app.middleware("http")`` (``BaseHTTPMiddleware``) it passes the ASGI
+messages straight through, so there is no extra task per request and no
+re-streaming of response bodies.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cyberYJ.api.log_pipeline import StructuredLogPipeline
+from cyberYJ.api.metrics import Counter, Gauge, Histogram
+from cyberYJ.api.rate_limit import RateLimiter
+
+
+class ErrorTracker:
+    """In-memory error tracker for quick observability."""
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, code: str) -> None:
+        with self._lock:
+            self._counts[code] = self._counts.get(code, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+def resolve_request_id(header_value: Optional[str]) -> str:
+    request_id = (header_value or "").strip()
+    if request_id:
+        return request_id[:128]
+    return uuid.uuid4().hex
+
+
+def error_response(
+    status_code: int,
+    code: str,
+    message: str,
+    request_id: Optional[str] = None,
+) -> JSONResponse:
+    error = {"code": code, "message": message}
+    if request_id:
+        error["request_id"] = request_id
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": error},
+    )
+
+
+class RequestGatewayMiddleware:
+    """Auth, rate limiting, response headers, request logs and metrics."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        api_key: str,
+        rate_limiter: RateLimiter,
+        rate_limit_max: int,
+        error_tracker: ErrorTracker,
+        log_pipeline: StructuredLogPipeline,
+        route_label: Callable[[Scope], str],
+        requests_total: Counter,
+        request_duration: Histogram,
+        requests_in_flight: Gauge,
+        rate_limit_rejections: Counter,
+    ) -> None:
+        self.app = app
+        self._api_key = api_key
+        self._rate_limiter = rate_limiter
+        self._rate_limit_header = str(rate_limit_max)
+        self._error_tracker = error_tracker
+        self._log = log_pipeline.log
+        self._route_label = route_label
+        self._requests_total = requests_total
+        self._request_duration = request_duration
+        self._requests_in_flight = requests_in_flight
+        self._rate_limit_rejections = rate_limit_rejections
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        headers = Headers(scope=scope)
+        request_id = resolve_request_id(headers.get("x-request-id"))
+        # 供路由与异常处理器通过 request.state.request_id 读取
+        scope.setdefault("state", {})["request_id"] = request_id
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_host = client[0] if client else "unknown"
+        self._requests_in_flight.inc()
+
+        self._log(
+            logging.INFO,
+            "request.received",
+            request_id=request_id,
+            method=method,
+            path=path,
+            client_ip=client_host,
+        )
+
+        try:
+            extra_headers: Dict[str, str] = {}
+            if path.startswith("/v1/"):
+                provided_api_key = headers.get("x-api-key")
+                if self._api_key and provided_api_key != self._api_key:
+                    await self._reject(
+                        scope, receive, send, request_id, client_host, started_at,
+                        401, "UNAUTHORIZED", "missing or invalid X-API-Key", {},
+                    )
+                    return
+
+                client_id = f"{provided_api_key or 'no-key'}:{client_host}"
+                allowed, remaining, reset_in = self._rate_limiter.allow(client_id)
+                if not allowed:
+                    self._rate_limit_rejections.inc()
+                    await self._reject(
+                        scope, receive, send, request_id, client_host, started_at,
+                        429, "RATE_LIMITED", f"rate limit exceeded, retry in {reset_in}s",
+                        {
+                            "Retry-After": str(reset_in),
+                            "X-RateLimit-Limit": self._rate_limit_header,
+                            "X-RateLimit-Remaining": "0",
+                        },
+                    )
+                    return
+                extra_headers = {
+                    "X-RateLimit-Limit": self._rate_limit_header,
+                    "X-RateLimit-Remaining": str(remaining),
+                    "X-RateLimit-Reset": str(reset_in),
+                }
+            extra_headers["X-Request-ID"] = request_id
+            response_started = False
+
+            async def send_with_headers(message: Message) -> None:
+                nonlocal response_started
+                if message["type"] == "http.response.start":
+                    response_started = True
+                    status_code = message["status"]
+                    response_headers = MutableHeaders(scope=message)
+                    for name, value in extra_headers.items():
+                        response_headers[name] = value
+                    self._observe(scope, method, status_code, started_at)
+                    self._log(
+                        logging.INFO,
+                        "request.completed",
+                        request_id=request_id,
+                        method=method,
+                        path=path,
+                        status_code=status_code,
+                        duration_ms=int((time.perf_counter() - started_at) * 1000),
+                        client_ip=client_host,
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            except BaseException:
+                # 未发出响应头就失败：由外层的异常处理返回 500，这里补记指标
+                if not response_started:
+                    self._observe(scope, method, 500, started_at)
+                raise
+        finally:
+            self._requests_in_flight.dec()
+
+    async def _reject(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        request_id: str,
+        client_host: str,
+        started_at: float,
+        status_code: int,
+        code: str,
+        message: str,
+        headers: Dict[str, str],
+    ) -> None:
+        self._error_tracker.record(code)
+        response = error_response(
+            status_code=status_code,
+            code=code,
+            message=message,
+            request_id=request_id,
+        )
+        for name, value in headers.items():
+            response.headers[name] = value
+        response.headers["X-Request-ID"] = request_id
+        self._log(
+            logging.WARNING,
+            "request.rejected",
+            request_id=request_id,
+            method=scope["method"],
+            path=scope["path"],
+            status_code=status_code,
+            error_code=code,
+            client_ip=client_host,
+        )
+        self._observe(scope, scope["method"], status_code, started_at)
+        await response(scope, receive, send)
+
+    def _observe(self, scope: Scope, method: str, status_code: int, started_at: float) -> None:
+        route = self._route_label(scope)
+        self._requests_total.inc(route, method, str(status_code))
+        self._request_duration.observe(time.perf_counter() - started_at, route)
@@ -2,7 +2,7 @@
 HTTP API request/response models.
 """
 
-from typing import Literal, Optional
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -32,3 +32,35 @@ class DivinationRequest(BaseModel):
         if any(v not in (6, 7, 8, 9) for v in value):
             raise ValueError("coins数组必须包含6个元素 (6/7/8/9)")
         return value
+
+
+class DivinationBatchRequest(BaseModel):
+    """POST /v1/divination/batch request body.
+
+    Items are validated one by one as ``DivinationRequest`` so that an invalid
+    item is reported in its own slot instead of failing the batch.
+    """
+
+    items: list[dict[str, Any]] = Field(..., min_length=1)
+
+
+class LuopanBatchItem(BaseModel):
+    """One building in a luopan batch request."""
+
+    sitting_direction: str
+    building_type: str
+    owner_birth: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class LuopanBatchRequest(BaseModel):
+    """POST /v1/luopan/batch request body.
+
+    Items are validated one by one as ``LuopanBatchItem`` so that an invalid
+    item is reported in its own NDJSON row instead of failing the batch.
+    """
+
+    items: list[dict[str, Any]] = Field(..., min_length=1)
+    timestamp: Optional[str] = None
+    timezone: Optional[str] = None
@@ -0,0 +1,341 @@
+"""
+Token-bucket rate limiting for the HTTP API.
+
+Backends share one interface, ``allow(client_id) -> (allowed, remaining, reset_in)``:
+
+- memory: per-process buckets (TokenBucketRateLimiter)
+- shared: a memory-mapped bucket table shared by all worker processes on one
+  host (SharedMemoryRateLimiter)
+- redis: buckets kept in any Redis-compatible server (RedisRateLimiter)
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Protocol, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+RATE_LIMIT_BACKENDS = ("memory", "shared", "redis")
+
+
+class RateLimiter(Protocol):
+    def allow(self, client_id: str) -> Tuple[bool, int, int]:
+        ...
+
+
+def _take_token(tokens: float, elapsed: float, capacity: float, rate: float) -> Tuple[bool, float]:
+    tokens = min(capacity, tokens + max(0.0, elapsed) * rate)
+    if tokens >= 1.0:
+        return True, tokens - 1.0
+    return False, tokens
+
+
+def _decision(allowed: bool, tokens: float, capacity: float, rate: float) -> Tuple[bool, int, int]:
+    if allowed:
+        # 距离令牌桶回满的秒数
+        reset_in = math.ceil((capacity - tokens) / rate)
+    else:
+        # 距离下一个令牌的秒数
+        reset_in = math.ceil((1.0 - tokens) / rate)
+    return allowed, int(tokens), max(1, reset_in)
+
+
+def _validate(max_requests: int, window_seconds: float, max_clients: int) -> None:
+    if max_requests < 1 or window_seconds <= 0:
+        raise ValueError("rate limit must allow at least one request per positive window")
+    if max_clients < 1:
+        raise ValueError("max_clients must be positive")
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # client id -> (tokens, last refill time); ordered by last access
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+
+class TokenBucketRateLimiter:
+    """Token-bucket limiter keyed by client id.
+
+    Each client may burst up to ``max_requests`` and refills at
+    ``max_requests / window_seconds`` tokens per second. Keys are spread over
+    independently locked shards. Every shard keeps its buckets in access order
+    and drops buckets idle for a full window, since a refilled bucket is the
+    same as a missing one. When a shard still exceeds its share of
+    ``max_clients``, the least recently seen client is evicted, which bounds
+    memory at the cost of handing that client a fresh bucket.
+    """
+
+    def __init__(
+        self,
+        max_requests: int,
+        window_seconds: float,
+        max_clients: int = 100_000,
+        shards: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        _validate(max_requests, window_seconds, max_clients)
+        if shards < 1:
+            raise ValueError("shards must be positive")
+        self._capacity = float(max_requests)
+        self._window_seconds = float(window_seconds)
+        self._rate = max_requests / window_seconds
+        self._shards: List[_Shard] = [_Shard() for _ in range(shards)]
+        self._shard_limit = max(1, math.ceil(max_clients / shards))
+        self._clock = clock
+
+    def allow(self, client_id: str) -> Tuple[bool, int, int]:
+        """Consume one token; return (allowed, remaining, seconds until reset)."""
+        now = self._clock()
+        shard = self._shards[hash(client_id) % len(self._shards)]
+        with shard.lock:
+            buckets = shard.buckets
+            entry = buckets.pop(client_id, None)
+            if entry is None:
+                allowed, tokens = _take_token(self._capacity, 0.0, self._capacity, self._rate)
+            else:
+                allowed, tokens = _take_token(entry[0], now - entry[1], self._capacity, self._rate)
+            buckets[client_id] = (tokens, now)
+            self._evict(buckets, now)
+        return _decision(allowed, tokens, self._capacity, self._rate)
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def _evict(self, buckets: "OrderedDict[str, Tuple[float, float]]", now: float) -> None:
+        # 最久未访问的在队首；队首未闲置满一个窗口时其余也不会
+        idle_before = now - self._window_seconds
+        values = buckets.values()
+        while buckets:
+            if next(iter(values))[1] > idle_before and len(buckets) <= self._shard_limit:
+                break
+            buckets.popitem(last=False)
+
+
+class SharedMemoryRateLimiter:
+    """Token-bucket table in a memory-mapped file shared by worker processes.
+
+    The table is split into stripes, each guarded by an ``fcntl`` byte-range
+    lock (between processes) and a thread lock (within a process). A client
+    hashes to a stripe and a short probe window inside it. Its slot holds
+    the key hash, the token count and the last refill time. Slots idle for a
+    full window are reused first, then the least recently used slot in the
+    window, so the file size is fixed by ``max_clients``. Refill times use
+    the wall clock, which all processes on the host share.
+    """
+
+    MAGIC = b"CYRLSHM1"
+    HEADER = struct.Struct("<8sIIdd")
+    # 每个槽位：key 哈希（uint64）、令牌数、最近补充时间（double）
+    SLOT_WORDS = 3
+    STRIPE_SLOTS = 1024
+    PROBE_LENGTH = 16
+
+    def __init__(
+        self,
+        max_requests: int,
+        window_seconds: float,
+        max_clients: int = 100_000,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not FCNTL_AVAILABLE:
+            raise ImportError("共享内存限流需要 fcntl（仅支持 POSIX 系统）")
+        _validate(max_requests, window_seconds, max_clients)
+        self._capacity = float(max_requests)
+        self._window_seconds = float(window_seconds)
+        self._rate = max_requests / window_seconds
+        self._clock = clock
+        self._stripes = max(1, math.ceil(2 * max_clients / self.STRIPE_SLOTS))
+        slots = self._stripes * self.STRIPE_SLOTS
+        self.path = path or os.path.join(
+            tempfile.gettempdir(),
+            f"cyberyj-ratelimit-{max_requests}-{window_seconds:g}-{slots}.bin",
+        )
+
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        # 槽位区按 8 字节对齐放在一页之后，表头单独加锁
+        self._data_offset = mmap.PAGESIZE
+        size = self._data_offset + slots * self.SLOT_WORDS * 8
+        self._initialize(slots, size)
+        self._mmap = mmap.mmap(self._fd, size)
+        self._data = memoryview(self._mmap)[self._data_offset:]
+        self._keys = self._data.cast("Q")
+        self._floats = self._data.cast("d")
+        self._thread_locks = [threading.Lock() for _ in range(self._stripes)]
+
+    def allow(self, client_id: str) -> Tuple[bool, int, int]:
+        """Consume one token; return (allowed, remaining, seconds until reset)."""
+        key = int.from_bytes(hashlib.blake2b(client_id.encode("utf-8"), digest_size=8).digest(), "little") or 1
+        stripe = key % self._stripes
+        base = stripe * self.STRIPE_SLOTS
+        start = (key >> 32) % self.STRIPE_SLOTS
+        keys, floats, words = self._keys, self._floats, self.SLOT_WORDS
+
+        with self._thread_locks[stripe]:
+            self._lock_stripe(stripe, fcntl.LOCK_EX)
+            try:
+                now = self._clock()
+                idle_before = now - self._window_seconds
+                target = reusable = oldest = -1
+                oldest_time = math.inf
+                for step in range(self.PROBE_LENGTH):
+                    slot = base + (start + step) % self.STRIPE_SLOTS
+                    slot_key = keys[slot * words]
+                    if slot_key == key:
+                        target = slot
+                        break
+                    if slot_key == 0:
+                        # 槽位只会被覆盖不会被清空：空槽之后不会再有该 key
+                        if reusable < 0:
+                            reusable = slot
+                        break
+                    updated = floats[slot * words + 2]
+                    if reusable < 0 and updated <= idle_before:
+                        reusable = slot
+                    if updated < oldest_time:
+                        oldest, oldest_time = slot, updated
+
+                if target >= 0:
+                    allowed, tokens = _take_token(
+                        floats[target * words + 1],
+                        now - floats[target * words + 2],
+                        self._capacity,
+                        self._rate,
+                    )
+                else:
+                    target = reusable if reusable >= 0 else oldest
+                    allowed, tokens = _take_token(self._capacity, 0.0, self._capacity, self._rate)
+                    keys[target * words] = key
+                floats[target * words + 1] = tokens
+                floats[target * words + 2] = now
+            finally:
+                self._lock_stripe(stripe, fcntl.LOCK_UN)
+        return _decision(allowed, tokens, self._capacity, self._rate)
+
+    def close(self) -> None:
+        self._keys.release()
+        self._floats.release()
+        self._data.release()
+        self._mmap.close()
+        os.close(self._fd)
+
+    def _lock_stripe(self, stripe: int, operation: int) -> None:
+        fcntl.lockf(self._fd, operation, 1, self._data_offset + stripe * self.STRIPE_SLOTS * self.SLOT_WORDS * 8)
+
+    def _initialize(self, slots: int, size: int) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            header = os.pread(self._fd, self.HEADER.size, 0)
+            if len(header) == self.HEADER.size:
+                magic, stored_slots, _, capacity, window = self.HEADER.unpack(header)
+                if magic == self.MAGIC:
+                    if (stored_slots, capacity, window) != (slots, self._capacity, self._window_seconds):
+                        raise ValueError(
+                            f"shared rate limit file {self.path} was created with different settings"
+                        )
+                    return
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, size)
+            os.pwrite(
+                self._fd,
+                self.HEADER.pack(self.MAGIC, slots, self.SLOT_WORDS, self._capacity, self._window_seconds),
+                0,
+            )
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+
+# KEYS[1]: bucket key; ARGV: capacity, refill rate per second, idle ttl seconds.
+# 使用服务器时间，所有 worker 共享同一时钟；空闲满一个窗口的桶由 EXPIRE 回收
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimiter:
+    """Token buckets kept in a Redis-compatible server, updated by one Lua script per request.
+
+    ``client`` is any object with a redis-py style ``register_script``
+    (redis-py, fakeredis, or a client for a compatible server).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_requests: int,
+        window_seconds: float,
+        key_prefix: str = "cyberyj:ratelimit:",
+    ) -> None:
+        _validate(max_requests, window_seconds, 1)
+        self._capacity = float(max_requests)
+        self._rate = max_requests / window_seconds
+        self._ttl = max(1, math.ceil(window_seconds))
+        self._key_prefix = key_prefix
+        self._script = client.register_script(_REDIS_TOKEN_BUCKET)
+
+    @classmethod
+    def from_url(cls, url: str, max_requests: int, window_seconds: float) -> "RedisRateLimiter":
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("redis 未安装，请运行: pip install redis")
+        return cls(redis.Redis.from_url(url), max_requests, window_seconds)
+
+    def allow(self, client_id: str) -> Tuple[bool, int, int]:
+        allowed, tokens = self._script(
+            keys=[self._key_prefix + client_id],
+            args=[repr(self._capacity), repr(self._rate), self._ttl],
+        )
+        return _decision(bool(int(allowed)), float(tokens), self._capacity, self._rate)
+
+
+def create_rate_limiter(
+    backend: str,
+    max_requests: int,
+    window_seconds: float,
+    max_clients: int = 100_000,
+    shared_path: Optional[str] = None,
+    redis_url: Optional[str] = None,
+) -> RateLimiter:
+    """Build the limiter for ``backend`` (memory / shared / redis)."""
+    if backend == "memory":
+        return TokenBucketRateLimiter(max_requests, window_seconds, max_clients=max_clients)
+    if backend == "shared":
+        return SharedMemoryRateLimiter(
+            max_requests, window_seconds, max_clients=max_clients, path=shared_path
+        )
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("redis rate limit backend requires a redis URL")
+        return RedisRateLimiter.from_url(redis_url, max_requests, window_seconds)
+    raise ValueError(f"rate limit backend must be one of {', '.join(RATE_LIMIT_BACKENDS)}: {backend}")
@@ -0,0 +1,317 @@
+"""
+Pre-encoded response bodies for the coin-based interpret routes.
+
+An interpret response depends on time in only three strings: the trace time
+line, the trace solar-term line and ``analysis.solar_term``. A response is
+therefore encoded once into a template: the UTF-8 body bytes split around those
+three slots. Serving it again is a join with slot values that are rendered at
+most once per second, without re-walking or re-encoding the structure.
+
+- InterpretResponseStore: every coins × scene response (4^6 × 10), rendered
+  per solar term ahead of time
+- EncodedResponseCache: LRU of templates filled from live results, keyed by
+  request fields
+
+Apart from the two trace lines, a response changes only at a term boundary or
+when the day countdown in ``analysis.solar_term`` ticks over;
+``SlotRenderer.valid_for`` bounds that time and ``resource_etag`` identifies a
+response by it, for HTTP caching.
+"""
+
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from cyberYJ.api.divination_service import DivinationService
+from cyberYJ.api.json_codec import dumps
+from cyberYJ.core.solar_calculator import SolarCalculator
+from cyberYJ.core.time_context import DEFAULT_TIMEZONE, TimeContext, resolve_timezone
+from cyberYJ.tools.fengshui_divination import FengshuiDivinationTool
+
+
+COIN_VALUES = (6, 7, 8, 9)
+SCENE_KEYS: Tuple[Optional[str], ...] = (None,) + tuple(DivinationService.SCENE_TO_QUESTION_TYPE)
+
+StoreKey = Tuple[Tuple[int, ...], Optional[str]]
+# Encoded response: bytes chunks interleaved with slot indices
+Template = Tuple[Union[bytes, int], ...]
+Slots = Tuple[bytes, ...]
+
+_SLOT_MARKERS = tuple(f"@@cyberyj-slot-{index}@@" for index in range(3))
+_SLOT_TIME, _SLOT_SOLAR_TRACE, _SLOT_SOLAR_TERM = range(3)
+
+# 太阳黄经日行最快约 1.02°（近日点附近），按此估算的剩余时间只会偏短
+_MAX_SOLAR_DEGREES_PER_DAY = 1.02
+_TERM_SPAN_DEGREES = 15.0
+
+
+def all_combinations() -> Iterable[StoreKey]:
+    for coins in itertools.product(COIN_VALUES, repeat=6):
+        for scene_type in SCENE_KEYS:
+            yield coins, scene_type
+
+
+def encode_template(response: Dict[str, Any]) -> Template:
+    """Encode a response with its time-dependent strings cut out as slots (mutates ``response``)."""
+    trace = response.get("trace") or []
+    for index, line in enumerate(trace):
+        if line.startswith(("使用当前时间", "使用指定时间")):
+            trace[index] = _SLOT_MARKERS[_SLOT_TIME]
+        elif line.startswith("当前节气: "):
+            trace[index] = _SLOT_MARKERS[_SLOT_SOLAR_TRACE]
+    if isinstance(response.get("analysis"), dict):
+        response["analysis"]["solar_term"] = _SLOT_MARKERS[_SLOT_SOLAR_TERM]
+
+    parts: List[Union[bytes, int]] = [dumps(response)]
+    for slot, marker in enumerate(_SLOT_MARKERS):
+        encoded = dumps(marker)
+        split: List[Union[bytes, int]] = []
+        for part in parts:
+            if isinstance(part, int) or encoded not in part:
+                split.append(part)
+                continue
+            for piece_index, piece in enumerate(part.split(encoded)):
+                if piece_index:
+                    split.append(slot)
+                split.append(piece)
+        parts = split
+    return tuple(parts)
+
+
+def render_template(template: Template, slots: Slots) -> bytes:
+    return b"".join(slots[part] if isinstance(part, int) else part for part in template)
+
+
+def resource_etag(data_snapshot: str, key: Hashable, term: str, slots: Slots) -> str:
+    """Weak ETag from the data snapshot, request key, solar term and its description.
+
+    Weak because the trace lines (current time, current solar longitude) keep
+    changing, and the body bytes differ per Content-Encoding, while the
+    response stays equivalent.
+    """
+    digest = hashlib.sha1(f"{data_snapshot}|{key!r}|{term}|".encode("utf-8"))
+    digest.update(slots[_SLOT_SOLAR_TERM])
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+class SlotRenderer:
+    """Current values of the time-dependent strings, rendered once per second."""
+
+    def __init__(
+        self,
+        timezone: str = DEFAULT_TIMEZONE,
+        solar_calculator: Optional[SolarCalculator] = None,
+        text_filter: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        self._timezone = timezone
+        self._tz = resolve_timezone(timezone)
+        self._solar = solar_calculator or SolarCalculator()
+        self._text_filter = text_filter
+        # (epoch second, solar term info, slot values)
+        self._current: Tuple[int, Dict[str, Any], Slots] = (-1, {}, ())
+
+    @property
+    def solar_calculator(self) -> SolarCalculator:
+        return self._solar
+
+    def render(self, now: Optional[float] = None) -> Tuple[str, Slots]:
+        """Return (current solar term, encoded slot values)."""
+        second = int(time.time() if now is None else now)
+        cached_second, term_info, slots = self._current
+        if cached_second == second:
+            return term_info["name"], slots
+
+        time_context = TimeContext.from_datetime(
+            datetime.fromtimestamp(second, self._tz), self._timezone, explicit=False
+        )
+        term_info = self._solar.get_current_solar_term(time_context=time_context)
+        values = (
+            FengshuiDivinationTool.format_time_trace(time_context),
+            FengshuiDivinationTool.format_solar_term_trace(term_info),
+            self._solar.describe_solar_term_influence(term_info),
+        )
+        if self._text_filter is not None:
+            values = tuple(self._text_filter(value) for value in values)
+        slots = tuple(dumps(value) for value in values)
+        self._current = (second, term_info, slots)
+        return term_info["name"], slots
+
+    def valid_for(self, now: Optional[float] = None) -> int:
+        """Seconds (lower bound) until the solar term or its day countdown next changes."""
+        self.render(now)
+        term_info = self._current[1]
+        # 距下一节气的黄经差；日数按该差值取整，跨过 x.5° 时文字即变化
+        remaining = (term_info["longitude"] + _TERM_SPAN_DEGREES - term_info["solar_longitude"]) % 360
+        margin = min(remaining, remaining - term_info["days_to_next"] + 0.5)
+        # 当前黄经取整到 0.01°，再留出同样的余量
+        margin = max(0.0, margin - 0.01)
+        return int(margin / _MAX_SOLAR_DEGREES_PER_DAY * 86400)
+
+
+@dataclass(frozen=True)
+class TermSnapshot:
+    """Templates rendered for one solar term."""
+
+    term: str
+    built_at: float
+    build_seconds: float
+    templates: Dict[StoreKey, Template]
+
+
+class InterpretResponseStore:
+    """Coins × scene response templates for the active solar term."""
+
+    def __init__(
+        self,
+        service: DivinationService,
+        timezone: str = DEFAULT_TIMEZONE,
+        slot_renderer: Optional[SlotRenderer] = None,
+    ) -> None:
+        self._service = service
+        self._timezone = timezone
+        self._slots = slot_renderer or SlotRenderer(timezone)
+        self._snapshot: Optional[TermSnapshot] = None
+        self._build_lock = threading.Lock()
+        self._builder_lock = threading.Lock()
+        self._builder: Optional[threading.Thread] = None
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def snapshot(self) -> Optional[TermSnapshot]:
+        return self._snapshot
+
+    def build(
+        self,
+        time_context: Optional[TimeContext] = None,
+        combinations: Optional[Iterable[StoreKey]] = None,
+    ) -> TermSnapshot:
+        """Render every combination for the term at ``time_context`` and swap it in."""
+        with self._build_lock:
+            started = time.perf_counter()
+            time_context = time_context or TimeContext.now(self._timezone)
+            solar = self._slots.solar_calculator
+            term = solar.get_current_solar_term(time_context=time_context)["name"]
+            templates: Dict[StoreKey, Template] = {}
+            for coins, scene_type in combinations if combinations is not None else all_combinations():
+                response = self._service.interpret(
+                    list(coins), None, scene_type, time_context=time_context
+                )
+                templates[(tuple(coins), scene_type)] = encode_template(response)
+            snapshot = TermSnapshot(
+                term=term,
+                built_at=time.time(),
+                build_seconds=time.perf_counter() - started,
+                templates=templates,
+            )
+            self._snapshot = snapshot
+            return snapshot
+
+    def refresh_in_background(self) -> bool:
+        """Start a background rebuild unless one is already running."""
+        with self._builder_lock:
+            if self._builder is not None and self._builder.is_alive():
+                return False
+            self._builder = threading.Thread(
+                target=self.build, name="cyberyj-response-store", daemon=True
+            )
+            self._builder.start()
+            return True
+
+    def lookup(
+        self,
+        coins: Sequence[int],
+        question: Optional[str] = None,
+        scene_type: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> Optional[bytes]:
+        """Serialized response, or None when the request must be computed live."""
+        snapshot = self._snapshot
+        # 未指定场景时问题原文参与场景识别，不在预计算范围内
+        if snapshot is None or (question and scene_type is None):
+            self._misses += 1
+            return None
+        template = snapshot.templates.get((tuple(coins), scene_type))
+        if template is None:
+            self._misses += 1
+            return None
+
+        term, slots = self._slots.render(now)
+        if term != snapshot.term:
+            # 已交节：本次实时计算，后台按新节气重建
+            self._misses += 1
+            self.refresh_in_background()
+            return None
+        self._hits += 1
+        return render_template(template, slots)
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "term": snapshot.term if snapshot else None,
+            "entries": len(snapshot.templates) if snapshot else 0,
+            "build_seconds": round(snapshot.build_seconds, 3) if snapshot else None,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+
+class EncodedResponseCache:
+    """LRU of encoded response templates keyed by request fields (one cache per route)."""
+
+    def __init__(self, maxsize: int, slot_renderer: Optional[SlotRenderer] = None) -> None:
+        if maxsize < 0:
+            raise ValueError(f"response cache size must not be negative: {maxsize}")
+        self.maxsize = maxsize
+        self._slots = slot_renderer or SlotRenderer()
+        # key -> (solar term when encoded, template)
+        self._entries: "OrderedDict[Hashable, Tuple[str, Template]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(
+        coins: Sequence[int],
+        question: Optional[str],
+        scene_type: Optional[str],
+    ) -> Tuple[Hashable, ...]:
+        return DivinationService.request_key(coins, question, scene_type)
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        term, slots = self._slots.render(now)
+        if term != entry[0]:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return render_template(entry[1], slots)
+
+    def put(self, key: Hashable, response: Dict[str, Any], now: Optional[float] = None) -> bytes:
+        """Encode ``response`` (consumed) for this request and keep its template."""
+        body = dumps(response)
+        if self.maxsize:
+            term, _ = self._slots.render(now)
+            template = encode_template(response)
+            with self._lock:
+                self._entries[key] = (term, template)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return body
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        return {"size": size, "maxsize": self.maxsize, "hits": self._hits, "misses": self._misses}
@@ -0,0 +1,98 @@
+"""
+Request coalescing: concurrent calls with the same key share one execution.
+
+``run`` is for blocking callers on different threads; ``run_async`` is for
+coroutines on one event loop. The shared result is handed to every caller
+as the same object, so callers must treat it as read-only, unless
+``copy_result`` is set: then every ``run`` caller gets a result it owns
+(copies are only made when a call was actually shared).
+"""
+
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self) -> None:
+        self.future: "Future[Any]" = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one in-flight computation."""
+
+    def __init__(self, copy_result: bool = False) -> None:
+        self._copy_result = copy_result
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def run(self, key: Hashable, func: Callable[..., Any], *args: Any) -> Any:
+        """Call ``func(*args)`` unless a call with ``key`` is running; then wait for its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+            else:
+                call.waiters += 1
+                self._coalesced += 1
+        if not leader:
+            result = call.future.result()
+            return copy.deepcopy(result) if self._copy_result else result
+
+        try:
+            result = func(*args)
+        except BaseException as exc:
+            call.future.set_exception(exc)
+            raise
+        else:
+            call.future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        # 移出登记表后不会再有新的等待方；没有等待方时结果归调用方独有，不必拷贝
+        if self._copy_result and call.waiters:
+            return copy.deepcopy(result)
+        return result
+
+    async def run_async(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Await ``func(*args)`` shared by every coroutine that asks for ``key`` meanwhile.
+
+        The computation runs as its own task, so a caller that is cancelled
+        (client gone) does not cancel it for the others.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            with self._lock:
+                self._executed += 1
+        else:
+            with self._lock:
+                self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._tasks),
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+            }
+
+    def _finish(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 所有等待方都已取消时由这里取走异常，避免 "exception was never retrieved"
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,113 @@
+"""
+Bounded worker pool for blocking work dispatched from async HTTP routes.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from cyberYJ.api.divination_service import DivinationService
+from cyberYJ.core.time_context import TimeContext
+
+
+POOL_KINDS = ("thread", "process")
+
+
+class WorkerPoolBusy(RuntimeError):
+    """Raised when the pool's queue is full and the request should be shed."""
+
+
+class BlockingWorkerPool:
+    """Run synchronous callables on a thread or process pool with a queue-depth limit.
+
+    Up to ``max_workers`` calls run concurrently and up to ``max_queue`` more may
+    wait for a worker; beyond that ``run`` fails fast with ``WorkerPoolBusy``
+    instead of letting latency grow without bound. The executor is created on
+    first use, so building an app does not spawn worker processes.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, kind: str = "thread") -> None:
+        if kind not in POOL_KINDS:
+            raise ValueError(f"worker pool kind must be one of {', '.join(POOL_KINDS)}: {kind}")
+        if max_workers < 1:
+            raise ValueError(f"worker pool size must be positive: {max_workers}")
+        if max_queue < 0:
+            raise ValueError(f"worker queue limit must not be negative: {max_queue}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise WorkerPoolBusy(
+                    f"server busy: {self._in_flight} requests in flight (limit {self.capacity})"
+                )
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="cyberyj-worker",
+                    )
+            return self._executor
+
+
+def default_pool_size() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+# Process workers cannot share the app's service instance, so each worker
+# process builds its own on first use and keeps it for its lifetime.
+_process_service: Optional[DivinationService] = None
+
+
+def interpret_in_process(
+    coins: List[int],
+    question: Optional[str] = None,
+    scene_type: Optional[str] = None,
+    time_context: Optional[TimeContext] = None,
+    solar_term_info: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    global _process_service
+    if _process_service is None:
+        _process_service = DivinationService()
+    return _process_service.interpret(coins, question, scene_type, time_context, solar_term_info)
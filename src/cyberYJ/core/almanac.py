@@ -0,0 +1,167 @@
+"""
+流式历书生成模块
+
+按日生成节气、流年飞星与元运的紧凑记录。节气交接时刻按年预先计算成表，
+流年飞星按年份闭式推算，生成器只持有当前年份的节气表，内存占用与日期跨度无关。
+"""
+
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .solar_calculator import SolarCalculator
+from .time_context import DEFAULT_TIMEZONE, resolve_timezone
+from ..utils.data_loader import DataLoader, get_data_loader
+
+
+# (交节时刻, 节气名) 按时间排序
+TermTable = List[Tuple[datetime, str]]
+
+
+class AlmanacGenerator:
+    """流式历书生成器"""
+
+    # 同时保留的年度节气表数量（当前年与上一年即可覆盖跨年查询）
+    TERM_TABLE_CACHE_SIZE = 2
+
+    # 支持的年份范围：每年要用到上一年的节气表，节气表又要推到次年大寒，
+    # 两端各留一年，避免超出 datetime 的 1-9999 年
+    MIN_YEAR = 2
+    MAX_YEAR = 9998
+
+    def __init__(
+        self,
+        solar_calculator: Optional[SolarCalculator] = None,
+        data_loader: Optional[DataLoader] = None,
+        timezone: str = DEFAULT_TIMEZONE
+    ):
+        """
+        初始化历书生成器
+
+        Args:
+            solar_calculator: 节气计算器，默认新建
+            data_loader: 数据加载器实例，默认使用全局单例
+            timezone: IANA 时区名，决定“日”的边界与交节时刻的显示
+        """
+        self.data_loader = data_loader or get_data_loader()
+        self.solar_calculator = solar_calculator or SolarCalculator(self.data_loader)
+        self.flying_star_tables = self.data_loader.get_flying_star_tables()
+        self.timezone = timezone
+        self.tz = resolve_timezone(timezone)
+        self._term_tables: "OrderedDict[int, TermTable]" = OrderedDict()
+
+    def iter_days(self, start: date, end: date) -> Iterator[Dict[str, Any]]:
+        """
+        逐日生成历书记录（含首尾两日）
+
+        Args:
+            start: 起始日期
+            end: 结束日期
+
+        Yields:
+            每日一条记录：
+            - date: 日期（YYYY-MM-DD）
+            - solar_term: 当日结束时所处节气（交节当日即记为新节气）
+            - term_begins_at: 当日交节时刻（ISO 8601，未交节为 None）
+            - next_term: 下一节气
+            - days_to_next: 距下一节气交节日的天数
+            - annual_star: 流年中宫星（按公历年份，与罗盘工具一致）
+            - annual_palace_map: 流年九宫飞星
+            - period: 元运（未匹配为 None）
+
+        Raises:
+            ValueError: 起始日期晚于结束日期，或超出支持的年份范围
+        """
+        self.check_range(start, end)
+
+        year = None
+        terms: TermTable = []
+        instants: List[datetime] = []
+        year_fields: Dict[str, Any] = {}
+
+        current = start
+        one_day = timedelta(days=1)
+        while current <= end:
+            if current.year != year:
+                year = current.year
+                terms = self._terms_around(year)
+                instants = [instant for instant, _ in terms]
+                year_fields = self._year_fields(year)
+
+            day_start = self.tz.localize(datetime.combine(current, time()))
+            day_end = self.tz.localize(datetime.combine(current + one_day, time()))
+
+            index = bisect_left(instants, day_end) - 1
+            term_at, term_name = terms[index]
+            next_at, next_name = terms[index + 1]
+
+            record = {
+                "date": current.isoformat(),
+                "solar_term": term_name,
+                "term_begins_at": (
+                    self._format_instant(term_at) if term_at >= day_start else None
+                ),
+                "next_term": next_name,
+                "days_to_next": (self._local_date(next_at) - current).days,
+            }
+            record.update(year_fields)
+            yield record
+
+            current += one_day
+
+    @classmethod
+    def check_range(cls, start: date, end: date) -> None:
+        """
+        校验日期范围（iter_days 是生成器，调用方需在开始迭代前先行校验）
+
+        Raises:
+            ValueError: 起始日期晚于结束日期，或超出 MIN_YEAR-MAX_YEAR 年
+        """
+        if start > end:
+            raise ValueError(f"起始日期不能晚于结束日期: {start} > {end}")
+        if start.year < cls.MIN_YEAR or end.year > cls.MAX_YEAR:
+            raise ValueError(f"日期超出支持范围: 仅支持 {cls.MIN_YEAR}-{cls.MAX_YEAR} 年")
+
+    def _terms_around(self, year: int) -> TermTable:
+        """
+        合并上一年与当年的节气表，覆盖 [上年冬至, 次年大寒]
+        """
+        return self._term_table(year - 1) + self._term_table(year)
+
+    def _term_table(self, year: int) -> TermTable:
+        """
+        计算某年的节气表（立春至次年大寒），按年缓存、有界淘汰
+        """
+        table = self._term_tables.get(year)
+        if table is not None:
+            self._term_tables.move_to_end(year)
+            return table
+
+        table = sorted(
+            (
+                self.solar_calculator.calculate_solar_term_time(year, term["name"], self.timezone),
+                term["name"],
+            )
+            for term in self.solar_calculator.solar_terms
+        )
+        self._term_tables[year] = table
+        while len(self._term_tables) > self.TERM_TABLE_CACHE_SIZE:
+            self._term_tables.popitem(last=False)
+        return table
+
+    def _year_fields(self, year: int) -> Dict[str, Any]:
+        """按年份计算流年飞星与元运字段（每年只算一次）"""
+        flying_stars = self.flying_star_tables.annual_chart(year)
+        period_info = self.data_loader.get_flying_star_period_by_year(year)
+        return {
+            "annual_star": flying_stars["central_star"] if flying_stars else None,
+            "annual_palace_map": flying_stars["palace_map"] if flying_stars else None,
+            "period": period_info["period"] if period_info else None,
+        }
+
+    def _local_date(self, instant: datetime) -> date:
+        return instant.astimezone(self.tz).date()
+
+    def _format_instant(self, instant: datetime) -> str:
+        return instant.astimezone(self.tz).isoformat(timespec="minutes")
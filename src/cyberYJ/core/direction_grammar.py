@@ -0,0 +1,148 @@
+"""
+坐向描述文法
+
+罗盘计算器与关键词路由共用的一套预编译坐向文法：
+- 中文方位：坐北朝南、坐西北向东南
+- 角度：坐340向160、坐340度
+- 干支山向：坐亥向巳、坐壬（按山向中心角度）
+
+匹配前输入先经 normalize_direction 规范化（NFKC、去除空白），
+全角数字与夹带空格的写法按半角紧凑写法解析。关键词路由用 extract_direction
+在自由文本中搜索同一文法，计算器能解析的写法都能被抽取。
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Sequence
+
+
+# 中文方位到角度
+COMPASS_DEGREES = {
+    '北': 0,
+    '东北': 45,
+    '东': 90,
+    '东南': 135,
+    '南': 180,
+    '西南': 225,
+    '西': 270,
+    '西北': 315,
+}
+
+# 二十四山（罗盘顺序，壬起；与 luopan.json 一致）
+MOUNTAIN_NAMES = (
+    '壬', '子', '癸', '丑', '艮', '寅', '甲', '卯', '乙', '辰', '巽', '巳',
+    '丙', '午', '丁', '未', '坤', '申', '庚', '酉', '辛', '戌', '乾', '亥',
+)
+
+_MOUNTAIN = '[' + ''.join(MOUNTAIN_NAMES) + ']'
+_NUMBER = r'\d+(?:\.\d+)?'
+_COMPASS = r'[东西南北](?:\s*[东西南北])*'
+
+# 坐向文法（前一分支命中时不再尝试后续分支）。记号之间允许空白：
+# 计算器对规范化后的整段输入从开头匹配，关键词路由在自由文本中搜索同一文法
+DIRECTION_GRAMMAR = re.compile(
+    r'坐\s*(?:'
+    rf'(?P<sit_compass>{_COMPASS})\s*(?:朝|向)\s*(?P<face_compass>{_COMPASS})'
+    rf'|(?P<sit_degree>{_NUMBER})(?:\s*度|\s*向\s*(?P<face_degree>{_NUMBER}))?'
+    rf'|(?P<sit_mountain>{_MOUNTAIN})(?:\s*向\s*(?P<face_mountain>{_MOUNTAIN}))?'
+    r')'
+)
+
+_FACING_GROUPS = ('face_compass', 'face_degree', 'face_mountain')
+
+_WHITESPACE = re.compile(r'\s+')
+
+# 坐向描述类别
+KIND_COMPASS = 'compass'
+KIND_DEGREE = 'degree'
+KIND_MOUNTAIN = 'mountain'
+
+
+class DirectionMatch(NamedTuple):
+    """文法解析结果"""
+
+    sitting_degree: float
+    facing_degree: float
+    kind: str
+
+
+def normalize_direction(text: str) -> str:
+    """
+    规范化坐向输入：全角转半角（NFKC）并去除空白
+    """
+    return _WHITESPACE.sub('', unicodedata.normalize('NFKC', text))
+
+
+def build_mountain_centres(luopan: Sequence[Mapping[str, Any]]) -> Dict[str, float]:
+    """
+    二十四山中心角度表（处理跨越 0 度的山向）
+    """
+    centres = {}
+    for mountain in luopan:
+        start, end = mountain['start_deg'], mountain['end_deg']
+        if start > end:
+            centres[mountain['name']] = ((start + end + 360) / 2) % 360
+        else:
+            centres[mountain['name']] = (start + end) / 2
+    return centres
+
+
+def match_direction(
+    text: str,
+    mountain_centres: Mapping[str, float]
+) -> Optional[DirectionMatch]:
+    """
+    按文法解析坐向角度
+
+    Args:
+        text: 已规范化的坐向描述
+        mountain_centres: 山向中心角度表
+
+    Returns:
+        DirectionMatch(坐向角度, 朝向角度, 类别)，无法解析返回 None
+    """
+    match = DIRECTION_GRAMMAR.match(text)
+    if not match:
+        return None
+
+    sit_compass = match.group('sit_compass')
+    if sit_compass is not None:
+        face_compass = match.group('face_compass')
+        if sit_compass in COMPASS_DEGREES and face_compass in COMPASS_DEGREES:
+            return DirectionMatch(COMPASS_DEGREES[sit_compass], COMPASS_DEGREES[face_compass], KIND_COMPASS)
+        return None
+
+    sit_degree = match.group('sit_degree')
+    if sit_degree is not None:
+        sitting_degree = float(sit_degree)
+        face_degree = match.group('face_degree')
+        if face_degree:
+            return DirectionMatch(sitting_degree, float(face_degree), KIND_DEGREE)
+        # 只有坐向，计算朝向（相差180度）
+        return DirectionMatch(sitting_degree, (sitting_degree + 180) % 360, KIND_DEGREE)
+
+    # 干支山向：坐X[向Y]，角度取山向中心
+    sitting_degree = mountain_centres.get(match.group('sit_mountain'))
+    if sitting_degree is None:
+        return None
+    face_mountain = match.group('face_mountain')
+    facing_degree = mountain_centres.get(face_mountain) if face_mountain else None
+    if facing_degree is None:
+        facing_degree = (sitting_degree + 180) % 360
+    return DirectionMatch(sitting_degree, facing_degree, KIND_MOUNTAIN)
+
+
+def extract_direction(content: str) -> Optional[str]:
+    """
+    从自由文本中抽取坐向片段（如“罗盘：坐北朝南 住宅”中的“坐北朝南”）
+
+    在 NFKC 规范化后的文本中搜索 DIRECTION_GRAMMAR，优先带朝向的片段，
+    返回规范化（去除空白）后的写法。
+    """
+    first = None
+    for match in DIRECTION_GRAMMAR.finditer(unicodedata.normalize('NFKC', content)):
+        if any(match.group(name) for name in _FACING_GROUPS):
+            return normalize_direction(match.group(0))
+        if first is None:
+            first = match
+    return normalize_direction(first.group(0)) if first else None
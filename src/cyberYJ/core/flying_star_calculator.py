@@ -1,6 +1,73 @@
+from datetime import date
 from typing import Any, Dict, Optional, Tuple, List
 
 
+# 月盘：寅月（正月）入中之星，按年支序号 % 3 取值
+# 子午卯酉年八白、辰戌丑未年五黄、寅申巳亥年二黑
+_MONTH_START_STARS = (8, 5, 2)
+MONTH_BRANCHES = ("寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥", "子", "丑")
+
+# 日盘：1949-10-01 为甲子日，日干支序号 = 距该日天数 % 60
+_JIAZI_ORDINAL = date(1949, 10, 1).toordinal()
+
+
+def shift_star(star: int, delta: int) -> int:
+    """
+    九星逆推 delta 步（1-9 循环）
+    """
+    return ((star - 1 - delta) % 9) + 1
+
+
+def shift_palace_map(palace_map: Dict[str, int], delta: int) -> Dict[str, int]:
+    """
+    整盘九宫同步逆推 delta 步
+    """
+    return {palace: shift_star(star, delta) for palace, star in palace_map.items()}
+
+
+def palace_map_for_central_star(base_chart: Dict[str, Any], central_star: int) -> Dict[str, int]:
+    """
+    以基准盘为模板，推出指定中宫星的九宫飞星（年、月、日盘共用同一排布）
+    """
+    return shift_palace_map(base_chart["palace_map"], base_chart["central_star"] - central_star)
+
+
+def month_index_from_longitude(longitude: float) -> int:
+    """
+    由太阳黄经求节令月序号（0=寅月 … 11=丑月，以立春 315° 起每 30° 一月）
+    """
+    return int(((longitude - 315) % 360) // 30)
+
+
+def monthly_central_star(solar_year: int, month_index: int) -> int:
+    """
+    月盘入中星
+
+    Args:
+        solar_year: 以立春为界的年份
+        month_index: 节令月序号（0=寅月）
+    """
+    branch_index = (solar_year - 4) % 12
+    return shift_star(_MONTH_START_STARS[branch_index % 3], month_index)
+
+
+def sexagenary_day_index(day: date) -> int:
+    """日干支序号（0=甲子）"""
+    return (day.toordinal() - _JIAZI_ORDINAL) % 60
+
+
+def daily_central_star(days_since_start: int, ascending: bool) -> int:
+    """
+    日盘入中星
+
+    Args:
+        days_since_start: 距本轮起始甲子日的天数
+        ascending: True 为冬至后阳遁（一白起顺行），False 为夏至后阴遁（九紫起逆行）
+    """
+    offset = days_since_start % 9
+    return offset + 1 if ascending else 9 - offset
+
+
 def _score_star(scoring: Dict[str, Dict[str, int]], star: Optional[int], default_score: int = 0) -> int:
     if star is None:
         return default_score
@@ -12,11 +79,27 @@ def _score_star(scoring: Dict[str, Dict[str, int]], star: Optional[int], default
 
 def combine_flying_stars(
     house_map: Dict[str, Dict[str, int]],
-    annual_map: Dict[str, int],
+    annual_map: Optional[Dict[str, int]],
     scoring: Dict[str, Any],
     auspicious_threshold: Optional[int] = None,
-    inauspicious_threshold: Optional[int] = None
+    inauspicious_threshold: Optional[int] = None,
+    overlays: Optional[Dict[str, Dict[str, int]]] = None
 ) -> Tuple[Dict[str, Dict[str, int]], List[str], List[str]]:
+    """
+    叠加宅盘与时间盘计算各宫吉凶
+
+    Args:
+        house_map: 宅盘（各宫山星、向星）
+        annual_map: 年盘九宫飞星；为 None 时不叠加年星
+        scoring: 星曜评分配置
+        auspicious_threshold: 吉阈值，默认取配置
+        inauspicious_threshold: 凶阈值，默认取配置
+        overlays: 其余层级的九宫飞星，如 {"monthly": {...}, "daily": {...}}，
+            每层在结果中输出 "<层级>_star" 并计入总分，缺失宫位不计分
+
+    Returns:
+        (各宫叠加结果, 吉宫列表, 凶宫列表)
+    """
     score_table = scoring.get("stars", scoring)
     thresholds = scoring.get("thresholds", {})
     fallback = scoring.get("fallback", {})
@@ -33,9 +116,11 @@ def combine_flying_stars(
     auspicious: List[str] = []
     inauspicious: List[str] = []
 
+    overlays = overlays or {}
+
     for palace, house_stars in house_map.items():
-        annual_star = annual_map.get(palace)
-        if annual_star is None:
+        annual_star = annual_map.get(palace) if annual_map is not None else None
+        if annual_map is not None and annual_star is None:
             if missing_annual_star_strategy == "skip":
                 continue
             if missing_annual_star_strategy == "neutral":
@@ -55,8 +140,14 @@ def combine_flying_stars(
         score = (
             _score_star(score_table, mountain_star, unknown_star_score) +
             _score_star(score_table, facing_star, unknown_star_score) +
-            _score_star(score_table, annual_star, unknown_star_score)
+            (_score_star(score_table, annual_star, unknown_star_score) if annual_map is not None else 0)
         )
+        overlay_stars = {}
+        for level_name, level_map in overlays.items():
+            star = level_map.get(palace)
+            overlay_stars[f"{level_name}_star"] = star
+            if star is not None:
+                score += _score_star(score_table, star, unknown_star_score)
 
         level = "neutral"
         if score >= auspicious_threshold:
@@ -66,12 +157,15 @@ def combine_flying_stars(
             level = "inauspicious"
             inauspicious.append(palace)
 
-        combined[palace] = {
+        entry = {
             "mountain_star": mountain_star,
             "facing_star": facing_star,
-            "annual_star": annual_star,
-            "score": score,
-            "level": level
         }
+        if annual_map is not None:
+            entry["annual_star"] = annual_star
+        entry.update(overlay_stars)
+        entry["score"] = score
+        entry["level"] = level
+        combined[palace] = entry
 
     return combined, auspicious, inauspicious
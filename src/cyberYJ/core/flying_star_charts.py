@@ -0,0 +1,174 @@
+"""
+年、月、日三级飞星盘
+
+月盘以节令月（立春、惊蛰……每 30° 黄经一月）为界，日盘以冬至、夏至后的首个甲子日
+为阴阳遁起点，均在基准年盘上闭式推算，不依赖逐月、逐日的数据表。
+"""
+
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from .flying_star_calculator import (
+    MONTH_BRANCHES,
+    daily_central_star,
+    month_index_from_longitude,
+    monthly_central_star,
+    palace_map_for_central_star,
+    sexagenary_day_index,
+)
+from .solar_calculator import SolarCalculator
+from .time_context import DEFAULT_TIMEZONE, TimeContext, resolve_timezone
+from ..utils.data_loader import DataLoader, get_data_loader
+
+
+class FlyingStarChartCalculator:
+    """飞星年盘、月盘、日盘计算器"""
+
+    # 缓存的年度二至起遁日数量
+    SOLSTICE_CACHE_SIZE = 8
+
+    def __init__(
+        self,
+        data_loader: Optional[DataLoader] = None,
+        solar_calculator: Optional[SolarCalculator] = None
+    ):
+        """
+        初始化飞星盘计算器
+
+        Args:
+            data_loader: 数据加载器实例，默认使用全局单例
+            solar_calculator: 节气计算器，默认新建
+        """
+        self.data_loader = data_loader or get_data_loader()
+        self.solar_calculator = solar_calculator or SolarCalculator(self.data_loader)
+        self.flying_star_tables = self.data_loader.get_flying_star_tables()
+        self._solstice_starts: "OrderedDict[Tuple[int, str], Tuple[date, date]]" = OrderedDict()
+
+    def get_annual_chart(self, year: int) -> Optional[Dict[str, Any]]:
+        """
+        获取年盘（按公历年份，与罗盘工具一致）
+
+        Returns:
+            {"level", "year", "central_star", "palace_map"}，无基准数据返回 None
+        """
+        annual = self.flying_star_tables.annual_chart(year)
+        if not annual:
+            return None
+        return {
+            "level": "annual",
+            "year": year,
+            "central_star": annual["central_star"],
+            "palace_map": annual["palace_map"],
+        }
+
+    def get_monthly_chart(self, time_context: TimeContext) -> Optional[Dict[str, Any]]:
+        """
+        获取月盘
+
+        Args:
+            time_context: 请求时间上下文
+
+        Returns:
+            {"level", "solar_year", "month_index", "month_branch", "central_star", "palace_map"}，
+            无基准数据返回 None
+        """
+        base = self.flying_star_tables.base_chart()
+        if not base:
+            return None
+
+        longitude = self.solar_calculator.get_solar_longitude(time_context=time_context)
+        month_index = month_index_from_longitude(longitude)
+        local = time_context.local
+        # 子月、丑月落在公历年初时仍属上一节令年
+        solar_year = local.year - 1 if local.month <= 2 and month_index >= 10 else local.year
+
+        central_star = monthly_central_star(solar_year, month_index)
+        return {
+            "level": "monthly",
+            "solar_year": solar_year,
+            "month_index": month_index,
+            "month_branch": MONTH_BRANCHES[month_index],
+            "central_star": central_star,
+            "palace_map": palace_map_for_central_star(base, central_star),
+        }
+
+    def get_daily_chart(
+        self,
+        day: date,
+        timezone: str = DEFAULT_TIMEZONE
+    ) -> Optional[Dict[str, Any]]:
+        """
+        获取日盘
+
+        Args:
+            day: 本地日期
+            timezone: 判定冬至、夏至所在日期的时区
+
+        Returns:
+            {"level", "date", "ganzhi_index", "ascending", "cycle_start", "central_star", "palace_map"}，
+            无基准数据返回 None
+        """
+        base = self.flying_star_tables.base_chart()
+        if not base:
+            return None
+
+        prev_summer, prev_winter = self._solstice_jiazi_starts(day.year - 1, timezone)
+        summer, winter = self._solstice_jiazi_starts(day.year, timezone)
+        # 按时间顺序排列的遁起点，取不晚于当日的最后一个
+        cycle_start, ascending = prev_summer, False
+        for start, is_ascending in ((prev_winter, True), (summer, False), (winter, True)):
+            if start <= day:
+                cycle_start, ascending = start, is_ascending
+
+        central_star = daily_central_star((day - cycle_start).days, ascending)
+        return {
+            "level": "daily",
+            "date": day.isoformat(),
+            "ganzhi_index": sexagenary_day_index(day),
+            "ascending": ascending,
+            "cycle_start": cycle_start.isoformat(),
+            "central_star": central_star,
+            "palace_map": palace_map_for_central_star(base, central_star),
+        }
+
+    def get_charts(self, time_context: TimeContext) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        一次取出年、月、日三级飞星盘
+
+        Returns:
+            {"annual": ..., "monthly": ..., "daily": ...}
+        """
+        local = time_context.local.astimezone(time_context.tz)
+        return {
+            "annual": self.get_annual_chart(local.year),
+            "monthly": self.get_monthly_chart(time_context),
+            "daily": self.get_daily_chart(local.date(), time_context.timezone),
+        }
+
+    def _solstice_jiazi_starts(self, year: int, timezone: str) -> Tuple[date, date]:
+        """
+        某年夏至、冬至之后（含当日）的首个甲子日，按 (年份, 时区) 缓存
+        """
+        key = (year, timezone)
+        starts = self._solstice_starts.get(key)
+        if starts is not None:
+            self._solstice_starts.move_to_end(key)
+            return starts
+
+        tz = resolve_timezone(timezone)
+        starts = tuple(
+            self._next_jiazi(
+                self.solar_calculator.calculate_solar_term_time(year, term, timezone)
+                .astimezone(tz).date()
+            )
+            for term in ("夏至", "冬至")
+        )
+        self._solstice_starts[key] = starts
+        while len(self._solstice_starts) > self.SOLSTICE_CACHE_SIZE:
+            self._solstice_starts.popitem(last=False)
+        return starts
+
+    @staticmethod
+    def _next_jiazi(day: date) -> date:
+        return day + timedelta(days=(-sexagenary_day_index(day)) % 60)
@@ -0,0 +1,296 @@
+"""
+玄空飞星向量化评分引擎
+
+将 9 运 × 24 山 × 9 宫的宅盘（山星、向星）整理为整数数组，星曜评分整理为查找表，
+一次数组运算即可对全部 216 张宅盘叠加流年（及月、日）飞星并分级。
+评分、阈值与缺失年星策略与 combine_flying_stars 保持一致。
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .flying_star_house import HOUSE_PALACES
+from ..utils.data_loader import DataLoader, get_data_loader
+
+
+PALACES = HOUSE_PALACES
+
+LEVEL_AUSPICIOUS = 1
+LEVEL_NEUTRAL = 0
+LEVEL_INAUSPICIOUS = -1
+_LEVEL_NAMES = {
+    LEVEL_AUSPICIOUS: "auspicious",
+    LEVEL_NEUTRAL: "neutral",
+    LEVEL_INAUSPICIOUS: "inauspicious",
+}
+
+
+@dataclass
+class FlyingStarScores:
+    """
+    全部宅盘的叠加评分结果
+
+    数组前两维为 (元运, 坐山)，与引擎的 periods / mountains 顺序一致；
+    批量评分多个时间盘时在最前面多一维。
+
+    Attributes:
+        engine: 生成结果的引擎
+        annual: 年星数组（0 表示缺失）
+        scores: 各宫总分
+        levels: 各宫等级（1 吉 / 0 平 / -1 凶）
+        included: 该宫是否出现在结果中（缺失年星且策略为 skip 时排除）
+        scored: 该宫是否有分数（缺失年星且策略为 neutral 时无分数）
+        overlays: 叠加层级名 → 星号数组
+    """
+
+    engine: "FlyingStarEngine"
+    annual: Any
+    scores: Any
+    levels: Any
+    included: Any
+    scored: Any
+    overlays: Dict[str, Any] = field(default_factory=dict)
+
+    def palace_lists(self) -> Dict[Tuple[int, str], Tuple[List[str], List[str]]]:
+        """
+        全部宅盘的吉宫、凶宫列表
+
+        Returns:
+            {(元运, 坐山): (吉宫列表, 凶宫列表)}，缺失宅盘规则的组合不出现
+        """
+        if self.scores.ndim != 3:
+            raise ValueError("批量评分结果请先按时间盘索引后再取列表")
+
+        engine = self.engine
+        auspicious = self.scored & (self.levels == LEVEL_AUSPICIOUS)
+        inauspicious = self.scored & (self.levels == LEVEL_INAUSPICIOUS)
+        lists = {}
+        for p_index, m_index in zip(*np.nonzero(engine.rule_mask)):
+            lists[(engine.periods[p_index], engine.mountains[m_index])] = (
+                [PALACES[i] for i in np.flatnonzero(auspicious[p_index, m_index])],
+                [PALACES[i] for i in np.flatnonzero(inauspicious[p_index, m_index])],
+            )
+        return lists
+
+    def combined(self, period: int, mountain: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        还原单张宅盘的叠加结果（结构同 combine_flying_stars 的第一个返回值）
+        """
+        if self.scores.ndim != 3:
+            raise ValueError("批量评分结果请先按时间盘索引后再取单盘")
+
+        engine = self.engine
+        p_index, m_index = engine.index_of(period, mountain)
+        if not engine.rule_mask[p_index, m_index]:
+            return None
+
+        stars = engine.house_stars[p_index, m_index]
+        combined = {}
+        for palace_index, palace in enumerate(PALACES):
+            if not self.included[p_index, m_index, palace_index]:
+                continue
+            annual_star = int(self.annual[palace_index]) or None
+            entry = {
+                "mountain_star": int(stars[palace_index, 0]) or None,
+                "facing_star": int(stars[palace_index, 1]) or None,
+                "annual_star": annual_star,
+            }
+            for level_name, vector in self.overlays.items():
+                entry[f"{level_name}_star"] = int(vector[palace_index]) or None
+            if self.scored[p_index, m_index, palace_index]:
+                entry["score"] = int(self.scores[p_index, m_index, palace_index])
+                entry["level"] = _LEVEL_NAMES[int(self.levels[p_index, m_index, palace_index])]
+            else:
+                entry["score"] = None
+                entry["level"] = "neutral"
+                entry["reason"] = "missing_annual_star"
+            combined[palace] = entry
+        return combined
+
+    def __getitem__(self, index: int) -> "FlyingStarScores":
+        """批量评分时按时间盘取出单组结果"""
+        return FlyingStarScores(
+            engine=self.engine,
+            annual=self.annual[index],
+            scores=self.scores[index],
+            levels=self.levels[index],
+            included=self.included[index],
+            scored=self.scored[index],
+            overlays=self.overlays,
+        )
+
+
+class FlyingStarEngine:
+    """玄空飞星向量化评分引擎"""
+
+    def __init__(self, data_loader: Optional[DataLoader] = None):
+        """
+        初始化引擎，一次性将宅盘规则与评分配置载入数组
+
+        Args:
+            data_loader: 数据加载器实例，默认使用全局单例
+
+        Raises:
+            ImportError: 未安装 NumPy
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("NumPy 未安装，请运行: pip install numpy")
+
+        self.data_loader = data_loader or get_data_loader()
+        self.periods: Tuple[int, ...] = tuple(
+            sorted(p["period"] for p in self.data_loader.get_flying_star_periods())
+        )
+        self.mountains: Tuple[str, ...] = tuple(m["name"] for m in self.data_loader.get_luopan())
+        self._period_index = {period: i for i, period in enumerate(self.periods)}
+        self._mountain_index = {name: i for i, name in enumerate(self.mountains)}
+        self._palace_index = {palace: i for i, palace in enumerate(PALACES)}
+
+        self.house_stars, self.rule_mask = self._build_house_arrays()
+        self._load_scoring(self.data_loader.get_flying_star_scoring())
+
+    def index_of(self, period: int, mountain: str) -> Tuple[int, int]:
+        """
+        (元运, 坐山) → 数组下标
+
+        Raises:
+            KeyError: 元运或坐山不存在
+        """
+        return self._period_index[period], self._mountain_index[mountain]
+
+    def palace_vector(self, palace_map: Optional[Dict[str, int]]) -> "np.ndarray":
+        """九宫飞星字典 → 长度 9 的星号数组（缺失为 0）"""
+        vector = np.zeros(len(PALACES), dtype=np.int8)
+        for palace, star in (palace_map or {}).items():
+            index = self._palace_index.get(palace)
+            if index is not None and star is not None:
+                vector[index] = star
+        return vector
+
+    def score(
+        self,
+        annual_map: Dict[str, int],
+        overlays: Optional[Dict[str, Dict[str, int]]] = None
+    ) -> FlyingStarScores:
+        """
+        对全部宅盘叠加一张年盘（及可选的月、日盘）
+
+        Args:
+            annual_map: 年盘九宫飞星
+            overlays: 其他层级的九宫飞星，如 {"monthly": {...}}，缺失宫位不计分
+
+        Returns:
+            FlyingStarScores，数组形状 (元运, 坐山, 宫)
+        """
+        overlay_vectors = {
+            level_name: self.palace_vector(level_map)
+            for level_name, level_map in (overlays or {}).items()
+        }
+        return self.score_vectors(self.palace_vector(annual_map), overlay_vectors)
+
+    def score_years(self, annual_maps: Sequence[Dict[str, int]]) -> FlyingStarScores:
+        """
+        批量叠加多张年盘
+
+        Returns:
+            FlyingStarScores，数组形状 (年盘, 元运, 坐山, 宫)，可用下标取单年结果
+        """
+        annual = np.stack([self.palace_vector(m) for m in annual_maps]) if annual_maps else (
+            np.zeros((0, len(PALACES)), dtype=np.int8)
+        )
+        return self.score_vectors(annual)
+
+    def score_vectors(
+        self,
+        annual: "np.ndarray",
+        overlays: Optional[Dict[str, "np.ndarray"]] = None
+    ) -> FlyingStarScores:
+        """
+        向量化评分核心
+
+        Args:
+            annual: 年星数组，形状 (..., 9)，0 表示缺失
+            overlays: 叠加层级名 → 长度 9 的星号数组（0 表示缺失，不计分）
+        """
+        annual = np.asarray(annual, dtype=np.int8)
+        lead = annual.shape[:-1]
+        annual_b = annual.reshape(lead + (1, 1, len(PALACES)))
+
+        house_score = self.house_score
+        annual_present = annual_b > 0
+        annual_score = self.score_lut[annual_b]
+
+        scores = house_score + annual_score
+        overlays = overlays or {}
+        for vector in overlays.values():
+            scores = scores + np.where(vector > 0, self.score_lut[vector], 0)
+
+        rule = self.rule_mask[..., None]
+        if self.missing_annual_star_strategy == "skip":
+            included = rule & annual_present
+            scored = included
+        elif self.missing_annual_star_strategy == "neutral":
+            included = np.broadcast_to(rule, scores.shape)
+            scored = included & annual_present
+        else:
+            # 其他策略与 combine_flying_stars 一致：缺失年星按未知星计分
+            included = np.broadcast_to(rule, scores.shape)
+            scored = included
+
+        levels = np.where(
+            scores >= self.auspicious_threshold,
+            LEVEL_AUSPICIOUS,
+            np.where(scores <= self.inauspicious_threshold, LEVEL_INAUSPICIOUS, LEVEL_NEUTRAL)
+        ).astype(np.int8)
+        levels = np.where(scored, levels, LEVEL_NEUTRAL).astype(np.int8)
+
+        return FlyingStarScores(
+            engine=self,
+            annual=annual,
+            scores=scores,
+            levels=levels,
+            included=np.broadcast_to(included, scores.shape),
+            scored=np.broadcast_to(scored, scores.shape),
+            overlays=overlays,
+        )
+
+    def _build_house_arrays(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """宅盘生成表 → (元运, 坐山, 宫, [山星, 向星]) 数组与规则存在掩码"""
+        shape = (len(self.periods), len(self.mountains))
+        house_stars = np.zeros(shape + (len(PALACES), 2), dtype=np.int8)
+        rule_mask = np.zeros(shape, dtype=bool)
+
+        table = self.data_loader.get_flying_star_tables().house_table()
+        for period, p_index in self._period_index.items():
+            for mountain, m_index in self._mountain_index.items():
+                stars = table.stars(period, mountain)
+                if stars is None:
+                    continue
+                rule_mask[p_index, m_index] = True
+                house_stars[p_index, m_index] = np.frombuffer(stars, dtype=np.uint8).reshape(len(PALACES), 2)
+
+        return house_stars, rule_mask
+
+    def _load_scoring(self, scoring: Dict[str, Any]) -> None:
+        """评分配置 → 查找表（下标为星号，0 号位为缺失星）"""
+        score_table = scoring.get("stars", scoring)
+        thresholds = scoring.get("thresholds", {})
+        fallback = scoring.get("fallback", {})
+
+        self.auspicious_threshold = int(thresholds.get("auspicious", 2))
+        self.inauspicious_threshold = int(thresholds.get("inauspicious", -2))
+        self.missing_annual_star_strategy = fallback.get("missing_annual_star", "skip")
+        unknown_star_score = int(fallback.get("unknown_star_score", 0))
+
+        lut = np.full(10, unknown_star_score, dtype=np.int16)
+        for star in range(1, 10):
+            entry = score_table.get(str(star))
+            if entry:
+                lut[star] = int(entry.get("score", 0))
+        self.score_lut = lut
+        self.house_score = lut[self.house_stars].sum(axis=-1)
@@ -0,0 +1,283 @@
+"""
+玄空飞星宅盘生成模块
+
+宅盘按飞行次序闭式生成：以一运壬山盘为起始盘，山星随坐山序号逐山逆推、向星逐山顺推，
+两者随元运逐运顺推。全部 9 运 × 24 山 × 9 宫 × (山星, 向星) 存为 3888 字节的紧凑数组，
+启动时生成，查询只做下标运算，不再解析整张规则表。
+
+FlyingStarTables 在 DataLoader 的原始 JSON 之上维护年盘记忆表、推算基准盘与宅盘生成表，
+每个加载器共享一份（DataLoader.get_flying_star_tables）。
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .flying_star_calculator import shift_palace_map, shift_star
+from ..utils.data_loader import DataLoader, get_data_loader
+
+
+HOUSE_PALACES = ("中宫", "坎", "坤", "震", "巽", "乾", "兑", "艮", "离")
+
+# 一运壬山盘中 1-9 各星的落宫次序
+MOUNTAIN_STAR_FLIGHT = ("中宫", "兑", "坤", "巽", "离", "艮", "乾", "震", "坎")
+FACING_STAR_FLIGHT = ("中宫", "坎", "震", "艮", "乾", "离", "兑", "巽", "坤")
+
+_MOUNTAIN_BASE = tuple(MOUNTAIN_STAR_FLIGHT.index(p) + 1 for p in HOUSE_PALACES)
+_FACING_BASE = tuple(FACING_STAR_FLIGHT.index(p) + 1 for p in HOUSE_PALACES)
+
+HOUSE_CHART_SOURCE_REF = "convention"
+
+_VALID_STAR_BYTES = bytes(range(1, 10))
+
+
+def generate_house_chart(period: int, mountain_index: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    生成单张宅盘
+
+    Args:
+        period: 元运（1-9）
+        mountain_index: 坐山在二十四山中的序号（壬=0，顺时针）
+
+    Returns:
+        按 HOUSE_PALACES 顺序的 (山星, 向星) 元组
+    """
+    return tuple(
+        (
+            shift_star(mountain_star, mountain_index - (period - 1)),
+            shift_star(facing_star, -(mountain_index + period - 1)),
+        )
+        for mountain_star, facing_star in zip(_MOUNTAIN_BASE, _FACING_BASE)
+    )
+
+
+class HouseChartTable:
+    """宅盘紧凑表：bytearray[(运, 山, 宫, 山星/向星)]"""
+
+    def __init__(self, periods: Sequence[int], mountains: Sequence[str]):
+        """
+        生成全部宅盘
+
+        Args:
+            periods: 元运列表
+            mountains: 二十四山名称（按罗盘顺序，壬起）
+        """
+        self.periods: Tuple[int, ...] = tuple(periods)
+        self.mountains: Tuple[str, ...] = tuple(mountains)
+        self._period_index = {period: i for i, period in enumerate(self.periods)}
+        self._mountain_index = {name: i for i, name in enumerate(self.mountains)}
+
+        data = bytearray()
+        for period in self.periods:
+            for mountain_index in range(len(self.mountains)):
+                for mountain_star, facing_star in generate_house_chart(period, mountain_index):
+                    data.append(mountain_star)
+                    data.append(facing_star)
+        self.data = bytes(data)
+
+    def __len__(self) -> int:
+        return len(self.periods) * len(self.mountains)
+
+    def stars(self, period: int, mountain: str) -> Optional[bytes]:
+        """
+        单张宅盘的 18 字节切片（按宫位交替存放山星、向星），不存在返回 None
+        """
+        p_index = self._period_index.get(period)
+        m_index = self._mountain_index.get(mountain)
+        if p_index is None or m_index is None:
+            return None
+        offset = (p_index * len(self.mountains) + m_index) * len(HOUSE_PALACES) * 2
+        return self.data[offset:offset + len(HOUSE_PALACES) * 2]
+
+    def rule(self, period: int, mountain: str) -> Optional[Dict[str, Any]]:
+        """
+        宅盘规则（结构同 flying_stars_house.json 条目），不存在返回 None
+        """
+        stars = self.stars(period, mountain)
+        if stars is None:
+            return None
+        return {
+            "period": period,
+            "sitting_mountain": mountain,
+            "palace_map": {
+                palace: {"mountain_star": stars[2 * i], "facing_star": stars[2 * i + 1]}
+                for i, palace in enumerate(HOUSE_PALACES)
+            },
+            "source_ref": HOUSE_CHART_SOURCE_REF,
+        }
+
+    def rules(self) -> List[Dict[str, Any]]:
+        """全部宅盘规则（运、山顺序）"""
+        return [
+            self.rule(period, mountain)
+            for period in self.periods
+            for mountain in self.mountains
+        ]
+
+    def validate(self) -> Dict[str, Any]:
+        """
+        校验生成表（直接在字节数组上检查覆盖与星号范围）
+
+        Returns:
+            校验报告，字段同 DataLoader.validate_flying_star_house_rules
+        """
+        expected_count = len(self)
+        palace_bytes = len(HOUSE_PALACES) * 2
+        invalid_palace_entries = []
+        well_formed = (
+            len(self.data) == expected_count * palace_bytes and
+            not self.data.translate(None, _VALID_STAR_BYTES)
+        )
+        if not well_formed:
+            for index in range(expected_count):
+                chunk = self.data[index * palace_bytes:(index + 1) * palace_bytes]
+                if len(chunk) != palace_bytes or any(star < 1 or star > 9 for star in chunk):
+                    period = self.periods[index // len(self.mountains)]
+                    invalid_palace_entries.append((period, self.mountains[index % len(self.mountains)]))
+
+        return {
+            "is_valid": not invalid_palace_entries,
+            "rule_count": expected_count - len(invalid_palace_entries),
+            "expected_count": expected_count,
+            "missing_pairs": [],
+            "duplicate_pairs": [],
+            "invalid_palace_entries": invalid_palace_entries,
+        }
+
+    def verify(self, rules: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        用生成表核对一份宅盘规则表（如随包发布的 flying_stars_house.json）
+
+        Returns:
+            核对报告：
+            - is_consistent: 是否完全一致
+            - checked_count: 核对条目数
+            - mismatched_pairs: 星号不一致的 (period, mountain)
+            - missing_pairs: 规则表缺失的组合
+            - unknown_pairs: 生成表中不存在的组合
+        """
+        seen = set()
+        mismatched_pairs = []
+        unknown_pairs = []
+        for rule in rules:
+            pair = (rule.get("period"), rule.get("sitting_mountain"))
+            expected = self.rule(*pair)
+            if expected is None:
+                unknown_pairs.append(pair)
+                continue
+            seen.add(pair)
+            if rule.get("palace_map") != expected["palace_map"]:
+                mismatched_pairs.append(pair)
+
+        missing_pairs = [
+            (period, mountain)
+            for period in self.periods
+            for mountain in self.mountains
+            if (period, mountain) not in seen
+        ]
+        return {
+            "is_consistent": not (mismatched_pairs or missing_pairs or unknown_pairs),
+            "checked_count": len(rules),
+            "mismatched_pairs": mismatched_pairs,
+            "missing_pairs": missing_pairs,
+            "unknown_pairs": unknown_pairs,
+        }
+
+
+class FlyingStarTables:
+    """飞星派生表：按年份记忆的年盘、推算基准盘与宅盘生成表"""
+
+    def __init__(self, data_loader: Optional[DataLoader] = None):
+        """
+        初始化飞星派生表（各表首次使用时生成）
+
+        调用方应通过 DataLoader.get_flying_star_tables 取共享实例，而非各自新建。
+
+        Args:
+            data_loader: 数据加载器实例，默认使用全局单例
+        """
+        self.data_loader = data_loader or get_data_loader()
+        self._annual: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._base: Optional[Dict[str, Any]] = None
+        self._house_table: Optional[HouseChartTable] = None
+
+    def base_chart(self) -> Optional[Dict[str, Any]]:
+        """
+        飞星推算基准盘（数据表中最早年份的年盘）
+
+        Returns:
+            基准年盘副本，数据为空返回 None
+        """
+        base = self._base_chart()
+        return _copy_annual_chart(base) if base else None
+
+    def annual_chart(self, year: int) -> Optional[Dict[str, Any]]:
+        """
+        根据年份获取飞星年盘
+
+        结果按年份记忆化：数据表中的年份直接命中，其余年份首次推算后写入同一张表。
+
+        Args:
+            year: 年份（如 2024）
+
+        Returns:
+            飞星年盘副本（调用方可自由修改），无基准数据返回 None
+        """
+        if not self._annual:
+            self._annual = {chart['year']: chart for chart in self.data_loader.get_flying_stars()}
+        if year not in self._annual:
+            self._annual[year] = self._compute_annual_chart(year)
+        chart = self._annual[year]
+        return _copy_annual_chart(chart) if chart else None
+
+    def house_table(self) -> HouseChartTable:
+        """
+        玄空飞星宅盘生成表（元运取自 flying_stars_periods.json，坐山取自 luopan.json）
+        """
+        if self._house_table is None:
+            periods = sorted(p["period"] for p in self.data_loader.get_flying_star_periods())
+            mountains = [m["name"] for m in self.data_loader.get_luopan()]
+            self._house_table = HouseChartTable(periods, mountains)
+        return self._house_table
+
+    def house_rule(self, period: int, sitting_mountain: str) -> Optional[Dict[str, Any]]:
+        """
+        根据元运与坐山获取宅盘规则（每次新建，调用方可自由修改）
+        """
+        return self.house_table().rule(period, sitting_mountain)
+
+    def verify_house_table(self) -> Dict[str, Any]:
+        """
+        用生成表核对随包发布的 flying_stars_house.json，见 HouseChartTable.verify
+        """
+        return self.house_table().verify(self.data_loader.get_shipped_flying_star_house_rules())
+
+    def _base_chart(self) -> Optional[Dict[str, Any]]:
+        if self._base is None:
+            flying_stars = self.data_loader.get_flying_stars()
+            if flying_stars:
+                self._base = min(flying_stars, key=lambda x: x['year'])
+        return self._base
+
+    def _compute_annual_chart(self, year: int) -> Optional[Dict[str, Any]]:
+        """
+        使用规则推算飞星年盘（基于最早年份的基准盘逐年递减）
+        """
+        base = self._base_chart()
+        if not base:
+            return None
+
+        base_year = base['year']
+        delta = year - base_year
+
+        return {
+            "year": year,
+            "central_star": shift_star(base['central_star'], delta),
+            "palace_map": shift_palace_map(base['palace_map'], delta),
+            "source_ref": base.get("source_ref", "cinii_dili_bianzheng_shu"),
+            "computed": True,
+            "base_year": base_year
+        }
+
+
+def _copy_annual_chart(chart: Dict[str, Any]) -> Dict[str, Any]:
+    """年盘副本：记忆表中的条目不随调用方修改而变化"""
+    return dict(chart, palace_map=dict(chart['palace_map']))
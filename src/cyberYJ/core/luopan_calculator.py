@@ -4,10 +4,20 @@
 提供坐向解析、宅卦计算和吉凶方位查询功能。
 """
 
-import re
-from typing import Dict, List, Optional, Any
-from datetime import datetime
-
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Union
+from datetime import date, datetime
+
+from .direction_grammar import (
+    COMPASS_DEGREES,
+    KIND_DEGREE,
+    DirectionMatch,
+    build_mountain_centres,
+    match_direction,
+    normalize_direction,
+)
+from .luopan_rings import LuopanRingEngine
+from .magnetic_declination import MagneticDeclinationModel
 from ..utils.data_loader import get_data_loader, DataLoader
 
 
@@ -15,16 +25,27 @@ class LuopanCalculator:
     """罗盘计算器，负责坐向解析、宅卦计算和吉凶方位查询"""
 
     # 方位映射（中文方位到角度）
-    DIRECTION_MAP = {
-        '北': 0,
-        '东北': 45,
-        '东': 90,
-        '东南': 135,
-        '南': 180,
-        '西南': 225,
-        '西': 270,
-        '西北': 315,
+    DIRECTION_MAP = COMPASS_DEGREES
+
+    # 命卦数字到八卦的映射（洛书九宫；5 不存在，男为坤，女为艮）
+    NUMBER_TO_GUA = {
+        1: '坎',
+        2: '坤',
+        3: '震',
+        4: '巽',
+        6: '乾',
+        7: '兑',
+        8: '艮',
+        9: '离',
     }
+    FIVE_GUA = {'male': '坤', 'female': '艮'}
+
+    # 东四卦 / 西四卦
+    DONG_SI_GUA = frozenset(['震', '巽', '离', '坎'])
+    XI_SI_GUA = frozenset(['乾', '坤', '艮', '兑'])
+
+    # 坐向解析结果缓存条数（按规范化后的输入字符串）
+    DIRECTION_CACHE_SIZE = 1024
 
     # 八卦与方位组的映射
     GUA_DIRECTION_MAP = {
@@ -58,8 +79,21 @@ class LuopanCalculator:
             data_loader: 数据加载器实例，默认使用全局单例
         """
         self.data_loader = data_loader or get_data_loader()
+        self._ring_engine: Optional[LuopanRingEngine] = None
+        self._mountain_centres: Optional[Dict[str, float]] = None
+        self._declination_model: Optional[MagneticDeclinationModel] = None
+        # 每个实例独立缓存（结果依赖本实例的罗盘数据）
+        self._parse_normalized = lru_cache(maxsize=self.DIRECTION_CACHE_SIZE)(
+            self._parse_normalized_uncached
+        )
 
-    def parse_sitting_direction(self, direction_str: str) -> Dict[str, Any]:
+    def parse_sitting_direction(
+        self,
+        direction_str: str,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        survey_date: Optional[Union[date, datetime]] = None
+    ) -> Dict[str, Any]:
         """
         解析坐向输入，支持多种格式
 
@@ -68,8 +102,17 @@ class LuopanCalculator:
         - 角度格式："坐340向160"、"坐340度"
         - 干支格式："坐亥向巳"、"坐壬向丙"
 
+        解析前先做 NFKC 规范化并去除全部空白，因此全角数字（"坐３４０度"）
+        和夹带空格的写法（" 坐 亥向巳 "）与对应的半角、紧凑写法等价。
+
+        提供经纬度时，角度格式视为手机罗盘的磁北读数，按离线地磁模型修正为真北；
+        中文方位与干支山向本身即以真北为准，不做修正。
+
         Args:
             direction_str: 坐向描述字符串
+            latitude: 测量地点纬度（可选，须与经度同时提供）
+            longitude: 测量地点经度（可选）
+            survey_date: 测量日期，默认今天
 
         Returns:
             包含以下字段的字典：
@@ -79,68 +122,69 @@ class LuopanCalculator:
             - facing_mountain: 向山名称
             - sitting_direction_group: 坐向方位组（如"北"、"西北"）
             - facing_direction_group: 朝向方位组
+            做了磁偏角修正时另含：
+            - magnetic_declination: 磁偏角（度，东偏为正）
+            - magnetic_sitting_degree / magnetic_facing_degree: 修正前的磁北读数
+            - declination_model: 地磁模型名称
 
         Raises:
-            ValueError: 无法解析的坐向格式
+            ValueError: 无法解析的坐向格式、经纬度不完整或超出地磁模型适用范围
         """
-        direction_str = direction_str.strip()
-
-        # 尝试解析中文方位描述（坐北朝南）
-        match = re.match(r'坐([东西南北]+)(?:朝|向)([东西南北]+)', direction_str)
-        if match:
-            sitting_dir = match.group(1)
-            facing_dir = match.group(2)
-
-            if sitting_dir in self.DIRECTION_MAP and facing_dir in self.DIRECTION_MAP:
-                sitting_degree = self.DIRECTION_MAP[sitting_dir]
-                facing_degree = self.DIRECTION_MAP[facing_dir]
-
-                return self._build_direction_result(sitting_degree, facing_degree)
-
-        # 尝试解析角度格式（坐340向160 或 坐340度）
-        match = re.match(r'坐(\d+(?:\.\d+)?)(?:度|向(\d+(?:\.\d+)?))?', direction_str)
-        if match:
-            sitting_degree = float(match.group(1))
-            if match.group(2):
-                facing_degree = float(match.group(2))
-            else:
-                # 只有坐向，计算朝向（相差180度）
-                facing_degree = (sitting_degree + 180) % 360
-
-            return self._build_direction_result(sitting_degree, facing_degree)
-
-        # 尝试解析干支格式（坐亥向巳）
-        match = re.match(r'坐([^向]+)(?:向(.+))?', direction_str)
-        if match:
-            sitting_mountain_name = match.group(1)
-            facing_mountain_name = match.group(2) if match.group(2) else None
-
-            # 查找坐山
-            sitting_mountain = self.data_loader.get_luopan_by_name(sitting_mountain_name)
-            if sitting_mountain:
-                # 使用山向的中心角度
-                sitting_degree = (sitting_mountain['start_deg'] + sitting_mountain['end_deg']) / 2
-                # 处理跨越0度的情况
-                if sitting_mountain['start_deg'] > sitting_mountain['end_deg']:
-                    sitting_degree = (sitting_mountain['start_deg'] + sitting_mountain['end_deg'] + 360) / 2
-                    sitting_degree = sitting_degree % 360
-
-                # 如果指定了向山，使用向山的中心角度
-                if facing_mountain_name:
-                    facing_mountain = self.data_loader.get_luopan_by_name(facing_mountain_name)
-                    if facing_mountain:
-                        facing_degree = (facing_mountain['start_deg'] + facing_mountain['end_deg']) / 2
-                        if facing_mountain['start_deg'] > facing_mountain['end_deg']:
-                            facing_degree = (facing_mountain['start_deg'] + facing_mountain['end_deg'] + 360) / 2
-                            facing_degree = facing_degree % 360
-                    else:
-                        facing_degree = (sitting_degree + 180) % 360
-                else:
-                    facing_degree = (sitting_degree + 180) % 360
-
-                return self._build_direction_result(sitting_degree, facing_degree)
-
-        raise ValueError(f"无法解析的坐向格式: {direction_str}")
+        normalized = normalize_direction(direction_str)
+        cached = self._parse_normalized(normalized)
+        if cached is None:
+            raise ValueError(f"无法解析的坐向格式: {direction_str.strip()}")
+        match, result = cached
+
+        if latitude is None and longitude is None:
+            return dict(result)
+        if latitude is None or longitude is None:
+            raise ValueError("纬度与经度须同时提供")
+        # 只有角度读数需要修正，其余格式不查地磁模型（也不受其适用年份限制）
+        if match.kind != KIND_DEGREE:
+            return dict(result)
+        model = self.declination_model
+        declination = model.declination(latitude, longitude, survey_date)
+
+        corrected = self._build_direction_result(
+            match.sitting_degree + declination,
+            match.facing_degree + declination
+        )
+        corrected.update({
+            'magnetic_declination': round(declination, 2),
+            'magnetic_sitting_degree': result['sitting_degree'],
+            'magnetic_facing_degree': result['facing_degree'],
+            'declination_model': model.name,
+        })
+        return corrected
+
+    @property
+    def declination_model(self) -> MagneticDeclinationModel:
+        """离线磁偏角模型（首次使用时加载）"""
+        if self._declination_model is None:
+            self._declination_model = MagneticDeclinationModel(self.data_loader)
+        return self._declination_model
+
+    def direction_cache_info(self):
+        """坐向解析 LRU 缓存统计（functools.lru_cache 的 CacheInfo）"""
+        return self._parse_normalized.cache_info()
+
+    @property
+    def mountain_centres(self) -> Dict[str, float]:
+        """二十四山中心角度表（首次使用时计算）"""
+        if self._mountain_centres is None:
+            self._mountain_centres = build_mountain_centres(self.data_loader.get_luopan())
+        return self._mountain_centres
+
+    def _parse_normalized_uncached(
+        self,
+        normalized: str
+    ) -> Optional[Tuple[DirectionMatch, Dict[str, Any]]]:
+        """按共享文法解析规范化后的坐向描述，无法解析返回 None"""
+        match = match_direction(normalized, self.mountain_centres)
+        if match is None:
+            return None
+        return match, self._build_direction_result(match.sitting_degree, match.facing_degree)
 
     def _build_direction_result(
         self,
@@ -187,6 +231,20 @@ class LuopanCalculator:
         """
         return self.data_loader.get_luopan_by_degree(degree)
 
+    def get_rings_by_degree(self, degree: float) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        查询角度在罗盘各层（二十四山、七十二龙、百二十分金、三百八十四爻）所处的区间
+
+        Args:
+            degree: 角度（0-360度，0度=正北）
+
+        Returns:
+            {层 id: 区间数据}，层 id 为 mountains_24 / dragons_72 / fen_jin_120 / yao_384
+        """
+        if self._ring_engine is None:
+            self._ring_engine = LuopanRingEngine(data_loader=self.data_loader)
+        return self._ring_engine.lookup(degree)
+
     def calculate_house_gua(self, sitting_degree: float) -> str:
         """
         根据坐向角度计算宅卦
@@ -282,35 +340,14 @@ class LuopanCalculator:
         if gua_number == 0:
             gua_number = 9
 
-        # 数字到八卦的映射（洛书九宫）
-        number_to_gua = {
-            1: '坎',
-            2: '坤',
-            3: '震',
-            4: '巽',
-            # 5 不存在，男为坤，女为艮
-            6: '乾',
-            7: '兑',
-            8: '艮',
-            9: '离',
-        }
-
         # 处理5的特殊情况
         if gua_number == 5:
-            ming_gua = '坤' if gender == 'male' else '艮'
+            ming_gua = self.FIVE_GUA[gender]
         else:
-            ming_gua = number_to_gua[gua_number]
+            ming_gua = self.NUMBER_TO_GUA[gua_number]
 
         # 确定东四命还是西四命
-        # 东四命：震、巽、离、坎
-        # 西四命：乾、坤、艮、兑
-        dong_si = ['震', '巽', '离', '坎']
-        xi_si = ['乾', '坤', '艮', '兑']
-
-        if ming_gua in dong_si:
-            group = '东四命'
-        else:
-            group = '西四命'
+        group = '东四命' if ming_gua in self.DONG_SI_GUA else '西四命'
 
         return {
             'ming_gua': ming_gua,
@@ -342,12 +379,9 @@ class LuopanCalculator:
         house_gua_name = house_gua.replace('宅', '')
 
         # 确定宅卦所属组
-        dong_si_house = ['震', '巽', '离', '坎']
-        xi_si_house = ['乾', '坤', '艮', '兑']
-
-        if house_gua_name in dong_si_house:
+        if house_gua_name in self.DONG_SI_GUA:
             house_group = '东四宅'
-        elif house_gua_name in xi_si_house:
+        elif house_gua_name in self.XI_SI_GUA:
             house_group = '西四宅'
         else:
             raise ValueError(f"未知的宅卦: {house_gua}")
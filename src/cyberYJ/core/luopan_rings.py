@@ -0,0 +1,171 @@
+"""
+罗盘多层查询模块
+
+每一层（二十四山、七十二龙、百二十分金、三百八十四爻……）都是按角度划分的一组区间。
+引擎取所有区间端点的公共细分步长（各层端点的最大公约数，如 1/16°）建立网格，
+预先算好每个网格点与每个网格开区间在各层命中的区间，查询任意角度只需一次取整和一次下标。
+端点命中规则与 DataLoader.get_luopan_by_degree 一致：闭区间、按列表顺序取首个命中。
+"""
+
+from fractions import Fraction
+from functools import reduce
+from math import gcd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..utils.data_loader import DataLoader, get_data_loader
+
+
+# 网格格数上限，超出时（端点不可公约）退化为逐层扫描
+MAX_GRID_CELLS = 360 * 3600
+
+MOUNTAIN_RING_ID = "mountains_24"
+
+
+def _scan(segments: Sequence[Dict[str, Any]], degree: float) -> Optional[int]:
+    """逐区间扫描，返回首个命中的下标"""
+    for index, segment in enumerate(segments):
+        start = segment['start_deg']
+        end = segment['end_deg']
+        if start > end:
+            if degree >= start or degree <= end:
+                return index
+        elif start <= degree <= end:
+            return index
+    return None
+
+
+def _as_fraction(value: float) -> Fraction:
+    """端点的精确有理值（浮点数本身即二进制有理数，不做近似，避免网格与扫描结果不一致）"""
+    return Fraction(value)
+
+
+class LuopanRingEngine:
+    """罗盘多层查询引擎"""
+
+    def __init__(
+        self,
+        rings: Optional[Sequence[Dict[str, Any]]] = None,
+        data_loader: Optional[DataLoader] = None
+    ):
+        """
+        初始化并预计算查询网格
+
+        Args:
+            rings: 层定义列表，每层含 id、name、segments（start_deg/end_deg）；
+                默认加载二十四山与 luopan_rings.json 中的全部细分层
+            data_loader: 数据加载器实例，默认使用全局单例
+        """
+        if rings is None:
+            loader = data_loader or get_data_loader()
+            rings = [
+                {"id": MOUNTAIN_RING_ID, "name": "二十四山", "segments": loader.get_luopan()}
+            ] + list(loader.get_luopan_rings().get("rings", []))
+
+        self.rings: Tuple[Dict[str, Any], ...] = tuple(rings)
+        self.ring_ids: Tuple[str, ...] = tuple(ring['id'] for ring in self.rings)
+        self._ring_index = {ring_id: i for i, ring_id in enumerate(self.ring_ids)}
+
+        self.step: Optional[Fraction] = self._grid_step()
+        self._at_point: List[Tuple[Optional[int], ...]] = []
+        self._inside: List[Tuple[Optional[int], ...]] = []
+        if self.step is not None:
+            self._build_grid()
+
+    @property
+    def grid_cells(self) -> int:
+        """网格格数（退化为扫描时为 0）"""
+        return len(self._inside)
+
+    def lookup(self, degree: float) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        查询角度在各层所处的区间
+
+        Args:
+            degree: 角度（任意实数，按 360 取模）
+
+        Returns:
+            {层 id: 区间数据（未命中为 None）}
+        """
+        indices = self._indices(degree)
+        return {
+            ring_id: (self.rings[i]['segments'][index] if index is not None else None)
+            for i, (ring_id, index) in enumerate(zip(self.ring_ids, indices))
+        }
+
+    def lookup_ring(self, ring_id: str, degree: float) -> Optional[Dict[str, Any]]:
+        """
+        查询单层
+
+        Raises:
+            KeyError: 层不存在
+        """
+        i = self._ring_index[ring_id]
+        index = self._indices(degree)[i]
+        return self.rings[i]['segments'][index] if index is not None else None
+
+    def _indices(self, degree: float) -> Tuple[Optional[int], ...]:
+        degree = degree % 360
+        if self.step is None:
+            return tuple(_scan(ring['segments'], degree) for ring in self.rings)
+
+        position = degree / self._step_float
+        cell = int(position)
+        if cell == position:
+            return self._at_point[cell]
+        if cell >= len(self._inside):
+            cell = len(self._inside) - 1
+        return self._inside[cell]
+
+    def _grid_step(self) -> Optional[Fraction]:
+        """所有端点与 360 的公共细分步长，格数超限返回 None"""
+        points = {Fraction(360)}
+        for ring in self.rings:
+            for segment in ring['segments']:
+                points.add(_as_fraction(segment['start_deg']))
+                points.add(_as_fraction(segment['end_deg']))
+        points.discard(Fraction(0))
+
+        denominator = reduce(lambda a, b: a * b // gcd(a, b), (p.denominator for p in points), 1)
+        numerator = reduce(gcd, (int(p * denominator) for p in points))
+        step = Fraction(numerator, denominator)
+        if 360 / step > MAX_GRID_CELLS:
+            return None
+        return step
+
+    def _build_grid(self) -> None:
+        """
+        逐层填充网格
+
+        开区间格按区间倒序填充，列表靠前的区间最后写入，即首个命中；
+        网格点上可能命中的只有左右相邻两格的区间，取下标较小者。
+        """
+        cells = int(360 / self.step)
+        self._step_float = float(self.step)
+        at_point_columns = []
+        inside_columns = []
+        for ring in self.rings:
+            segments = ring['segments']
+            inside: List[Optional[int]] = [None] * cells
+            for index in range(len(segments) - 1, -1, -1):
+                start_deg, end_deg = segments[index]['start_deg'], segments[index]['end_deg']
+                start = int(_as_fraction(start_deg % 360) / self.step)
+                end = int(_as_fraction(end_deg % 360) / self.step)
+                if end < start or (end == start and start_deg != end_deg):
+                    end += cells
+                for cell in range(start, end):
+                    inside[cell % cells] = index
+
+            at_point: List[Optional[int]] = []
+            for cell in range(cells):
+                left = inside[cell - 1]
+                # 0° 左侧的区间只有跨 0° 的区间才包含 0°
+                if cell == 0 and left is not None and segments[left]['start_deg'] <= segments[left]['end_deg']:
+                    left = None
+                candidates = [index for index in (left, inside[cell]) if index is not None]
+                at_point.append(min(candidates) if candidates else None)
+
+            at_point_columns.append(at_point)
+            inside_columns.append(inside)
+
+        self._at_point = list(zip(*at_point_columns))
+        self._inside = list(zip(*inside_columns))
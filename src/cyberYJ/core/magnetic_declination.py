@@ -0,0 +1,242 @@
+"""
+磁偏角计算模块
+
+手机罗盘读数以磁北为零度，二十四山以真北为准，每山只有 15°，磁偏角不可忽略。
+本模块用随包发布的世界地磁模型（WMM）球谐系数离线计算磁偏角：
+- compute：按模型在任意经纬度直接求值（海平面高度）
+- declination：在经纬度网格上插值，网格角点按需计算并缓存，附近位置重复查询只做插值；
+  高纬度或网格内变化剧烈（磁极附近）时退回直接求值
+东偏为正，真北方位 = 磁北方位 + 磁偏角。
+"""
+
+import math
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..utils.data_loader import DataLoader, get_data_loader
+
+
+# WGS84 椭球与地磁参考球半径（km）
+WGS84_A = 6378.137
+WGS84_F = 1 / 298.257223563
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+GEOMAGNETIC_REFERENCE_RADIUS = 6371.2
+
+
+def decimal_year(when: Union[date, datetime]) -> float:
+    """日期 → 小数年（如 2026-07-02 → 2026.5）"""
+    if isinstance(when, datetime):
+        when = when.date()
+    start = date(when.year, 1, 1)
+    days_in_year = (date(when.year + 1, 1, 1) - start).days
+    return when.year + (when - start).days / days_in_year
+
+
+def _schmidt_factors(max_degree: int) -> List[List[float]]:
+    """施密特准归一化因子"""
+    factors = [[0.0] * (max_degree + 1) for _ in range(max_degree + 1)]
+    factors[0][0] = 1.0
+    for n in range(1, max_degree + 1):
+        factors[n][0] = factors[n - 1][0] * (2 * n - 1) / n
+        for m in range(1, n + 1):
+            factors[n][m] = factors[n][m - 1] * math.sqrt((n - m + 1) * (2 if m == 1 else 1) / (n + m))
+    return factors
+
+
+class MagneticDeclinationModel:
+    """离线磁偏角模型"""
+
+    # 网格步长（度）与时间分桶（年）：步长 1° 时插值误差远小于 0.1°
+    GRID_STEP = 1.0
+    EPOCH_STEP = 0.1
+    # 缓存的网格角点数
+    CORNER_CACHE_SIZE = 8192
+    # 高纬度地区磁偏角变化剧烈，直接求值不插值
+    POLAR_LATITUDE = 80.0
+    # 网格四角磁偏角相差超过该值（度，如磁极附近）时直接求值
+    MAX_CORNER_SPREAD = 1.0
+
+    def __init__(
+        self,
+        data_loader: Optional[DataLoader] = None,
+        grid_step: Optional[float] = None
+    ):
+        """
+        初始化磁偏角模型
+
+        Args:
+            data_loader: 数据加载器实例，默认使用全局单例
+            grid_step: 插值网格步长（度），默认 GRID_STEP
+        """
+        loader = data_loader or get_data_loader()
+        model = loader.get_magnetic_model()
+        self.name: str = model['model']
+        self.epoch: float = float(model['epoch'])
+        self.valid_until: float = float(model['valid_until'])
+        self.source_ref = model.get('source_ref')
+        self.grid_step = grid_step or self.GRID_STEP
+        if not 0 < self.grid_step <= 10:
+            raise ValueError(f"网格步长必须在 (0, 10] 度之间: {self.grid_step}")
+
+        self.max_degree: int = int(model['max_degree'])
+        factors = _schmidt_factors(self.max_degree)
+        # 系数预乘施密特因子：(n, m, g, h, g_dot, h_dot)
+        self._coefficients: Tuple[Tuple[int, int, float, float, float, float], ...] = tuple(
+            (n, m, g * factors[n][m], h * factors[n][m], g_dot * factors[n][m], h_dot * factors[n][m])
+            for n, m, g, h, g_dot, h_dot in model['coefficients']
+        )
+        self._corner = lru_cache(maxsize=self.CORNER_CACHE_SIZE)(self._corner_uncached)
+
+    def declination(
+        self,
+        latitude: float,
+        longitude: float,
+        when: Optional[Union[date, datetime]] = None
+    ) -> float:
+        """
+        磁偏角（网格插值，东偏为正）
+
+        Args:
+            latitude: 纬度（-90 到 90，北纬为正）
+            longitude: 经度（东经为正）
+            when: 观测日期，默认今天
+
+        Returns:
+            磁偏角（度）
+
+        Raises:
+            ValueError: 纬度越界或日期超出模型有效期
+        """
+        year = self._year(when)
+        self._check_latitude(latitude)
+        if abs(latitude) > self.POLAR_LATITUDE:
+            return self._evaluate(latitude, longitude, year)
+
+        bucket = round(year / self.EPOCH_STEP)
+        step = self.grid_step
+        lat_pos = (latitude + 90) / step
+        lon_pos = ((longitude + 180) % 360) / step
+        i, j = int(lat_pos), int(lon_pos)
+        u, v = lat_pos - i, lon_pos - j
+
+        d00 = self._corner(i, j, bucket)
+        d01 = self._unwrap(self._corner(i, j + 1, bucket), d00)
+        d10 = self._unwrap(self._corner(i + 1, j, bucket), d00)
+        d11 = self._unwrap(self._corner(i + 1, j + 1, bucket), d00)
+        corners = (d00, d01, d10, d11)
+        if max(corners) - min(corners) > self.MAX_CORNER_SPREAD:
+            return self._evaluate(latitude, longitude, year)
+        value = (
+            d00 * (1 - u) * (1 - v) + d01 * (1 - u) * v +
+            d10 * u * (1 - v) + d11 * u * v
+        )
+        return (value + 180) % 360 - 180
+
+    def compute(
+        self,
+        latitude: float,
+        longitude: float,
+        when: Optional[Union[date, datetime]] = None
+    ) -> float:
+        """
+        磁偏角（直接按模型求值，不经网格）
+
+        Raises:
+            ValueError: 纬度越界或日期超出模型有效期
+        """
+        self._check_latitude(latitude)
+        return self._evaluate(latitude, longitude, self._year(when))
+
+    def cache_info(self):
+        """网格角点缓存统计（functools.lru_cache 的 CacheInfo）"""
+        return self._corner.cache_info()
+
+    def info(self) -> Dict[str, Any]:
+        """模型名称、历元与有效期"""
+        return {
+            "model": self.name,
+            "epoch": self.epoch,
+            "valid_until": self.valid_until,
+            "source_ref": self.source_ref,
+        }
+
+    def _year(self, when: Optional[Union[date, datetime]]) -> float:
+        year = decimal_year(when or date.today())
+        if not self.epoch <= year < self.valid_until:
+            raise ValueError(
+                # 有效期为 [epoch, valid_until)，按整年表述
+                f"磁偏角模型 {self.name} 仅适用于 "
+                f"{math.floor(self.epoch)}-{math.ceil(self.valid_until) - 1} 年: {year:.2f}"
+            )
+        return year
+
+    @staticmethod
+    def _check_latitude(latitude: float) -> None:
+        if not -90 <= latitude <= 90:
+            raise ValueError(f"纬度必须在 -90 到 90 之间: {latitude}")
+
+    @staticmethod
+    def _unwrap(value: float, reference: float) -> float:
+        """角度插值时消除 ±180° 跳变"""
+        return reference + (value - reference + 180) % 360 - 180
+
+    def _corner_uncached(self, i: int, j: int, bucket: int) -> float:
+        step = self.grid_step
+        return self._evaluate(-90 + i * step, -180 + j * step, bucket * self.EPOCH_STEP)
+
+    def _evaluate(self, latitude: float, longitude: float, year: float) -> float:
+        """球谐展开求地磁场水平分量，返回磁偏角"""
+        # 两极处水平分量方向无定义，取极点附近
+        latitude = max(min(latitude, 89.999), -89.999)
+        phi = math.radians(latitude)
+        lam = math.radians(longitude)
+
+        # 大地坐标 → 地心球坐标
+        sin_phi = math.sin(phi)
+        rc = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_phi * sin_phi)
+        p = rc * math.cos(phi)
+        z = rc * (1 - WGS84_E2) * sin_phi
+        r = math.hypot(p, z)
+        phi_c = math.asin(z / r)
+        cos_theta = math.sin(phi_c)
+        sin_theta = math.cos(phi_c)
+
+        # 高斯归一化缔合勒让德函数及其对余纬的导数
+        size = self.max_degree + 1
+        P = [[0.0] * size for _ in range(size)]
+        dP = [[0.0] * size for _ in range(size)]
+        P[0][0] = 1.0
+        for n in range(1, size):
+            for m in range(n + 1):
+                if n == m:
+                    P[n][m] = sin_theta * P[n - 1][m - 1]
+                    dP[n][m] = sin_theta * dP[n - 1][m - 1] + cos_theta * P[n - 1][m - 1]
+                elif n == 1 or m == n - 1:
+                    P[n][m] = cos_theta * P[n - 1][m]
+                    dP[n][m] = cos_theta * dP[n - 1][m] - sin_theta * P[n - 1][m]
+                else:
+                    k = ((n - 1) ** 2 - m * m) / ((2 * n - 1) * (2 * n - 3))
+                    P[n][m] = cos_theta * P[n - 1][m] - k * P[n - 2][m]
+                    dP[n][m] = cos_theta * dP[n - 1][m] - sin_theta * P[n - 1][m] - k * dP[n - 2][m]
+
+        dt = year - self.epoch
+        ratio = GEOMAGNETIC_REFERENCE_RADIUS / r
+        cos_m = [math.cos(m * lam) for m in range(size)]
+        sin_m = [math.sin(m * lam) for m in range(size)]
+
+        north = east = down = 0.0
+        for n, m, g, h, g_dot, h_dot in self._coefficients:
+            gt = g + dt * g_dot
+            ht = h + dt * h_dot
+            scale = ratio ** (n + 2)
+            along = gt * cos_m[m] + ht * sin_m[m]
+            north += scale * along * dP[n][m]
+            east += scale * m * (gt * sin_m[m] - ht * cos_m[m]) * P[n][m]
+            down -= scale * (n + 1) * along * P[n][m]
+        east /= sin_theta
+
+        # 地心 → 大地坐标（只需北向分量）
+        psi = phi_c - phi
+        north = north * math.cos(psi) - down * math.sin(psi)
+        return math.degrees(math.atan2(east, north))
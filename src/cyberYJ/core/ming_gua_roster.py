@@ -0,0 +1,225 @@
+"""
+命卦名册向量化计算模块
+
+对一户人家或整批租户一次性计算命卦数字、命卦、东西四命，
+并与候选宅卦做宅命匹配，汇总每个宅卦的适配得分。
+计算规则与 LuopanCalculator.calculate_ming_gua / check_house_compatibility 保持一致。
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .luopan_calculator import LuopanCalculator
+
+
+# 八卦顺序（命卦、宅卦均以此下标表示）
+GUA_ORDER = ('坎', '坤', '震', '巽', '乾', '兑', '艮', '离')
+
+
+def _require_numpy() -> None:
+    if not NUMPY_AVAILABLE:
+        raise ImportError("NumPy 未安装，请运行: pip install numpy")
+
+
+def _gua_tables() -> Tuple["np.ndarray", "np.ndarray"]:
+    """命卦数字 → 八卦下标（男、女两张表，下标 0 不使用）"""
+    male = np.full(10, -1, dtype=np.int8)
+    female = np.full(10, -1, dtype=np.int8)
+    for number, gua in LuopanCalculator.NUMBER_TO_GUA.items():
+        male[number] = female[number] = GUA_ORDER.index(gua)
+    male[5] = GUA_ORDER.index(LuopanCalculator.FIVE_GUA['male'])
+    female[5] = GUA_ORDER.index(LuopanCalculator.FIVE_GUA['female'])
+    return male, female
+
+
+def _birth_years(birth_dates: Any) -> "np.ndarray":
+    """生日数组（YYYY-MM-DD 字符串 / date / datetime / datetime64 / 整数年份）→ 年份数组"""
+    if not isinstance(birth_dates, np.ndarray):
+        birth_dates = list(birth_dates)
+        if birth_dates and isinstance(birth_dates[0], (int, np.integer)):
+            return np.asarray(birth_dates, dtype=np.int64)
+        if birth_dates and isinstance(birth_dates[0], date):
+            # date / datetime 只取年份，逐个转换 datetime64 反而更慢
+            try:
+                return np.fromiter((d.year for d in birth_dates), dtype=np.int64, count=len(birth_dates))
+            except AttributeError as e:
+                raise ValueError(f"生日格式错误: {e}")
+    elif birth_dates.dtype.kind in 'iu':
+        return birth_dates.astype(np.int64)
+
+    # 直接按 datetime64[D] 解析，避免先转成字符串数组
+    try:
+        days = np.array(birth_dates, dtype='datetime64[D]')
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"生日格式错误: {e}")
+    if np.isnat(days).any():
+        raise ValueError("生日不能为空")
+    return days.astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+def _male_mask(genders: Union[str, Sequence[str]], size: int) -> "np.ndarray":
+    values = np.asarray(genders)
+    if values.ndim == 0:
+        values = np.full(size, values.item())
+    if values.shape != (size,):
+        raise ValueError(f"性别数量({values.size})与生日数量({size})不一致")
+    male = values == 'male'
+    if not (male | (values == 'female')).all():
+        raise ValueError("性别必须是 'male' 或 'female'")
+    return male
+
+
+def ming_gua_numbers(birth_years: "np.ndarray", male: "np.ndarray") -> "np.ndarray":
+    """
+    批量计算命卦数字（1-9）
+
+    男命 (100 - 年份后两位) % 9，女命 (年份后两位 - 4) % 9，结果为 0 记为 9。
+    """
+    _require_numpy()
+    last_two = np.asarray(birth_years) % 100
+    numbers = np.where(male, (100 - last_two) % 9, (last_two - 4) % 9)
+    numbers[numbers == 0] = 9
+    return numbers
+
+
+@dataclass
+class RosterFit:
+    """
+    名册宅命匹配结果
+
+    Attributes:
+        birth_years: 出生年份
+        male: 是否男命
+        ming_numbers: 命卦数字（1-9）
+        ming_gua_index: 命卦在 GUA_ORDER 中的下标
+        house_guas: 候选宅卦（如“坎宅”）
+        compatibility: (成员, 宅卦) 宅命相配矩阵
+        exact: (成员, 宅卦) 命卦与宅卦相同（伏位）矩阵
+        weights: 成员权重
+    """
+
+    birth_years: Any
+    male: Any
+    ming_numbers: Any
+    ming_gua_index: Any
+    house_guas: Tuple[str, ...]
+    compatibility: Any
+    exact: Any
+    weights: Any
+
+    def members(self) -> List[Dict[str, Any]]:
+        """逐人命卦（结构同 LuopanCalculator.calculate_ming_gua）"""
+        east = LuopanCalculator.DONG_SI_GUA
+        result = []
+        for year, gua_index in zip(self.birth_years.tolist(), self.ming_gua_index.tolist()):
+            ming_gua = GUA_ORDER[gua_index]
+            result.append({
+                'ming_gua': ming_gua,
+                'ming_gua_house': f"{ming_gua}宅",
+                'group': '东四命' if ming_gua in east else '西四命',
+                'birth_year': year,
+            })
+        return result
+
+    def house_scores(self) -> List[Dict[str, Any]]:
+        """
+        各候选宅卦的汇总适配得分，按得分降序
+
+        Returns:
+            每项包含：
+            - house_gua / house_group
+            - compatible_count: 相配人数
+            - exact_count: 命卦与宅卦相同（伏位）的人数
+            - fit_score: 相配成员权重占比（0-1）
+        """
+        total_weight = float(self.weights.sum())
+        compatible_weight = self.weights @ self.compatibility
+        compatible_count = self.compatibility.sum(axis=0)
+        exact_count = self.exact.sum(axis=0)
+
+        scores = []
+        for index, house_gua in enumerate(self.house_guas):
+            gua = house_gua.replace('宅', '')
+            scores.append({
+                'house_gua': house_gua,
+                'house_group': '东四宅' if gua in LuopanCalculator.DONG_SI_GUA else '西四宅',
+                'compatible_count': int(compatible_count[index]),
+                'exact_count': int(exact_count[index]),
+                'member_count': len(self.birth_years),
+                'fit_score': round(float(compatible_weight[index]) / total_weight, 4) if total_weight else 0.0,
+            })
+        scores.sort(key=lambda item: (-item['fit_score'], -item['exact_count']))
+        return scores
+
+
+def analyze_roster(
+    birth_dates: Any,
+    genders: Union[str, Sequence[str]] = 'male',
+    house_guas: Optional[Sequence[str]] = None,
+    weights: Optional[Sequence[float]] = None
+) -> RosterFit:
+    """
+    名册命卦与宅命匹配（一次向量运算）
+
+    Args:
+        birth_dates: 生日数组（YYYY-MM-DD 字符串、date、datetime64 或整数年份）
+        genders: 性别数组（'male'/'female'），传单个字符串时全员相同
+        house_guas: 候选宅卦，默认八个宅卦
+        weights: 成员权重（如户主加权），默认均为 1
+
+    Returns:
+        RosterFit 结果
+
+    Raises:
+        ImportError: 未安装 NumPy
+        ValueError: 生日、性别、宅卦或权重参数错误
+    """
+    _require_numpy()
+    years = _birth_years(birth_dates).reshape(-1)
+    if years.size == 0:
+        raise ValueError("名册不能为空")
+    male = _male_mask(genders, years.size)
+
+    if house_guas is None:
+        house_guas = [f"{gua}宅" for gua in GUA_ORDER]
+    house_guas = tuple(house_guas)
+    house_index = []
+    for house_gua in house_guas:
+        gua = house_gua.replace('宅', '')
+        if gua not in GUA_ORDER:
+            raise ValueError(f"未知的宅卦: {house_gua}")
+        house_index.append(GUA_ORDER.index(gua))
+    house_index = np.array(house_index, dtype=np.int8)
+
+    if weights is None:
+        member_weights = np.ones(years.size)
+    else:
+        member_weights = np.asarray(weights, dtype=float).reshape(-1)
+        if member_weights.shape != years.shape or (member_weights < 0).any():
+            raise ValueError("权重数量须与生日数量一致且不能为负")
+
+    numbers = ming_gua_numbers(years, male)
+    male_table, female_table = _gua_tables()
+    ming_index = np.where(male, male_table[numbers], female_table[numbers])
+
+    east_table = np.array([gua in LuopanCalculator.DONG_SI_GUA for gua in GUA_ORDER])
+    compatibility = east_table[ming_index][:, None] == east_table[house_index][None, :]
+    exact = ming_index[:, None] == house_index[None, :]
+
+    return RosterFit(
+        birth_years=years,
+        male=male,
+        ming_numbers=numbers,
+        ming_gua_index=ming_index,
+        house_guas=house_guas,
+        compatibility=compatibility,
+        exact=exact,
+        weights=member_weights,
+    )
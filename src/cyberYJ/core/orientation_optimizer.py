@@ -0,0 +1,241 @@
+"""
+最佳坐向搜索模块
+
+按给定分辨率扫描 0-360° 坐向角度，归并为二十四山等价类（同一坐山的宅卦、宅盘完全相同），
+再用向量化飞星评分与八宅宅命匹配为每个坐山打分并排序。
+一次搜索只做一次全盘飞星评分，不逐角度调用罗盘工具。
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # FlyingStarEngine 初始化时会给出安装提示
+    np = None
+
+from .flying_star_engine import LEVEL_AUSPICIOUS, LEVEL_INAUSPICIOUS, PALACES, FlyingStarEngine
+from .luopan_calculator import LuopanCalculator
+from ..utils.data_loader import DataLoader, get_data_loader
+
+
+class OrientationOptimizer:
+    """最佳坐向搜索器"""
+
+    # 建筑类型对 (坐宫山星, 向宫向星) 的权重：住宅重山星（人丁），商铺、办公室重向星（财气）
+    BUILDING_STAR_WEIGHTS = {
+        '住宅': (1.5, 1.0),
+        '办公室': (1.0, 1.5),
+        '商铺': (1.0, 1.5),
+        '工厂': (1.0, 1.0),
+    }
+    DEFAULT_STAR_WEIGHTS = (1.0, 1.0)
+
+    # 宅命相配 / 不配的加减分
+    BA_ZHAI_MATCH_SCORE = 4.0
+    BA_ZHAI_MISMATCH_SCORE = -4.0
+
+    def __init__(
+        self,
+        data_loader: Optional[DataLoader] = None,
+        engine: Optional[FlyingStarEngine] = None,
+        luopan_calculator: Optional[LuopanCalculator] = None
+    ):
+        """
+        初始化坐向搜索器
+
+        Args:
+            data_loader: 数据加载器实例，默认使用全局单例
+            engine: 飞星评分引擎，默认新建
+            luopan_calculator: 罗盘计算器，默认新建
+
+        Raises:
+            ImportError: 未安装 NumPy
+        """
+        self.data_loader = data_loader or get_data_loader()
+        self.engine = engine or FlyingStarEngine(self.data_loader)
+        self.luopan_calculator = luopan_calculator or LuopanCalculator(self.data_loader)
+        self.flying_star_tables = self.data_loader.get_flying_star_tables()
+
+        luopan = self.data_loader.get_luopan()
+        self._starts = np.array([m['start_deg'] for m in luopan], dtype=float)
+        self._ends = np.array([m['end_deg'] for m in luopan], dtype=float)
+        self._mountain_meta = [self._describe_mountain(m) for m in luopan]
+        self._sitting_palace = np.array(
+            [PALACES.index(meta['sitting_palace']) for meta in self._mountain_meta]
+        )
+        self._facing_palace = np.array(
+            [PALACES.index(meta['facing_palace']) for meta in self._mountain_meta]
+        )
+
+    def optimize(
+        self,
+        year: int,
+        building_type: str = '住宅',
+        owner_birth: Optional[Union[str, date]] = None,
+        gender: str = 'male',
+        resolution: float = 1.0,
+        top_n: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        搜索指定年份的最佳坐向
+
+        Args:
+            year: 流年年份
+            building_type: 建筑类型（住宅/办公室/商铺/工厂）
+            owner_birth: 宅主公历生日（YYYY-MM-DD 或 date），可选
+            gender: 宅主性别，'male' 或 'female'
+            resolution: 扫描角度步长（度），须在 (0, 15] 内
+            top_n: 只返回前 N 名，默认全部
+
+        Returns:
+            包含以下字段的字典：
+            - year / period / building_type / resolution
+            - ming_gua: 命卦信息（未提供生日为 None）
+            - rankings: 按总分降序的坐山列表
+
+        Raises:
+            ValueError: 分辨率越界、生日格式错误或该年缺少飞星数据
+        """
+        if not 0 < resolution <= 15:
+            raise ValueError(f"扫描分辨率必须在 (0, 15] 度之间: {resolution}")
+
+        flying_stars = self.flying_star_tables.annual_chart(year)
+        period_info = self.data_loader.get_flying_star_period_by_year(year)
+        if not flying_stars or not period_info:
+            raise ValueError(f"{year}年缺少流年飞星或元运数据")
+        period = period_info['period']
+
+        ming_gua = self._resolve_ming_gua(owner_birth, gender)
+
+        # 1. 扫描角度并归并到二十四山
+        degrees = np.arange(0.0, 360.0, resolution)
+        mountain_index = self._mountain_indices(degrees)
+        hit = mountain_index >= 0
+        counts = np.bincount(mountain_index[hit], minlength=len(self._mountain_meta))
+
+        # 2. 全部坐山的飞星评分（一次向量运算）
+        result = self.engine.score(flying_stars['palace_map'])
+        lists = result.palace_lists()
+        flying_scores = self._flying_star_scores(result, period, building_type)
+
+        # 3. 汇总、排序
+        rankings = []
+        for index in np.flatnonzero(counts):
+            meta = self._mountain_meta[index]
+            p_index, m_index = self.engine.index_of(period, meta['sitting_mountain'])
+            if not self.engine.rule_mask[p_index, m_index]:
+                continue
+
+            flying_score = float(flying_scores[m_index])
+            compatible = None
+            ba_zhai_score = 0.0
+            if ming_gua:
+                compatible = self.luopan_calculator.check_house_compatibility(
+                    meta['house_gua'], ming_gua
+                )['compatible']
+                ba_zhai_score = self.BA_ZHAI_MATCH_SCORE if compatible else self.BA_ZHAI_MISMATCH_SCORE
+
+            auspicious, inauspicious = lists[(period, meta['sitting_mountain'])]
+            rankings.append({
+                "rank": None,
+                "sitting_mountain": meta['sitting_mountain'],
+                "facing_mountain": meta['facing_mountain'],
+                "house_gua": meta['house_gua'],
+                "sitting_degree": meta['sitting_degree'],
+                "degree_range": meta['degree_range'],
+                "sweep_points": int(counts[index]),
+                "score": round(flying_score + ba_zhai_score, 2),
+                "flying_star_score": round(flying_score, 2),
+                "ba_zhai_score": ba_zhai_score,
+                "compatible": compatible,
+                "current_auspicious_positions": auspicious,
+                "current_inauspicious_positions": inauspicious,
+            })
+
+        rankings.sort(
+            key=lambda r: (-r['score'], -len(r['current_auspicious_positions']), len(r['current_inauspicious_positions']))
+        )
+        for rank, item in enumerate(rankings, start=1):
+            item['rank'] = rank
+
+        return {
+            "year": year,
+            "period": period,
+            "building_type": building_type,
+            "resolution": resolution,
+            "ming_gua": ming_gua,
+            "rankings": rankings[:top_n] if top_n else rankings,
+        }
+
+    def _flying_star_scores(self, result: Any, period: int, building_type: str) -> "np.ndarray":
+        """
+        某一元运下 24 山的飞星得分
+
+        坐宫山星、向宫向星按建筑类型加权计分，再加上全盘吉宫数减凶宫数。
+        （九宫的山星、向星各是 1-9 的一个排列，逐宫求和对所有宅盘都相同，因此只看坐、向两宫。）
+        """
+        engine = self.engine
+        mountain_weight, facing_weight = self.BUILDING_STAR_WEIGHTS.get(building_type, self.DEFAULT_STAR_WEIGHTS)
+        p_index = engine.periods.index(period)
+        mountains = np.arange(len(engine.mountains))
+
+        house_stars = engine.house_stars[p_index]  # (山, 宫, 2)
+        sitting_star = house_stars[mountains, self._sitting_palace, 0]
+        facing_star = house_stars[mountains, self._facing_palace, 1]
+        key_score = (
+            engine.score_lut[sitting_star] * mountain_weight +
+            engine.score_lut[facing_star] * facing_weight
+        )
+
+        scored = result.scored[p_index]
+        levels = result.levels[p_index]
+        balance = (
+            (scored & (levels == LEVEL_AUSPICIOUS)).sum(axis=-1) -
+            (scored & (levels == LEVEL_INAUSPICIOUS)).sum(axis=-1)
+        )
+        return key_score + balance
+
+    def _mountain_indices(self, degrees: "np.ndarray") -> "np.ndarray":
+        """
+        角度数组 → 坐山下标（与 get_luopan_by_degree 相同的首个命中规则，未命中为 -1）
+        """
+        d = degrees[None, :] % 360
+        starts = self._starts[:, None]
+        ends = self._ends[:, None]
+        inside = np.where(
+            starts > ends,
+            (d >= starts) | (d <= ends),
+            (d >= starts) & (d <= ends)
+        )
+        first = inside.argmax(axis=0)
+        return np.where(inside.any(axis=0), first, -1)
+
+    def _describe_mountain(self, mountain: Dict[str, Any]) -> Dict[str, Any]:
+        """坐山的静态属性（宅卦、中心角、向山、坐宫与向宫）"""
+        start, end = mountain['start_deg'], mountain['end_deg']
+        span_end = end + 360 if start > end else end
+        center = ((start + span_end) / 2) % 360
+        facing = self.data_loader.get_luopan_by_degree((center + 180) % 360)
+        mountain_to_gua = self.luopan_calculator.MOUNTAIN_TO_GUA
+        return {
+            "sitting_mountain": mountain['name'],
+            "facing_mountain": facing['name'],
+            "sitting_palace": mountain_to_gua[mountain['name']],
+            "facing_palace": mountain_to_gua[facing['name']],
+            "house_gua": self.luopan_calculator.calculate_house_gua(center),
+            "sitting_degree": center,
+            "degree_range": [start, end],
+        }
+
+    def _resolve_ming_gua(self, owner_birth: Optional[Union[str, date]], gender: str) -> Optional[Dict[str, Any]]:
+        if owner_birth is None:
+            return None
+        if isinstance(owner_birth, str):
+            try:
+                owner_birth = datetime.strptime(owner_birth, '%Y-%m-%d')
+            except ValueError as e:
+                raise ValueError(f"生日格式错误: {e}")
+        elif not isinstance(owner_birth, datetime):
+            owner_birth = datetime.combine(owner_birth, datetime.min.time())
+        return self.luopan_calculator.calculate_ming_gua(owner_birth, gender)
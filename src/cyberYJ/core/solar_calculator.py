@@ -20,6 +20,7 @@ except ImportError:
     print("警告: ephem 库未安装，请运行: pip install ephem")
 
 from ..utils.data_loader import get_data_loader, DataLoader
+from .time_context import TimeContext, resolve_timezone
 
 
 class SolarCalculator:
@@ -77,59 +78,63 @@ class SolarCalculator:
 
     def get_solar_longitude(
         self,
-        dt: datetime,
-        timezone: str = 'Asia/Shanghai'
+        dt: Optional[datetime] = None,
+        timezone: str = 'Asia/Shanghai',
+        time_context: Optional[TimeContext] = None
     ) -> float:
         """
         计算指定时间的太阳黄经
 
         Args:
-            dt: 日期时间
+            dt: 日期时间（提供 time_context 时可省略）
             timezone: 时区，默认 Asia/Shanghai
+            time_context: 请求级时间上下文，提供时直接使用其 UTC 时刻
 
         Returns:
             太阳黄经（0-360度）
         """
-        # 确保 datetime 有时区信息
-        if dt.tzinfo is None:
-            tz = pytz.timezone(timezone)
-            dt = tz.localize(dt)
-        else:
-            # 转换到指定时区
-            tz = pytz.timezone(timezone)
-            dt = dt.astimezone(tz)
-
-        # 转换为 UTC
-        dt_utc = dt.astimezone(pytz.UTC)
+        if time_context is None:
+            time_context = TimeContext.from_datetime(dt, timezone)
+        return self._longitude_at(time_context.utc)
 
+    @classmethod
+    def _longitude_at(cls, dt_utc: datetime) -> float:
+        """
+        计算 UTC 时刻的太阳黄经（不做任何时区换算），保留两位小数
+        """
+        return round(cls._raw_longitude_at(dt_utc), 2)
+
+    @staticmethod
+    def _raw_longitude_at(dt_utc: datetime) -> float:
+        """
+        计算 UTC 时刻的太阳黄经（未取整，供交节时刻二分查找使用）
+        """
         # 创建太阳对象并计算位置
+        date = ephem.Date(dt_utc)
         sun = ephem.Sun()
-        sun.compute(dt_utc)
+        sun.compute(date)
 
-        # 获取太阳的日心黄经（弧度）
-        # hlon 是从地球看太阳的方向（日心黄经）
-        # 需要加180度得到从地心看太阳的黄经（地心黄经）
-        longitude_rad = sun.hlon
+        # 取当日历元下的地心视赤经赤纬，再换算为黄经（含光行差与章动），
+        # 与天文台公布的交节时刻一致
+        equatorial = ephem.Equatorial(sun.g_ra, sun.g_dec, epoch=date)
+        longitude_rad = ephem.Ecliptic(equatorial, epoch=date).lon
 
         # 转换为角度
-        longitude_deg = float(longitude_rad) * 180.0 / ephem.pi
-
-        # 加180度转换为地心黄经（太阳黄经）
-        longitude_deg = (longitude_deg + 180.0) % 360
-
-        return round(longitude_deg, 2)
+        return float(longitude_rad) * 180.0 / ephem.pi % 360
 
     def get_current_solar_term(
         self,
-        dt: datetime,
-        timezone: str = 'Asia/Shanghai'
+        dt: Optional[datetime] = None,
+        timezone: str = 'Asia/Shanghai',
+        time_context: Optional[TimeContext] = None
     ) -> Dict[str, Any]:
         """
         获取指定时间的当前节气信息
 
         Args:
-            dt: 日期时间
+            dt: 日期时间（提供 time_context 时可省略）
             timezone: 时区，默认 Asia/Shanghai
+            time_context: 请求级时间上下文
 
         Returns:
             节气信息字典，包含:
@@ -140,7 +145,7 @@ class SolarCalculator:
             - next_term: 下一节气名称
         """
         # 获取当前太阳黄经
-        current_longitude = self.get_solar_longitude(dt, timezone)
+        current_longitude = self.get_solar_longitude(dt, timezone, time_context)
 
         # 使用 data_loader 的方法找到当前节气
         current_term = self.data_loader.get_solar_term_by_longitude(current_longitude)
@@ -205,7 +210,7 @@ class SolarCalculator:
 
         # 从春分开始估算
         spring_equinox_approx = datetime(year, 3, 20, 12, 0, 0)
-        tz = pytz.timezone(timezone)
+        tz = resolve_timezone(timezone)
         spring_equinox_approx = tz.localize(spring_equinox_approx)
 
         estimated_time = spring_equinox_approx + timedelta(days=days_from_spring)
@@ -218,7 +223,8 @@ class SolarCalculator:
         # 二分查找，精度到分钟
         while (end_time - start_time).total_seconds() > 60:
             mid_time = start_time + (end_time - start_time) / 2
-            mid_longitude = self.get_solar_longitude(mid_time, timezone)
+            # 使用未取整黄经，避免 0.01° 取整带来的约 15 分钟误差
+            mid_longitude = self._raw_longitude_at(mid_time.astimezone(pytz.UTC))
 
             # 计算与目标黄经的差距（考虑循环）
             diff = mid_longitude - target_longitude
@@ -227,9 +233,6 @@ class SolarCalculator:
             elif diff < -180:
                 diff += 360
 
-            if abs(diff) < 0.01:  # 精度达到0.01度
-                return mid_time
-
             if diff < 0:
                 start_time = mid_time
             else:
@@ -239,20 +242,34 @@ class SolarCalculator:
 
     def get_solar_term_influence(
         self,
-        dt: datetime,
-        timezone: str = 'Asia/Shanghai'
+        dt: Optional[datetime] = None,
+        timezone: str = 'Asia/Shanghai',
+        time_context: Optional[TimeContext] = None
     ) -> str:
         """
         获取当前节气对卦象的影响描述
 
         Args:
-            dt: 日期时间
+            dt: 日期时间（提供 time_context 时可省略）
             timezone: 时区，默认 Asia/Shanghai
+            time_context: 请求级时间上下文
+
+        Returns:
+            节气影响描述文本
+        """
+        term_info = self.get_current_solar_term(dt, timezone, time_context)
+        return self.describe_solar_term_influence(term_info)
+
+    def describe_solar_term_influence(self, term_info: Dict[str, Any]) -> str:
+        """
+        根据已计算的节气信息生成影响描述（不再重复天文计算）
+
+        Args:
+            term_info: get_current_solar_term 的返回值
 
         Returns:
             节气影响描述文本
         """
-        term_info = self.get_current_solar_term(dt, timezone)
         term_name = term_info['name']
 
         # 获取节气影响描述
@@ -0,0 +1,101 @@
+"""
+请求级时间上下文
+
+一次请求只解析、换算一次时间：时区对象按名称缓存，UTC 时刻与 epoch 秒预先算好，
+沿 handler → tool → calculator 传递，后续环节不再重复解析 RFC3339 或做时区转换。
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Optional
+
+import pytz
+
+
+DEFAULT_TIMEZONE = "Asia/Shanghai"
+
+
+@lru_cache(maxsize=64)
+def resolve_timezone(tz_name: str) -> tzinfo:
+    """
+    按名称获取时区对象（进程内缓存）
+
+    Raises:
+        pytz.UnknownTimeZoneError: 无效时区名
+    """
+    return pytz.timezone(tz_name)
+
+
+@dataclass(frozen=True)
+class TimeContext:
+    """
+    单次请求的时间上下文
+
+    Attributes:
+        timezone: IANA 时区名
+        tz: 已解析的时区对象
+        local: 带时区的本地时间（保留调用方给出的偏移）
+        utc: UTC 时刻
+        epoch: Unix epoch 秒
+        explicit: 是否来自调用方指定的时间戳
+    """
+
+    timezone: str
+    tz: tzinfo
+    local: datetime
+    utc: datetime
+    epoch: float
+    explicit: bool = False
+
+    @classmethod
+    def from_datetime(
+        cls,
+        dt: datetime,
+        timezone: str = DEFAULT_TIMEZONE,
+        explicit: bool = True
+    ) -> "TimeContext":
+        """
+        由 datetime 构建上下文，naive 时间按 timezone 本地化
+        """
+        tz = resolve_timezone(timezone)
+        if dt.tzinfo is None:
+            dt = tz.localize(dt)
+        utc = dt.astimezone(pytz.UTC)
+        return cls(
+            timezone=timezone,
+            tz=tz,
+            local=dt,
+            utc=utc,
+            epoch=utc.timestamp(),
+            explicit=explicit,
+        )
+
+    @classmethod
+    def now(cls, timezone: str = DEFAULT_TIMEZONE) -> "TimeContext":
+        """以当前时间构建上下文"""
+        tz = resolve_timezone(timezone)
+        return cls.from_datetime(datetime.now(tz), timezone, explicit=False)
+
+    @classmethod
+    def parse(cls, value: str, timezone: str = DEFAULT_TIMEZONE) -> "TimeContext":
+        """
+        解析 RFC3339 时间戳
+
+        Raises:
+            ValueError: 时间戳格式错误
+        """
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return cls.from_datetime(datetime.fromisoformat(value), timezone)
+
+    @classmethod
+    def from_request(
+        cls,
+        timestamp: Optional[str],
+        timezone: str = DEFAULT_TIMEZONE
+    ) -> "TimeContext":
+        """有时间戳则解析，否则取当前时间"""
+        if timestamp:
+            return cls.parse(timestamp, timezone)
+        return cls.now(timezone)
@@ -5,6 +5,7 @@
 import re
 from typing import Any, Dict, Optional, Tuple
 
+from cyberYJ.core.direction_grammar import extract_direction
 from cyberYJ.tools.fengshui_divination import FengshuiDivinationTool
 
 
@@ -140,15 +141,8 @@ def _extract_changing_line(content: str) -> Optional[int]:
 
 
 def _extract_direction(content: str) -> Optional[str]:
-    # 优先匹配“坐...向...”或“坐...朝...”
-    m = re.search(r"(坐[^\s]+(?:朝|向)[^\s]+)", content)
-    if m:
-        return m.group(1)
-    # 兜底：抓取“坐...”片段
-    m = re.search(r"(坐[^\s]+)", content)
-    if m:
-        return m.group(1)
-    return None
+    # 与 LuopanCalculator 共用同一套预编译坐向文法
+    return extract_direction(content)
 
 
 def _extract_building_type(content: str) -> Optional[str]:
@@ -10,6 +10,7 @@ __all__ = [
     "main",
     "_format_fengshui_result",
     "_format_luopan_result",
+    "_format_luopan_batch_result",
     "_format_solar_terms_result",
 ]
 
@@ -2,39 +2,127 @@
 luopan_orientation MCP 工具处理器
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from cyberYJ.core.time_context import TimeContext
 from cyberYJ.tools.luopan_orientation import LuopanOrientationTool
 from cyberYJ.server.validation import (
     require_fields,
     get_timezone,
+    build_time_context,
     optional_type,
+    require_type,
     validate_enum,
 )
 
 
+BUILDING_TYPES = ["住宅", "办公室", "商铺", "工厂"]
+
+
 class CompassHandler:
     """罗盘坐向处理器"""
 
+    # 单个批次最多条目数
+    MAX_BATCH_ITEMS = 1000
+
     def __init__(self, tool: Optional[LuopanOrientationTool] = None):
         self._tool = tool or LuopanOrientationTool()
 
     def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         require_fields(arguments, ["sitting_direction", "building_type"])
         timezone = get_timezone(arguments.get("timezone"))
+        optional_type(arguments.get("timestamp"), str, "timestamp")
+        time_context = build_time_context(arguments.get("timestamp"), timezone)
 
         optional_type(arguments.get("sitting_direction"), str, "sitting_direction")
         optional_type(arguments.get("owner_birth"), str, "owner_birth")
-        validate_enum(
-            arguments.get("building_type"),
-            ["住宅", "办公室", "商铺", "工厂"],
-            "building_type"
-        )
+        validate_enum(arguments.get("building_type"), BUILDING_TYPES, "building_type")
+        _validate_coordinates(arguments)
 
         return self._tool.execute(
             sitting_direction=arguments["sitting_direction"],
             building_type=arguments["building_type"],
             owner_birth=arguments.get("owner_birth"),
-            timestamp=arguments.get("timestamp"),
-            timezone=timezone
+            timezone=timezone,
+            time_context=time_context,
+            latitude=arguments.get("latitude"),
+            longitude=arguments.get("longitude")
         )
+
+    def execute_batch(
+        self,
+        arguments: Dict[str, Any],
+        max_items: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        批量罗盘坐向分析
+
+        批次级参数（items、timestamp、timezone）立即校验，出错直接抛出；
+        条目级参数错误只影响该条，以 {"index", "error"} 记录返回。
+        """
+        require_fields(arguments, ["items"])
+        items = arguments["items"]
+        require_type(items, list, "items")
+        limit = max_items if max_items is not None else self.MAX_BATCH_ITEMS
+        if not items:
+            raise ValueError("items 不能为空")
+        if len(items) > limit:
+            raise ValueError(f"items 最多 {limit} 条")
+
+        timezone = get_timezone(arguments.get("timezone"))
+        optional_type(arguments.get("timestamp"), str, "timestamp")
+        time_context = build_time_context(arguments.get("timestamp"), timezone)
+
+        valid: List[Tuple[int, Dict[str, Any]]] = []
+        errors: Dict[int, str] = {}
+        for index, item in enumerate(items):
+            try:
+                self._validate_item(item)
+            except ValueError as exc:
+                errors[index] = str(exc)
+                continue
+            valid.append((index, item))
+
+        return self._merge_batch(len(items), valid, errors, time_context)
+
+    def _merge_batch(
+        self,
+        total: int,
+        valid: List[Tuple[int, Dict[str, Any]]],
+        errors: Dict[int, str],
+        time_context: TimeContext
+    ) -> Iterator[Dict[str, Any]]:
+        records = self._tool.execute_batch(
+            [item for _, item in valid],
+            time_context=time_context
+        )
+        for index in range(total):
+            if index in errors:
+                yield {"index": index, "error": errors[index]}
+                continue
+            record = next(records)
+            record["index"] = index
+            yield record
+
+    @staticmethod
+    def _validate_item(item: Any) -> None:
+        require_type(item, dict, "items[]")
+        require_fields(item, ["sitting_direction", "building_type"])
+        require_type(item["sitting_direction"], str, "sitting_direction")
+        optional_type(item.get("owner_birth"), str, "owner_birth")
+        validate_enum(item["building_type"], BUILDING_TYPES, "building_type")
+        _validate_coordinates(item)
+
+
+def _validate_coordinates(arguments: Dict[str, Any]) -> None:
+    latitude = arguments.get("latitude")
+    longitude = arguments.get("longitude")
+    for value, field in ((latitude, "latitude"), (longitude, "longitude")):
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"{field} 类型错误，期望 number")
+    if (latitude is None) != (longitude is None):
+        raise ValueError("latitude 与 longitude 须同时提供")
+    if latitude is not None and not -90 <= latitude <= 90:
+        raise ValueError("latitude 必须在 -90 到 90 之间")
+    if longitude is not None and not -180 <= longitude <= 180:
+        raise ValueError("longitude 必须在 -180 到 180 之间")
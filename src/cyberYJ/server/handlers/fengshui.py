@@ -4,10 +4,12 @@ fengshui_divination MCP 工具处理器
 
 from typing import Any, Dict, Optional
 
+from cyberYJ.core.time_context import TimeContext
 from cyberYJ.tools.fengshui_divination import FengshuiDivinationTool
 from cyberYJ.server.validation import (
     require_fields,
     get_timezone,
+    build_time_context,
     optional_type,
     validate_int_range,
 )
@@ -19,9 +21,19 @@ class FengshuiHandler:
     def __init__(self, tool: Optional[FengshuiDivinationTool] = None):
         self._tool = tool or FengshuiDivinationTool()
 
-    def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    def execute(
+        self,
+        arguments: Dict[str, Any],
+        time_context: Optional[TimeContext] = None,
+        solar_term_info: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         require_fields(arguments, ["upper_trigram", "lower_trigram"])
-        timezone = get_timezone(arguments.get("timezone"))
+        if time_context is None:
+            timezone = get_timezone(arguments.get("timezone"))
+            optional_type(arguments.get("timestamp"), str, "timestamp")
+            time_context = build_time_context(arguments.get("timestamp"), timezone)
+        else:
+            timezone = time_context.timezone
 
         optional_type(arguments.get("question_type"), str, "question_type")
         optional_type(arguments.get("question_text"), str, "question_text")
@@ -33,6 +45,7 @@ class FengshuiHandler:
             question_type=arguments.get("question_type"),
             question_text=arguments.get("question_text"),
             changing_line=arguments.get("changing_line"),
-            timestamp=arguments.get("timestamp"),
-            timezone=timezone
+            timezone=timezone,
+            time_context=time_context,
+            solar_term_info=solar_term_info
         )
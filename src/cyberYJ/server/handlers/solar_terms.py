@@ -6,7 +6,7 @@ from typing import Any, Dict, Optional, List
 
 from cyberYJ.core.solar_calculator import SolarCalculator
 from cyberYJ.utils.data_loader import get_data_loader
-from cyberYJ.server.validation import get_timezone, parse_timestamp, optional_type
+from cyberYJ.server.validation import get_timezone, build_time_context, optional_type
 from cyberYJ.utils.authoritative_text_map import match_solar_terms_item
 
 
@@ -20,12 +20,12 @@ class SolarTermsHandler:
     def execute(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         optional_type(arguments.get("timestamp"), str, "timestamp")
         timezone = get_timezone(arguments.get("timezone"))
-        dt = parse_timestamp(arguments.get("timestamp"), timezone)
+        time_context = build_time_context(arguments.get("timestamp"), timezone)
 
-        term_info = self._calculator.get_current_solar_term(dt, timezone)
+        term_info = self._calculator.get_current_solar_term(time_context=time_context)
 
         trace = [
-            f"输入时间: {dt.isoformat()}",
+            f"输入时间: {time_context.local.isoformat()}",
             f"当前太阳黄经: {term_info['solar_longitude']}°",
             f"匹配节气: {term_info['name']}（黄经 {term_info['longitude']}°）",
             f"距下一节气约: {term_info['days_to_next']} 天 → {term_info['next_term']}"
@@ -1,16 +1,17 @@
 """
 CyberYJ MCP Server
 
-提供易经风水分析的 MCP 服务，包含两个工具：
+提供易经风水分析的 MCP 服务，主要工具：
 1. fengshui_divination - 易经六十四卦解卦分析
 2. luopan_orientation - 罗盘坐向分析
+3. luopan_orientation_batch - 批量罗盘坐向分析
 """
 
 import asyncio
 import json
 import logging
 from typing import Optional
-from typing import Any, Sequence
+from typing import Any, Iterable, Sequence
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -55,6 +56,11 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
             output = _format_luopan_result(result)
             return [TextContent(type="text", text=output)]
 
+        if name == "luopan_orientation_batch":
+            records = compass_handler.execute_batch(arguments)
+            output = _format_luopan_batch_result(records)
+            return [TextContent(type="text", text=output)]
+
         if name == "solar_terms_lookup":
             result = solar_terms_handler.execute(arguments)
             output = _format_solar_terms_result(result)
@@ -137,6 +143,24 @@ def _format_luopan_result(result: dict) -> str:
     return json.dumps(_wrap_response("luopan_orientation", result), ensure_ascii=False)
 
 
+def _format_luopan_batch_result(records: Iterable[dict]) -> str:
+    """格式化批量罗盘结果（NDJSON，每行一条，附带条目序号）"""
+    lines = []
+    for record in records:
+        if "error" in record:
+            payload = _wrap_response(
+                "luopan_orientation",
+                data={},
+                success=False,
+                error={"type": "ValueError", "message": record["error"]},
+            )
+        else:
+            payload = _wrap_response("luopan_orientation", record["result"])
+        payload["index"] = record["index"]
+        lines.append(json.dumps(payload, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
 def _format_solar_terms_result(result: dict) -> str:
     """格式化节气查询结果（JSON 输出）"""
     return json.dumps(_wrap_response("solar_terms_lookup", result), ensure_ascii=False)
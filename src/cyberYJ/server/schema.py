@@ -81,6 +81,18 @@ def get_luopan_tool() -> Tool:
                     "type": "string",
                     "description": "公历生日（YYYY-MM-DD，可选，用于命卦匹配）"
                 },
+                "latitude": {
+                    "type": "number",
+                    "minimum": -90,
+                    "maximum": 90,
+                    "description": "测量地点纬度（可选，与经度同时提供时角度格式按磁北读数修正磁偏角）"
+                },
+                "longitude": {
+                    "type": "number",
+                    "minimum": -180,
+                    "maximum": 180,
+                    "description": "测量地点经度（可选）"
+                },
                 "timestamp": {
                     "type": "string",
                     "description": "RFC3339 时间戳（可选，默认当前时间）"
@@ -95,6 +107,64 @@ def get_luopan_tool() -> Tool:
     )
 
 
+def get_luopan_batch_tool() -> Tool:
+    return Tool(
+        name="luopan_orientation_batch",
+        description="批量罗盘坐向分析（同一时间点的多栋建筑，逐条返回 NDJSON）",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "items": {
+                    "type": "array",
+                    "minItems": 1,
+                    "maxItems": 1000,
+                    "description": "建筑列表",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "sitting_direction": {
+                                "type": "string",
+                                "description": "坐向，支持多种格式：坐北朝南 / 坐340向160 / 坐亥向巳"
+                            },
+                            "building_type": {
+                                "type": "string",
+                                "enum": ["住宅", "办公室", "商铺", "工厂"],
+                                "description": "建筑类型"
+                            },
+                            "owner_birth": {
+                                "type": "string",
+                                "description": "公历生日（YYYY-MM-DD，可选，用于命卦匹配）"
+                            },
+                            "latitude": {
+                                "type": "number",
+                                "minimum": -90,
+                                "maximum": 90,
+                                "description": "测量地点纬度（可选，与经度同时提供时角度格式按磁北读数修正磁偏角）"
+                            },
+                            "longitude": {
+                                "type": "number",
+                                "minimum": -180,
+                                "maximum": 180,
+                                "description": "测量地点经度（可选）"
+                            }
+                        },
+                        "required": ["sitting_direction", "building_type"]
+                    }
+                },
+                "timestamp": {
+                    "type": "string",
+                    "description": "RFC3339 时间戳（可选，默认当前时间，整批共用）"
+                },
+                "timezone": {
+                    "type": "string",
+                    "description": "IANA 时区名（可选，默认 Asia/Shanghai）"
+                }
+            },
+            "required": ["items"]
+        }
+    )
+
+
 def get_solar_terms_tool() -> Tool:
     return Tool(
         name="solar_terms_lookup",
@@ -120,6 +190,7 @@ def get_tools() -> List[Tool]:
     return [
         get_fengshui_tool(),
         get_luopan_tool(),
+        get_luopan_batch_tool(),
         get_solar_terms_tool(),
         get_keyword_router_tool(),
         get_keyword_dispatch_tool(),
@@ -5,7 +5,7 @@
 from datetime import datetime
 from typing import Any, Dict, Optional, List
 
-import pytz
+from cyberYJ.core.time_context import DEFAULT_TIMEZONE, TimeContext, resolve_timezone
 
 
 def require_fields(arguments: Dict[str, Any], fields: List[str]) -> None:
@@ -16,26 +16,26 @@ def require_fields(arguments: Dict[str, Any], fields: List[str]) -> None:
 
 def get_timezone(tz_name: Optional[str]) -> str:
     if not tz_name:
-        return "Asia/Shanghai"
+        return DEFAULT_TIMEZONE
     try:
-        pytz.timezone(tz_name)
+        resolve_timezone(tz_name)
     except Exception as exc:
         raise ValueError(f"无效时区: {tz_name}") from exc
     return tz_name
 
 
-def parse_timestamp(value: Optional[str], timezone: str) -> datetime:
+def build_time_context(value: Optional[str], timezone: str) -> TimeContext:
     if not value:
-        return datetime.now(pytz.timezone(timezone))
+        return TimeContext.now(timezone)
 
     try:
-        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return TimeContext.parse(value, timezone)
     except Exception as exc:
         raise ValueError("timestamp 必须是 RFC3339 格式") from exc
 
-    if dt.tzinfo is None:
-        dt = pytz.timezone(timezone).localize(dt)
-    return dt
+
+def parse_timestamp(value: Optional[str], timezone: str) -> datetime:
+    return build_time_context(value, timezone).local
 
 
 def require_type(value: Any, expected_type: type, field: str) -> None:
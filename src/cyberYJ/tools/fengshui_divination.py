@@ -9,13 +9,12 @@
 - 趋吉避凶建议
 """
 
-from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
-import pytz
 
 from cyberYJ.core.hexagram_analyzer import HexagramAnalyzer
 from cyberYJ.core.solar_calculator import SolarCalculator
 from cyberYJ.core.prompt_builder import PromptBuilder
+from cyberYJ.core.time_context import TimeContext
 from cyberYJ.utils.data_loader import get_data_loader
 from cyberYJ.utils.authoritative_text_map import match_mapping_item
 
@@ -117,7 +116,9 @@ class FengshuiDivinationTool:
         question_text: Optional[str] = None,
         changing_line: Optional[int] = None,
         timestamp: Optional[str] = None,
-        timezone: str = "Asia/Shanghai"
+        timezone: str = "Asia/Shanghai",
+        time_context: Optional[TimeContext] = None,
+        solar_term_info: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         执行风水占卜分析
@@ -130,6 +131,8 @@ class FengshuiDivinationTool:
             changing_line: 变爻位置（1-6），可选
             timestamp: RFC3339 时间戳，可选（默认当前时间）
             timezone: IANA 时区名，默认 Asia/Shanghai
+            time_context: 请求级时间上下文，提供时忽略 timestamp/timezone
+            solar_term_info: 批次共享的节气信息（须与 time_context 对应），缺省时按时间计算
 
         Returns:
             包含卦象分析结果的字典
@@ -137,19 +140,15 @@ class FengshuiDivinationTool:
         trace = []  # 推导路径记录
 
         # 1. 解析时间
-        if timestamp:
-            try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                if dt.tzinfo is None:
-                    tz = pytz.timezone(timezone)
-                    dt = tz.localize(dt)
-                trace.append(f"使用指定时间: {dt.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-            except Exception as e:
-                raise ValueError(f"时间戳格式错误: {e}")
-        else:
-            tz = pytz.timezone(timezone)
-            dt = datetime.now(tz)
-            trace.append(f"使用当前时间: {dt.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        if time_context is None:
+            if timestamp:
+                try:
+                    time_context = TimeContext.parse(timestamp, timezone)
+                except Exception as e:
+                    raise ValueError(f"时间戳格式错误: {e}")
+            else:
+                time_context = TimeContext.now(timezone)
+        trace.append(self.format_time_trace(time_context))
 
         # 2. 解析上下卦
         try:
@@ -185,9 +184,10 @@ class FengshuiDivinationTool:
         trace.append(f"五行关系: {element_analysis['description']}")
 
         # 6. 节气影响
-        solar_term_info = self.solar_calculator.get_current_solar_term(dt, timezone)
-        solar_influence = self.solar_calculator.get_solar_term_influence(dt, timezone)
-        trace.append(f"当前节气: {solar_term_info['name']}（太阳黄经 {solar_term_info['solar_longitude']:.2f}°）")
+        if solar_term_info is None:
+            solar_term_info = self.solar_calculator.get_current_solar_term(time_context=time_context)
+        solar_influence = self.solar_calculator.describe_solar_term_influence(solar_term_info)
+        trace.append(self.format_solar_term_trace(solar_term_info))
 
         # 7. 获取场景数据
         scenario_data = self.data_loader.get_scenario_data(scenario_code)
@@ -575,6 +575,17 @@ class FengshuiDivinationTool:
                 filtered.append(item)
         return filtered
 
+    @staticmethod
+    def format_time_trace(time_context: TimeContext) -> str:
+        """推导路径中的时间行（随请求时间变化）"""
+        time_label = "使用指定时间" if time_context.explicit else "使用当前时间"
+        return f"{time_label}: {time_context.local.strftime('%Y-%m-%d %H:%M:%S %Z')}"
+
+    @staticmethod
+    def format_solar_term_trace(solar_term_info: Dict[str, Any]) -> str:
+        """推导路径中的节气行（随太阳黄经变化）"""
+        return f"当前节气: {solar_term_info['name']}（太阳黄经 {solar_term_info['solar_longitude']:.2f}°）"
+
     @staticmethod
     def _fill_with_template(items: List[str], template_items: List[str], target_len: int = 3) -> List[str]:
         result = list(items)
@@ -9,12 +9,15 @@
 - 布局建议
 """
 
+import copy
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-import pytz
+from typing import Dict, Any, Iterable, Iterator, Optional, List, Tuple
 
 from cyberYJ.core.luopan_calculator import LuopanCalculator
 from cyberYJ.core.flying_star_calculator import combine_flying_stars
+from cyberYJ.core.time_context import TimeContext
 from cyberYJ.utils.data_loader import get_data_loader
 from cyberYJ.utils.authoritative_text_map import match_luopan_item
 
@@ -22,10 +25,18 @@ from cyberYJ.utils.authoritative_text_map import match_luopan_item
 class LuopanOrientationTool:
     """罗盘坐向分析工具"""
 
+    # 分析结果缓存容量（按 坐山 × 年份 × 建筑类型 × 命卦 键控）
+    RESULT_CACHE_SIZE = 512
+
     def __init__(self):
         """初始化工具"""
         self.luopan_calculator = LuopanCalculator()
         self.data_loader = get_data_loader()
+        self.flying_star_tables = self.data_loader.get_flying_star_tables()
+        self._result_cache: "OrderedDict[Tuple[Any, ...], Tuple[Dict[str, Any], Tuple[List[str], List[str], List[str]]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def execute(
         self,
@@ -33,89 +44,296 @@ class LuopanOrientationTool:
         building_type: str,
         owner_birth: Optional[str] = None,
         timestamp: Optional[str] = None,
-        timezone: str = "Asia/Shanghai"
+        timezone: str = "Asia/Shanghai",
+        time_context: Optional[TimeContext] = None,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         执行罗盘坐向分析
 
+        坐向解析到坐山后，宅卦、八宅方位、命卦匹配、年盘、宅盘叠加与布局建议
+        只取决于 (坐山, 年份, 建筑类型, 命卦)，按该键缓存结果主体；
+        角度、时间等逐请求字段与推导路径在返回前叠加。
+
         Args:
             sitting_direction: 坐向（坐北朝南 / 坐340向160 / 坐亥向巳）
             building_type: 建筑类型（住宅/办公室/商铺/工厂）
             owner_birth: 公历生日（YYYY-MM-DD），可选
             timestamp: RFC3339 时间戳，可选（默认当前时间）
             timezone: IANA 时区名，默认 Asia/Shanghai
+            time_context: 请求级时间上下文，提供时忽略 timestamp/timezone
+            latitude: 测量地点纬度（可选，提供经纬度时角度格式按磁北读数修正磁偏角）
+            longitude: 测量地点经度（可选）
 
         Returns:
             包含罗盘分析结果的字典
         """
-        trace = []  # 推导路径记录
+        time_context = self._resolve_time_context(timestamp, timezone, time_context)
+        return self._execute_item(
+            sitting_direction, building_type, owner_birth, time_context,
+            latitude=latitude, longitude=longitude
+        )
+
+    def execute_batch(
+        self,
+        items: Iterable[Dict[str, Any]],
+        timestamp: Optional[str] = None,
+        timezone: str = "Asia/Shanghai",
+        time_context: Optional[TimeContext] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        批量罗盘坐向分析（逐条产出结果）
+
+        同一批次共用一个时间上下文：流年年盘、元运与评分表只解析一次，
+        相同 (坐山, 建筑类型, 命卦) 的结果主体只计算一次，命卦按生日去重。
+        单条失败不影响其余条目。
+
+        Args:
+            items: 条目列表，每条含 sitting_direction、building_type、
+                owner_birth / latitude / longitude（可选）
+            timestamp: RFC3339 时间戳，可选（默认当前时间）
+            timezone: IANA 时区名，默认 Asia/Shanghai
+            time_context: 请求级时间上下文，提供时忽略 timestamp/timezone
+
+        Yields:
+            {"index": 序号, "result": 分析结果} 或 {"index": 序号, "error": 错误信息}
+        """
+        time_context = self._resolve_time_context(timestamp, timezone, time_context)
+        year_context = self._year_context(time_context.local.year)
+        bodies: Dict[Tuple[Any, ...], Tuple[Dict[str, Any], Tuple[List[str], List[str], List[str]]]] = {}
+        ming_guas: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[str]]] = {}
+
+        for index, item in enumerate(items):
+            try:
+                result = self._execute_item(
+                    item.get('sitting_direction', ''),
+                    item.get('building_type', ''),
+                    item.get('owner_birth'),
+                    time_context,
+                    latitude=item.get('latitude'),
+                    longitude=item.get('longitude'),
+                    year_context=year_context,
+                    bodies=bodies,
+                    ming_guas=ming_guas
+                )
+            except ValueError as e:
+                yield {"index": index, "error": str(e)}
+                continue
+            yield {"index": index, "result": result}
 
-        # 1. 解析时间
+    def _resolve_time_context(
+        self,
+        timestamp: Optional[str],
+        timezone: str,
+        time_context: Optional[TimeContext]
+    ) -> TimeContext:
+        if time_context is not None:
+            return time_context
         if timestamp:
             try:
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                if dt.tzinfo is None:
-                    tz = pytz.timezone(timezone)
-                    dt = tz.localize(dt)
-                trace.append(f"使用指定时间: {dt.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+                return TimeContext.parse(timestamp, timezone)
             except Exception as e:
                 raise ValueError(f"时间戳格式错误: {e}")
-        else:
-            tz = pytz.timezone(timezone)
-            dt = datetime.now(tz)
-            trace.append(f"使用当前时间: {dt.strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        return TimeContext.now(timezone)
+
+    def _execute_item(
+        self,
+        sitting_direction: str,
+        building_type: str,
+        owner_birth: Optional[str],
+        time_context: TimeContext,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        year_context: Optional[Dict[str, Any]] = None,
+        bodies: Optional[Dict[Tuple[Any, ...], Any]] = None,
+        ming_guas: Optional[Dict[str, Tuple[Optional[Dict[str, Any]], Optional[str]]]] = None
+    ) -> Dict[str, Any]:
+        """
+        单条分析（execute 与 execute_batch 共用）
 
-        # 2. 解析坐向
+        Args:
+            year_context: 批次共享的流年数据，缺省时在缓存未命中时按需读取
+            bodies: 批次内结果主体表，缺省时只经过 LRU 缓存
+            ming_guas: 批次内命卦表（按生日）
+        """
+        # 1. 时间
+        dt = time_context.local
+        time_label = "使用指定时间" if time_context.explicit else "使用当前时间"
+        trace = [f"{time_label}: {dt.strftime('%Y-%m-%d %H:%M:%S %Z')}"]
+
+        # 2. 解析坐向（磁偏角按今天的测量日期修正，与流年分析时间无关）
         try:
-            direction_info = self.luopan_calculator.parse_sitting_direction(sitting_direction)
-            trace.append(
-                f"坐向解析: {sitting_direction} → "
-                f"坐{direction_info['sitting_degree']:.1f}°（{direction_info['sitting_mountain']}山）"
+            direction_info = self.luopan_calculator.parse_sitting_direction(
+                sitting_direction, latitude, longitude
             )
         except Exception as e:
             raise ValueError(f"坐向解析失败: {e}")
+        if 'magnetic_declination' in direction_info:
+            trace.append(
+                f"磁偏角修正: {direction_info['declination_model']} "
+                f"{direction_info['magnetic_declination']:+.2f}°（磁北 "
+                f"{direction_info['magnetic_sitting_degree']:.1f}° → 真北）"
+            )
+        trace.append(
+            f"坐向解析: {sitting_direction} → "
+            f"坐{direction_info['sitting_degree']:.1f}°（{direction_info['sitting_mountain']}山）"
+        )
+
+        # 3. 命卦（只取决于生日）
+        ming_gua_result = None
+        ming_failure = None
+        if owner_birth:
+            if ming_guas is not None and owner_birth in ming_guas:
+                ming_gua_result, ming_failure = ming_guas[owner_birth]
+            else:
+                ming_gua_result, ming_failure = self._resolve_ming_gua(owner_birth)
+                if ming_guas is not None:
+                    ming_guas[owner_birth] = (ming_gua_result, ming_failure)
+
+        # 4. 结果主体：按键缓存
+        key = (
+            direction_info['sitting_mountain'],
+            dt.year,
+            building_type,
+            ming_gua_result['ming_gua'] if ming_gua_result else None,
+        )
+        cached = bodies.get(key) if bodies is not None else None
+        if cached is None:
+            cached = self._get_or_analyze(key, direction_info, ming_gua_result, year_context)
+            if bodies is not None:
+                bodies[key] = cached
+        body, (house_trace, ming_trace, rest_trace) = cached
+
+        result = copy.deepcopy(body)
+        result["sitting_degree"] = direction_info['sitting_degree']
+        result["facing_degree"] = direction_info['facing_degree']
+        if 'magnetic_declination' in direction_info:
+            result["magnetic_declination"] = direction_info['magnetic_declination']
+        trace.extend(house_trace)
+        if ming_failure:
+            trace.append(ming_failure)
+        else:
+            trace.extend(ming_trace)
+        trace.extend(rest_trace)
+        result["trace"] = trace
+        return result
+
+    def _resolve_ming_gua(self, owner_birth: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """命卦计算，返回 (命卦结果, 失败说明)"""
+        try:
+            birth_date = datetime.strptime(owner_birth, '%Y-%m-%d')
+            # 默认假设为男性，实际应用中可以添加性别参数
+            return self.luopan_calculator.calculate_ming_gua(birth_date, 'male'), None
+        except Exception as e:
+            return None, f"命卦计算失败: {str(e)}"
+
+    def _year_context(self, year: int) -> Dict[str, Any]:
+        """流年共享数据：年盘、元运与飞星评分表"""
+        return {
+            "flying_stars": self.flying_star_tables.annual_chart(year),
+            "period_info": self.data_loader.get_flying_star_period_by_year(year),
+            "scoring": self.data_loader.get_flying_star_scoring(),
+        }
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        分析结果缓存统计
+
+        Returns:
+            hits / misses / size / maxsize
+        """
+        with self._cache_lock:
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "size": len(self._result_cache),
+                "maxsize": self.RESULT_CACHE_SIZE,
+            }
+
+    def cache_clear(self) -> None:
+        """清空分析结果缓存与统计"""
+        with self._cache_lock:
+            self._result_cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
 
+    def _get_or_analyze(
+        self,
+        key: Tuple[Any, ...],
+        direction_info: Dict[str, Any],
+        ming_gua_result: Optional[Dict[str, Any]],
+        year_context: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Tuple[List[str], List[str], List[str]]]:
+        with self._cache_lock:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+                self._cache_hits += 1
+                return cached
+            self._cache_misses += 1
+
+        if year_context is None:
+            year_context = self._year_context(key[1])
+        cached = self._analyze(key[1], key[2], direction_info, ming_gua_result, year_context)
+        with self._cache_lock:
+            self._result_cache[key] = cached
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return cached
+
+    def _analyze(
+        self,
+        year: int,
+        building_type: str,
+        direction_info: Dict[str, Any],
+        ming_gua_result: Optional[Dict[str, Any]],
+        year_context: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Tuple[List[str], List[str], List[str]]]:
+        """
+        计算与角度、时间无关的结果主体
+
+        Returns:
+            (结果主体, (宅卦与八宅推导, 命卦推导, 飞星及映射推导))
+        """
         # 3. 计算宅卦
+        house_trace = []
         house_gua = self.luopan_calculator.calculate_house_gua(
             direction_info['sitting_degree']
         )
-        trace.append(f"宅卦: {house_gua}")
+        house_trace.append(f"宅卦: {house_gua}")
 
         # 4. 获取吉凶方位
         positions = self.luopan_calculator.get_auspicious_positions(house_gua)
-        trace.append(f"八宅吉位: {len(positions['auspicious'])} 个")
-        trace.append(f"八宅凶位: {len(positions['inauspicious'])} 个")
+        house_trace.append(f"八宅吉位: {len(positions['auspicious'])} 个")
+        house_trace.append(f"八宅凶位: {len(positions['inauspicious'])} 个")
         if positions.get("source_ref"):
-            trace.append(f"八宅规则来源: {positions['source_ref']}")
+            house_trace.append(f"八宅规则来源: {positions['source_ref']}")
 
         # 5. 命卦匹配（如果提供了生日）
+        ming_trace = []
         ming_gua_info = None
-        if owner_birth:
-            try:
-                birth_date = datetime.strptime(owner_birth, '%Y-%m-%d')
-                # 默认假设为男性，实际应用中可以添加性别参数
-                ming_gua_result = self.luopan_calculator.calculate_ming_gua(birth_date, 'male')
-                compatibility = self.luopan_calculator.check_house_compatibility(
-                    house_gua,
-                    ming_gua_result
-                )
+        if ming_gua_result:
+            compatibility = self.luopan_calculator.check_house_compatibility(
+                house_gua,
+                ming_gua_result
+            )
 
-                ming_gua_info = {
-                    "ming_gua": ming_gua_result.get('gua_name', ''),
-                    "category": ming_gua_result.get('category', ''),
-                    "compatible": compatibility.get('compatible', False),
-                    "advice": compatibility.get('advice', '')
-                }
-                trace.append(
-                    f"命卦: {ming_gua_info['ming_gua']}（{ming_gua_info['category']}）"
-                )
-                trace.append(f"宅命匹配: {'相配' if ming_gua_info['compatible'] else '不相配'}")
-            except Exception as e:
-                trace.append(f"命卦计算失败: {str(e)}")
+            ming_gua_info = {
+                "ming_gua": ming_gua_result.get('gua_name', ''),
+                "category": ming_gua_result.get('category', ''),
+                "compatible": compatibility.get('compatible', False),
+                "advice": compatibility.get('advice', '')
+            }
+            ming_trace.append(
+                f"命卦: {ming_gua_info['ming_gua']}（{ming_gua_info['category']}）"
+            )
+            ming_trace.append(f"宅命匹配: {'相配' if ming_gua_info['compatible'] else '不相配'}")
 
         # 6. 获取流年飞星
-        year = dt.year
-        flying_stars = self.data_loader.get_flying_stars_by_year(year)
+        trace = []
+        flying_stars = year_context["flying_stars"]
         if flying_stars:
             if flying_stars.get("computed"):
                 trace.append(
@@ -129,10 +347,10 @@ class LuopanOrientationTool:
             trace.append(f"流年飞星: {year}年数据暂无")
 
         # 6.1 宅盘 + 流年叠加
-        period_info = self.data_loader.get_flying_star_period_by_year(year)
+        period_info = year_context["period_info"]
         house_rule = None
         if period_info:
-            house_rule = self.data_loader.get_flying_star_house_rule(
+            house_rule = self.flying_star_tables.house_rule(
                 period=period_info['period'],
                 sitting_mountain=direction_info['sitting_mountain']
             )
@@ -141,7 +359,7 @@ class LuopanOrientationTool:
         current_auspicious: List[str] = []
         current_inauspicious: List[str] = []
 
-        scoring = self.data_loader.get_flying_star_scoring()
+        scoring = year_context["scoring"]
         thresholds = scoring.get("thresholds", {})
         fallback_cfg = scoring.get("fallback", {})
         missing_annual_star_strategy = fallback_cfg.get("missing_annual_star", "skip")
@@ -189,12 +407,12 @@ class LuopanOrientationTool:
             "direction_class": f"{direction_info['sitting_mountain']}山 "
                              f"({direction_info['sitting_direction_group']}方)",
             "house_gua": house_gua,
-            "sitting_degree": direction_info['sitting_degree'],
-            "facing_degree": direction_info['facing_degree'],
+            "sitting_degree": None,
+            "facing_degree": None,
             "auspicious_positions": positions['auspicious'],
             "inauspicious_positions": positions['inauspicious'],
             "layout_tips": layout_tips,
-            "trace": trace
+            "trace": None
         }
 
         # 添加命卦匹配信息
@@ -231,7 +449,7 @@ class LuopanOrientationTool:
         # 添加来源信息
         result["sources"] = self._get_sources(extra_source_ids=mapped_sources)
 
-        return result
+        return result, (house_trace, ming_trace, trace)
 
     def _generate_layout_tips(
         self,
@@ -5,6 +5,7 @@
 加载所有 JSON 数据文件：trigrams, hexagrams, solar_terms, luopan, ba_zhai, flying_stars, sources
 """
 
+import hashlib
 import json
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -248,6 +249,29 @@ class DataLoader:
             self._cache['luopan'] = self._load_json('luopan.json', 'fengshui')
         return self._cache['luopan']
 
+    def get_luopan_rings(self) -> Dict[str, Any]:
+        """
+        获取罗盘细分层数据（七十二龙、百二十分金、三百八十四爻）
+
+        Returns:
+            {"version", "source_ref", "rings": [{"id", "name", "segments"}]}
+        """
+        if 'luopan_rings' not in self._cache:
+            self._cache['luopan_rings'] = self._load_json('luopan_rings.json', 'fengshui')
+        return self._cache['luopan_rings']
+
+    def get_magnetic_model(self) -> Dict[str, Any]:
+        """
+        获取地磁模型球谐系数（世界地磁模型 WMM）
+
+        Returns:
+            {"model", "epoch", "valid_until", "max_degree", "source_ref",
+             "coefficients": [[n, m, g, h, g_dot, h_dot], ...]}
+        """
+        if 'magnetic_model' not in self._cache:
+            self._cache['magnetic_model'] = self._load_json('magnetic_model.json', 'fengshui')
+        return self._cache['magnetic_model']
+
     def get_luopan_by_degree(self, degree: float) -> Optional[Dict[str, Any]]:
         """
         根据角度获取对应的山向
@@ -336,47 +360,31 @@ class DataLoader:
         """
         根据年份获取飞星年盘
 
+        读取本加载器共享的年份记忆表（见 get_flying_star_tables）：数据表中的年份直接命中，
+        其余年份首次推算后写入同一张表。
+
         Args:
             year: 年份（如 2024）
 
         Returns:
-            飞星年盘数据字典，未找到返回 None
+            飞星年盘数据字典（副本），未找到返回 None
         """
-        flying_stars = self.get_flying_stars()
-        for star_map in flying_stars:
-            if star_map['year'] == year:
-                return star_map
-        return self._compute_flying_stars_by_year(year)
+        return self.get_flying_star_tables().annual_chart(year)
 
-    def _compute_flying_stars_by_year(self, year: int) -> Optional[Dict[str, Any]]:
-        """
-        使用规则推算飞星年盘（基于最早年份的基准盘逐年递减）
+    def get_flying_star_tables(self) -> Any:
         """
-        flying_stars = self.get_flying_stars()
-        if not flying_stars:
-            return None
-
-        base = min(flying_stars, key=lambda x: x['year'])
-        base_year = base['year']
-        delta = year - base_year
+        获取本加载器共享的飞星派生表（年盘记忆表、推算基准盘、宅盘生成表）
 
-        def shift_star(star: int, delta_years: int) -> int:
-            return ((star - 1 - delta_years) % 9) + 1
-
-        base_map = base['palace_map']
-        computed_map = {
-            palace: shift_star(star, delta)
-            for palace, star in base_map.items()
-        }
+        同一加载器的所有调用方共用一份；全局单例加载器即为进程级共享。清空缓存后重新生成。
 
-        return {
-            "year": year,
-            "central_star": shift_star(base['central_star'], delta),
-            "palace_map": computed_map,
-            "source_ref": base.get("source_ref", "cinii_dili_bianzheng_shu"),
-            "computed": True,
-            "base_year": base_year
-        }
+        Returns:
+            cyberYJ.core.flying_star_house.FlyingStarTables 实例
+        """
+        if 'flying_star_tables' not in self._cache:
+            # 延迟导入：core 依赖 utils，模块级不反向导入
+            from cyberYJ.core.flying_star_house import FlyingStarTables
+            self._cache['flying_star_tables'] = FlyingStarTables(self)
+        return self._cache['flying_star_tables']
 
     def get_flying_star_periods(self) -> List[Dict[str, Any]]:
         """
@@ -409,17 +417,12 @@ class DataLoader:
 
     def get_flying_star_house_rules(self) -> List[Dict[str, Any]]:
         """
-        获取玄空飞星宅盘规则表
+        获取玄空飞星宅盘规则表（由共享的宅盘生成表展开）
 
         Returns:
             宅盘规则列表
         """
-        if 'flying_star_house' not in self._cache:
-            self._cache['flying_star_house'] = self._load_json(
-                'flying_stars_house.json',
-                'fengshui'
-            )
-        return self._cache['flying_star_house']
+        return self.get_flying_star_tables().house_table().rules()
 
     def get_flying_star_house_rule(
         self,
@@ -427,12 +430,18 @@ class DataLoader:
         sitting_mountain: str
     ) -> Optional[Dict[str, Any]]:
         """
-        根据元运与坐山获取宅盘规则
+        根据元运与坐山获取宅盘规则（查共享的宅盘生成表）
         """
-        for rule in self.get_flying_star_house_rules():
-            if rule['period'] == period and rule['sitting_mountain'] == sitting_mountain:
-                return rule
-        return None
+        return self.get_flying_star_tables().house_rule(period, sitting_mountain)
+
+    def get_shipped_flying_star_house_rules(self) -> List[Dict[str, Any]]:
+        """
+        读取随包发布的 flying_stars_house.json（仅供核对生成表，不缓存）
+
+        Returns:
+            宅盘规则列表
+        """
+        return self._load_json('flying_stars_house.json', 'fengshui')
 
     def get_flying_star_scoring(self) -> Dict[str, Any]:
         """
@@ -447,7 +456,7 @@ class DataLoader:
 
     def validate_flying_star_house_rules(self) -> Dict[str, Any]:
         """
-        校验宅盘规则表覆盖情况与数据结构完整性
+        校验宅盘生成表覆盖情况与数据结构完整性（见 HouseChartTable.validate）
 
         Returns:
             校验报告：
@@ -458,51 +467,7 @@ class DataLoader:
             - duplicate_pairs: 重复的 (period, mountain) 组合
             - invalid_palace_entries: 九宫结构异常的规则键
         """
-        periods = [p["period"] for p in self.get_flying_star_periods()]
-        mountains = [m["name"] for m in self.get_luopan()]
-        rules = self.get_flying_star_house_rules()
-
-        expected_pairs = {(period, mountain) for period in periods for mountain in mountains}
-        seen_pairs = set()
-        duplicate_pairs = []
-        invalid_palace_entries = []
-        expected_palaces = {"中宫", "坎", "坤", "震", "巽", "乾", "兑", "艮", "离"}
-
-        for rule in rules:
-            pair = (rule.get("period"), rule.get("sitting_mountain"))
-            if pair in seen_pairs:
-                duplicate_pairs.append(pair)
-            else:
-                seen_pairs.add(pair)
-
-            palace_map = rule.get("palace_map", {})
-            palace_keys = set(palace_map.keys())
-            if palace_keys != expected_palaces:
-                invalid_palace_entries.append(pair)
-                continue
-
-            for palace, stars in palace_map.items():
-                m_star = stars.get("mountain_star")
-                f_star = stars.get("facing_star")
-                if (
-                    not isinstance(m_star, int) or
-                    not isinstance(f_star, int) or
-                    m_star < 1 or m_star > 9 or
-                    f_star < 1 or f_star > 9
-                ):
-                    invalid_palace_entries.append((pair[0], f"{pair[1]}:{palace}"))
-                    break
-
-        missing_pairs = sorted(expected_pairs - seen_pairs)
-        report = {
-            "is_valid": not (missing_pairs or duplicate_pairs or invalid_palace_entries),
-            "rule_count": len(rules),
-            "expected_count": len(expected_pairs),
-            "missing_pairs": missing_pairs,
-            "duplicate_pairs": duplicate_pairs,
-            "invalid_palace_entries": invalid_palace_entries,
-        }
-        return report
+        return self.get_flying_star_tables().house_table().validate()
 
     def get_sources(self) -> List[Dict[str, Any]]:
         """
@@ -674,6 +639,26 @@ class DataLoader:
         disclaimer_type = scenario_mapping.get(scenario, 'general')
         return disclaimers.get(disclaimer_type)
 
+    def snapshot_hash(self) -> str:
+        """
+        获取数据快照指纹
+
+        按相对路径顺序对数据目录下全部 JSON 文件的路径与内容取 SHA-1，
+        任一数据文件变化都会得到不同的指纹，可用于 HTTP 缓存校验。
+
+        Returns:
+            16 位十六进制指纹
+        """
+        if 'snapshot_hash' not in self._cache:
+            digest = hashlib.sha1()
+            for file_path in sorted(self.data_dir.rglob('*.json')):
+                digest.update(file_path.relative_to(self.data_dir).as_posix().encode('utf-8'))
+                digest.update(b'\0')
+                digest.update(file_path.read_bytes())
+                digest.update(b'\0')
+            self._cache['snapshot_hash'] = digest.hexdigest()[:16]
+        return self._cache['snapshot_hash']
+
     def clear_cache(self):
         """清空数据缓存"""
         self._cache.clear()
@@ -0,0 +1,94 @@
+"""
+测试流式历书生成器
+"""
+
+from datetime import date
+import types
+
+import pytest
+
+pytest.importorskip("ephem")
+
+from cyberYJ.core.almanac import AlmanacGenerator
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return AlmanacGenerator()
+
+
+def test_iter_days_is_lazy_generator(generator):
+    days = generator.iter_days(date(2026, 1, 1), date(2126, 1, 1))
+    assert isinstance(days, types.GeneratorType)
+    first = next(days)
+    assert first["date"] == "2026-01-01"
+
+
+def test_one_record_per_day_inclusive(generator):
+    records = list(generator.iter_days(date(2026, 2, 1), date(2026, 2, 28)))
+    assert len(records) == 28
+    assert [r["date"] for r in records[:2]] == ["2026-02-01", "2026-02-02"]
+
+
+def test_term_boundary_marks_begin_day(generator):
+    records = {
+        r["date"]: r
+        for r in generator.iter_days(date(2026, 2, 2), date(2026, 2, 20))
+    }
+    assert records["2026-02-03"]["solar_term"] == "大寒"
+    assert records["2026-02-03"]["term_begins_at"] is None
+    assert records["2026-02-03"]["next_term"] == "立春"
+    assert records["2026-02-03"]["days_to_next"] == 1
+
+    lichun = records["2026-02-04"]
+    assert lichun["solar_term"] == "立春"
+    assert lichun["term_begins_at"].startswith("2026-02-04T04:0")
+
+    # 2026 雨水交节在 2 月 18 日深夜
+    assert records["2026-02-18"]["solar_term"] == "雨水"
+    assert records["2026-02-18"]["term_begins_at"] is not None
+
+
+def test_year_boundary_uses_previous_winter_solstice(generator):
+    records = list(generator.iter_days(date(2025, 12, 31), date(2026, 1, 1)))
+    assert records[0]["solar_term"] == "冬至"
+    assert records[1]["solar_term"] == "冬至"
+    assert records[1]["next_term"] == "小寒"
+
+
+def test_annual_star_and_period_follow_year(generator):
+    records = list(generator.iter_days(date(2025, 12, 31), date(2026, 1, 1)))
+    assert records[0]["annual_star"] == 3
+    assert records[1]["annual_star"] == 2
+    assert records[1]["annual_palace_map"]["中宫"] == 2
+    assert records[1]["period"] == 9
+
+
+def test_term_table_cache_is_bounded():
+    generator = AlmanacGenerator()
+    computed = []
+    term_time = generator.solar_calculator.calculate_solar_term_time
+
+    def counting_term_time(year, term_name, timezone):
+        computed.append(year)
+        return term_time(year, term_name, timezone)
+
+    generator.solar_calculator.calculate_solar_term_time = counting_term_time
+    for _ in generator.iter_days(date(1990, 1, 1), date(2000, 12, 31)):
+        pass
+    assert len(generator._term_tables) <= AlmanacGenerator.TERM_TABLE_CACHE_SIZE
+    # 当前年与上一年两张表即可：逐年推进时每年的节气表只算一次
+    assert sorted(set(computed)) == list(range(1989, 2001))
+    assert len(computed) == 12 * len(generator.solar_calculator.solar_terms)
+
+
+def test_invalid_range_rejected(generator):
+    with pytest.raises(ValueError):
+        next(generator.iter_days(date(2026, 2, 1), date(2026, 1, 1)))
+    with pytest.raises(ValueError, match="2-9998"):
+        next(generator.iter_days(date(9999, 1, 1), date(9999, 1, 2)))
+
+
+def test_supported_year_edges(generator):
+    assert len(list(generator.iter_days(date(2, 1, 1), date(2, 1, 3)))) == 3
+    assert len(list(generator.iter_days(date(9998, 12, 29), date(9998, 12, 31)))) == 3
@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+
+from cyberYJ.api.compression import CompressedBodyCache, choose_encoding, compress
+
+
+def test_choose_encoding_respects_quality_values():
+    assert choose_encoding(None) is None
+    assert choose_encoding("") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("GZIP;q=0.5") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    assert choose_encoding("*;q=0, gzip") == "gzip"
+    assert choose_encoding("br;q=1.0, gzip;q=0.8", encodings=("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0.5, gzip;q=0.8", encodings=("br", "gzip")) == "gzip"
+    assert choose_encoding("br, gzip", encodings=("gzip",)) == "gzip"
+
+
+def test_gzip_output_is_deterministic():
+    body = b'{"hexagram": "qian"}' * 100
+    compressed = compress(body, "gzip")
+    assert compressed == compress(body, "gzip")
+    assert gzip.decompress(compressed) == body
+    with pytest.raises(ValueError):
+        compress(body, "deflate")
+
+
+def test_brotli_round_trip():
+    brotli = pytest.importorskip("brotli")
+    body = b'{"hexagram": "kun"}' * 100
+    assert brotli.decompress(compress(body, "br")) == body
+
+
+def test_compressed_body_cache_reuses_variants_and_evicts_lru():
+    cache = CompressedBodyCache(maxsize=2)
+    first = b"a" * 2048
+    second = b"b" * 2048
+    third = b"c" * 2048
+
+    compressed = cache.get_or_compress("first", first, "gzip")
+    assert cache.get_or_compress("first", first, "gzip") is compressed
+    cache.get_or_compress("second", second, "gzip")
+    cache.get_or_compress("first", first, "gzip")
+    cache.get_or_compress("third", third, "gzip")  # 淘汰最久未用的 second
+
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 3}
+    cache.get_or_compress("second", second, "gzip")
+    assert cache.stats()["misses"] == 4
+
+
+def test_compressed_body_cache_keys_by_identity_not_bytes():
+    cache = CompressedBodyCache(maxsize=4)
+    compressed = cache.get_or_compress("slot", b"a" * 2048, "gzip")
+    # 同一标识下响应体（如 trace 时间行）变化仍复用首次压缩结果
+    assert cache.get_or_compress("slot", b"b" * 2048, "gzip") is compressed
+    cache.get_or_compress("next-slot", b"b" * 2048, "gzip")
+    assert cache.stats() == {"size": 2, "maxsize": 4, "hits": 1, "misses": 2}
+
+
+def test_compressed_body_cache_disabled_and_invalid_size():
+    cache = CompressedBodyCache(maxsize=0)
+    body = b"x" * 2048
+    cache.get_or_compress("x", body, "gzip")
+    cache.get_or_compress("x", body, "gzip")
+    assert cache.stats() == {"size": 0, "maxsize": 0, "hits": 0, "misses": 2}
+    with pytest.raises(ValueError):
+        CompressedBodyCache(maxsize=-1)
@@ -376,6 +376,18 @@ class TestDataLoader:
         assert general['scenario'] == '通用'
 
 
+    def test_snapshot_hash(self, tmp_path):
+        """测试数据快照指纹随数据文件变化"""
+        fingerprint = self.loader.snapshot_hash()
+        assert len(fingerprint) == 16
+        assert self.loader.snapshot_hash() == fingerprint
+
+        (tmp_path / 'core').mkdir()
+        (tmp_path / 'core' / 'trigrams.json').write_text('[]', encoding='utf-8')
+        first = DataLoader(tmp_path).snapshot_hash()
+        (tmp_path / 'core' / 'trigrams.json').write_text('[{}]', encoding='utf-8')
+        assert DataLoader(tmp_path).snapshot_hash() != first
+
 class TestGlobalLoader:
     """测试全局加载器"""
 
@@ -1,3 +1,7 @@
+import pytest
+
+from cyberYJ.core.direction_grammar import MOUNTAIN_NAMES
+from cyberYJ.core.luopan_calculator import LuopanCalculator
 from cyberYJ.dialog.router import route_message
 
 
@@ -32,6 +36,29 @@ def test_route_luopan_birth():
     assert result["arguments"]["owner_birth"] == "1990-05-15"
 
 
+def test_route_luopan_direction_prefers_facing_span():
+    result = route_message("罗盘：坐子 坐壬向丙 住宅")
+    assert result["arguments"]["sitting_direction"] == "坐壬向丙"
+
+
 def test_route_unknown_prefix():
     result = route_message("帮我看下风水")
     assert "error" in result
+
+
+@pytest.mark.parametrize(
+    "direction",
+    ["坐北朝南", "坐西北向东南", "坐340向160", "坐３４０度", "坐 亥 向 巳", "坐壬", "坐 东 北 朝 西 南"],
+)
+def test_route_luopan_extracts_what_calculator_accepts(direction):
+    calculator = LuopanCalculator()
+    expected = calculator.parse_sitting_direction(direction)
+
+    result = route_message(f"罗盘：{direction} 住宅 1990-05-15")
+    extracted = result["arguments"]["sitting_direction"]
+    assert calculator.parse_sitting_direction(extracted) == expected
+
+
+def test_direction_grammar_mountains_match_luopan_data():
+    names = [m["name"] for m in LuopanCalculator().data_loader.get_luopan()]
+    assert list(MOUNTAIN_NAMES) == names
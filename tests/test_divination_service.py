@@ -70,3 +70,16 @@ def test_guard_tone_has_no_attack_phrase_conflict():
     )
     assert result["consistency"]["tone"] == "guard"
     assert result["consistency"]["conflict_count"] == 0
+
+
+def test_shared_solar_term_info_is_used_instead_of_recomputing():
+    from cyberYJ.core.solar_calculator import SolarCalculator
+    from cyberYJ.core.time_context import TimeContext
+
+    service = DivinationService()
+    time_context = TimeContext.parse("2026-03-21T12:00:00+08:00")
+    solar_term_info = SolarCalculator().get_current_solar_term(time_context=time_context)
+    shared = service.interpret([6, 7, 8, 9, 7, 7], time_context=time_context, solar_term_info=solar_term_info)
+    computed = service.interpret([6, 7, 8, 9, 7, 7], time_context=time_context)
+    assert shared == computed
+    assert f"当前节气: {solar_term_info['name']}" in " ".join(shared["trace"])
@@ -1,4 +1,12 @@
-from cyberYJ.core.flying_star_calculator import combine_flying_stars
+from datetime import date
+
+from cyberYJ.core.flying_star_calculator import (
+    combine_flying_stars,
+    daily_central_star,
+    month_index_from_longitude,
+    monthly_central_star,
+    sexagenary_day_index,
+)
 
 
 def test_combine_flying_stars_basic():
@@ -77,3 +85,57 @@ def test_combine_flying_stars_missing_annual_star_neutral():
     assert combined["中宫"]["score"] is None
     assert auspicious == []
     assert inauspicious == []
+
+
+def test_combine_flying_stars_overlays():
+    house_map = {
+        "中宫": {"mountain_star": 9, "facing_star": 9},
+        "坎": {"mountain_star": 8, "facing_star": 1}
+    }
+    scoring = {
+        "stars": {
+            "1": {"score": 2},
+            "2": {"score": -2},
+            "5": {"score": -3},
+            "8": {"score": 3},
+            "9": {"score": 2}
+        }
+    }
+
+    combined, _, inauspicious = combine_flying_stars(
+        house_map,
+        {"中宫": 2, "坎": 1},
+        scoring,
+        overlays={"monthly": {"中宫": 5, "坎": 8}, "daily": {"中宫": 5}}
+    )
+    assert combined["中宫"]["monthly_star"] == 5
+    assert combined["中宫"]["daily_star"] == 5
+    assert combined["中宫"]["score"] == 2 + 2 - 2 - 3 - 3
+    assert "中宫" in inauspicious
+    assert combined["坎"]["daily_star"] is None
+    assert combined["坎"]["score"] == 3 + 2 + 2 + 3
+
+    # 不叠加年星，仅叠加月盘
+    combined, _, _ = combine_flying_stars(house_map, None, scoring, overlays={"monthly": {"坎": 2}})
+    assert "annual_star" not in combined["坎"]
+    assert combined["坎"]["score"] == 3 + 2 - 2
+
+
+def test_monthly_central_star_rule():
+    # 子午卯酉年寅月八白、辰戌丑未年五黄、寅申巳亥年二黑，逐月逆行
+    assert monthly_central_star(2026, 0) == 8
+    assert monthly_central_star(2024, 0) == 5
+    assert monthly_central_star(2025, 0) == 2
+    assert monthly_central_star(2025, 1) == 1
+    assert monthly_central_star(2023, 11) == 6
+
+
+def test_month_index_and_day_helpers():
+    assert month_index_from_longitude(315.0) == 0
+    assert month_index_from_longitude(314.99) == 11
+    assert month_index_from_longitude(285.0) == 11
+    assert month_index_from_longitude(0.0) == 1
+    assert sexagenary_day_index(date(1949, 10, 1)) == 0
+    assert sexagenary_day_index(date(2000, 1, 1)) == 54
+    assert [daily_central_star(n, True) for n in (0, 1, 9)] == [1, 2, 1]
+    assert [daily_central_star(n, False) for n in (0, 1, 9)] == [9, 8, 9]
@@ -0,0 +1,53 @@
+"""
+测试年、月、日三级飞星盘
+"""
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip("ephem")
+
+from cyberYJ.core.flying_star_charts import FlyingStarChartCalculator
+from cyberYJ.core.time_context import TimeContext
+
+
+@pytest.fixture(scope="module")
+def calculator():
+    return FlyingStarChartCalculator()
+
+
+def test_monthly_chart_switches_at_jie_boundary(calculator):
+    # 2024 立春 2024-02-04 16:27（北京时间）
+    before = calculator.get_monthly_chart(TimeContext.parse("2024-02-04T16:00:00+08:00"))
+    after = calculator.get_monthly_chart(TimeContext.parse("2024-02-04T17:00:00+08:00"))
+
+    assert (before["solar_year"], before["month_branch"], before["central_star"]) == (2023, "丑", 6)
+    assert (after["solar_year"], after["month_branch"], after["central_star"]) == (2024, "寅", 5)
+    assert after["palace_map"]["中宫"] == 5
+
+
+def test_daily_chart_yang_and_yin_cycles(calculator):
+    # 2024-01-01 为甲子日，处于冬至后阳遁
+    new_year = calculator.get_daily_chart(date(2024, 1, 1))
+    assert new_year["ganzhi_index"] == 0
+    assert new_year["ascending"] is True
+    assert new_year["central_star"] == 1
+
+    # 夏至（2024-06-21）后首个甲子日 2024-06-29 起阴遁九紫
+    yin_start = calculator.get_daily_chart(date(2024, 6, 29))
+    assert yin_start["cycle_start"] == "2024-06-29"
+    assert yin_start["ascending"] is False
+    assert yin_start["central_star"] == 9
+    assert calculator.get_daily_chart(date(2024, 6, 30))["central_star"] == 8
+
+
+def test_get_charts_all_levels(calculator):
+    charts = calculator.get_charts(TimeContext.parse("2024-03-10T12:00:00+08:00"))
+    assert charts["annual"]["central_star"] == 4
+    assert charts["monthly"]["month_branch"] == "卯"
+    assert charts["daily"]["date"] == "2024-03-10"
+    for level in ("annual", "monthly", "daily"):
+        palace_map = charts[level]["palace_map"]
+        assert palace_map["中宫"] == charts[level]["central_star"]
+        assert sorted(palace_map.values()) == list(range(1, 10))
@@ -0,0 +1,76 @@
+"""
+测试玄空飞星向量化评分引擎
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from cyberYJ.core.flying_star_calculator import combine_flying_stars
+from cyberYJ.core.flying_star_engine import FlyingStarEngine
+from cyberYJ.utils.data_loader import DataLoader, get_data_loader
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return FlyingStarEngine()
+
+
+def test_engine_loads_all_house_charts(engine):
+    assert engine.house_stars.shape == (9, 24, 9, 2)
+    assert engine.rule_mask.all()
+
+
+@pytest.mark.parametrize("year", [2024, 2026, 2035])
+def test_engine_matches_combine_flying_stars(engine, year):
+    loader = get_data_loader()
+    annual_map = loader.get_flying_stars_by_year(year)["palace_map"]
+    scoring = loader.get_flying_star_scoring()
+    result = engine.score(annual_map)
+    lists = result.palace_lists()
+
+    for rule in loader.get_flying_star_house_rules():
+        key = (rule["period"], rule["sitting_mountain"])
+        combined, auspicious, inauspicious = combine_flying_stars(
+            rule["palace_map"], annual_map, scoring
+        )
+        assert result.combined(*key) == combined
+        assert lists[key] == (auspicious, inauspicious)
+
+
+def test_engine_batch_years_and_overlays(engine):
+    loader = get_data_loader()
+    scoring = loader.get_flying_star_scoring()
+    years = [2024, 2025, 2026]
+    annual_maps = [loader.get_flying_stars_by_year(y)["palace_map"] for y in years]
+
+    batch = engine.score_years(annual_maps)
+    assert batch.scores.shape == (3, 9, 24, 9)
+    for i, annual_map in enumerate(annual_maps):
+        assert batch[i].palace_lists() == engine.score(annual_map).palace_lists()
+
+    monthly = loader.get_flying_stars_by_year(2030)["palace_map"]
+    rule = loader.get_flying_star_house_rule(9, "子")
+    expected, _, _ = combine_flying_stars(
+        rule["palace_map"], annual_maps[0], scoring, overlays={"monthly": monthly}
+    )
+    assert engine.score(annual_maps[0], overlays={"monthly": monthly}).combined(9, "子") == expected
+
+
+@pytest.mark.parametrize("strategy", ["skip", "neutral"])
+def test_engine_missing_annual_star_strategy(strategy):
+    loader = DataLoader()
+    scoring = dict(loader.get_flying_star_scoring())
+    scoring["fallback"] = {"missing_annual_star": strategy}
+    scoring["thresholds"] = {"auspicious": 4, "inauspicious": -3}
+    loader._cache["flying_star_scoring"] = scoring
+    engine = FlyingStarEngine(loader)
+
+    annual_map = {"中宫": 4, "坎": 3, "离": 9}
+    result = engine.score(annual_map)
+    lists = result.palace_lists()
+    for rule in loader.get_flying_star_house_rules()[:24]:
+        key = (rule["period"], rule["sitting_mountain"])
+        expected, auspicious, inauspicious = combine_flying_stars(rule["palace_map"], annual_map, scoring)
+        assert result.combined(*key) == expected
+        assert lists[key] == (auspicious, inauspicious)
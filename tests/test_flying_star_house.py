@@ -0,0 +1,102 @@
+"""
+测试玄空飞星宅盘生成表
+"""
+
+import timeit
+
+from cyberYJ.core.flying_star_house import HOUSE_PALACES, HouseChartTable, generate_house_chart
+from cyberYJ.utils.data_loader import DataLoader
+
+
+def test_generator_matches_shipped_table():
+    report = DataLoader().get_flying_star_tables().verify_house_table()
+    assert report["is_consistent"] is True
+    assert report["checked_count"] == 216
+    assert report["mismatched_pairs"] == []
+
+
+def test_generate_house_chart_start_chart():
+    # 一运壬山：中宫 1/1，坎 9/2
+    chart = generate_house_chart(1, 0)
+    assert chart[HOUSE_PALACES.index("中宫")] == (1, 1)
+    assert chart[HOUSE_PALACES.index("坎")] == (9, 2)
+    # 每张宅盘山星、向星都是 1-9 的一个排列
+    for period in range(1, 10):
+        for mountain_index in range(24):
+            chart = generate_house_chart(period, mountain_index)
+            assert sorted(m for m, _ in chart) == list(range(1, 10))
+            assert sorted(f for _, f in chart) == list(range(1, 10))
+
+
+def test_compact_table_layout_and_lookup():
+    loader = DataLoader()
+    table = loader.get_flying_star_tables().house_table()
+    assert isinstance(table, HouseChartTable)
+    assert len(table.data) == 216 * 9 * 2
+    assert table.rule(10, "壬") is None
+    assert table.rule(9, "不存在") is None
+
+    rule = loader.get_flying_star_house_rule(period=8, sitting_mountain="乾")
+    assert rule["palace_map"]["中宫"] == {"mountain_star": 4, "facing_star": 3}
+
+
+def test_validate_detects_corrupted_bytes():
+    table = HouseChartTable(range(1, 10), [chr(0x4E00 + i) for i in range(24)])
+    assert table.validate()["is_valid"] is True
+
+    corrupted = bytearray(table.data)
+    corrupted[20] = 0
+    table.data = bytes(corrupted)
+    report = table.validate()
+    assert report["is_valid"] is False
+    assert report["invalid_palace_entries"] == [(1, chr(0x4E01))]
+
+
+def test_validate_runs_in_microseconds():
+    loader = DataLoader()
+    loader.validate_flying_star_house_rules()
+    per_call = timeit.timeit(loader.validate_flying_star_house_rules, number=200) / 200
+    assert per_call < 1e-3
+
+
+def test_loader_house_api_reads_generated_table():
+    loader = DataLoader()
+    table = loader.get_flying_star_tables().house_table()
+    assert loader.validate_flying_star_house_rules() == table.validate()
+    assert loader.get_flying_star_house_rules() == table.rules()
+    assert loader.get_flying_star_house_rule(9, "壬") == table.rule(9, "壬")
+
+
+def test_annual_charts_memoized_and_copied():
+    loader = DataLoader()
+    tables = loader.get_flying_star_tables()
+    assert loader.get_flying_star_tables() is tables
+    assert tables.base_chart()["year"] == 2024
+
+    chart_2040 = tables.annual_chart(2040)
+    assert chart_2040["computed"] is True
+    assert 2040 in tables._annual
+
+    # 返回副本：修改结果不影响记忆表
+    chart_2040["palace_map"]["坎"] = 0
+    chart_2040["central_star"] = 0
+    again = tables.annual_chart(2040)
+    assert again == tables._annual[2040]
+    assert again["central_star"] != 0 and again["palace_map"]["坎"] != 0
+
+    listed = tables.annual_chart(2024)
+    listed["palace_map"].clear()
+    assert loader.get_flying_stars_by_year(2024)["palace_map"]
+
+    # DataLoader.get_flying_stars_by_year 读同一张记忆表
+    assert loader.get_flying_stars_by_year(2041) == tables._annual[2041]
+
+
+def test_callers_share_one_table_per_loader():
+    from cyberYJ.core.flying_star_charts import FlyingStarChartCalculator
+    from cyberYJ.tools.luopan_orientation import LuopanOrientationTool
+    from cyberYJ.utils.data_loader import get_data_loader
+
+    shared = get_data_loader().get_flying_star_tables()
+    assert FlyingStarChartCalculator().flying_star_tables is shared
+    assert LuopanOrientationTool().flying_star_tables is shared
@@ -1,6 +1,10 @@
+import asyncio
 import json
 import logging
+import threading
 
+import httpx
+import pytest
 from fastapi.testclient import TestClient
 
 from cyberYJ.api.http_app import create_app
@@ -108,6 +112,7 @@ def test_structured_log_contains_request_completed_event(caplog):
     )
 
     assert resp.status_code == 200
+    assert app.state.log_pipeline.flush()
 
     events = []
     for record in caplog.records:
@@ -125,6 +130,194 @@ def test_structured_log_contains_request_completed_event(caplog):
     )
 
 
+def test_metrics_endpoint_exposes_request_and_rate_limit_metrics():
+    app = create_app(api_key="test-key", rate_limit_max=1, rate_limit_window_seconds=60)
+    client = TestClient(app)
+    for _ in range(2):
+        client.post(
+            "/v1/divination/interpret",
+            headers={"X-API-Key": "test-key"},
+            json={"coins": [6, 7, 8, 9, 7, 7]},
+        )
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = resp.text.splitlines()
+    assert 'cyberyj_http_requests_total{route="/v1/divination/interpret",method="POST",status="200"} 1' in lines
+    assert 'cyberyj_http_requests_total{route="/v1/divination/interpret",method="POST",status="429"} 1' in lines
+    assert 'cyberyj_http_request_duration_seconds_count{route="/v1/divination/interpret"} 2' in lines
+    assert "cyberyj_rate_limit_rejections_total 1" in lines
+    assert 'cyberyj_errors_total{code="RATE_LIMITED"} 1' in lines
+    assert 'cyberyj_response_cache_misses_total{cache="interpret"} 1' in lines
+    # 指标接口本身不需要 API Key，正在处理的只有这次抓取
+    assert "cyberyj_http_requests_in_flight 1" in lines
+
+
+def test_post_interpret_negotiates_gzip_and_reuses_compressed_body():
+    app = create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60, compression_min_size=256)
+    client = TestClient(app)
+    request = {"coins": [6, 7, 8, 9, 7, 7], "scene_type": "career"}
+
+    plain = client.post(
+        "/v1/divination/interpret",
+        headers={"X-API-Key": "test-key", "Accept-Encoding": "identity"},
+        json=request,
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    encoded = [
+        client.post(
+            "/v1/divination/interpret",
+            headers={"X-API-Key": "test-key", "Accept-Encoding": "gzip"},
+            json=request,
+        )
+        for _ in range(2)
+    ]
+    for resp in encoded:
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["X-Request-ID"]
+        assert int(resp.headers["content-length"]) < len(resp.content)
+        assert resp.json()["hexagram"] == plain.json()["hexagram"]
+
+    stats = app.state.compressed_cache.stats()
+    # 压缩结果按响应等价标识缓存：第二次相同请求直接复用（不受 trace 时间行按秒变化影响）
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert encoded[1].content == encoded[0].content
+
+    lines = client.get("/metrics", headers={"Accept-Encoding": "identity"}).text.splitlines()
+    bytes_in = [line for line in lines if line.startswith('cyberyj_compression_bytes_in_total{encoding="gzip"}')]
+    bytes_out = [line for line in lines if line.startswith('cyberyj_compression_bytes_out_total{encoding="gzip"}')]
+    assert float(bytes_out[0].split()[-1]) < float(bytes_in[0].split()[-1])
+
+
+def test_small_responses_are_not_compressed():
+    client = TestClient(create_app(api_key="test-key", compression_min_size=1 << 20))
+    resp = client.post(
+        "/v1/divination/interpret",
+        headers={"X-API-Key": "test-key", "Accept-Encoding": "gzip"},
+        json={"coins": [6, 7, 8, 9, 7, 7]},
+    )
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+
+
+def test_get_interpret_resource_matches_post_and_revalidates():
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    headers = {"X-API-Key": "test-key"}
+    resp = client.get("/v1/divination/678977/career", headers=headers)
+    assert resp.status_code == 200
+    etag = resp.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert resp.headers["Cache-Control"].startswith("public, max-age=")
+    assert int(resp.headers["Cache-Control"].split("=")[1]) > 0
+
+    posted = client.post(
+        "/v1/divination/interpret", headers=headers, json={"coins": [6, 7, 8, 9, 7, 7], "scene_type": "career"}
+    ).json()
+    body = resp.json()
+    # trace 含当前时间行，按秒变化
+    body.pop("trace")
+    posted.pop("trace")
+    assert body == posted
+
+    cached = client.get("/v1/divination/678977/career", headers={**headers, "If-None-Match": f'"x", {etag}'})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    assert cached.headers["Vary"] == resp.headers["Vary"] == "Accept-Encoding"
+    assert client.get("/v1/divination/678977/love", headers={**headers, "If-None-Match": etag}).status_code == 200
+    assert client.get("/v1/divination/678977/general", headers=headers).headers["ETag"] != etag
+
+
+def test_get_interpret_resource_rejects_invalid_path():
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    for path in ("/v1/divination/67897/career", "/v1/divination/678975/career", "/v1/divination/678977/unknown"):
+        resp = client.get(path, headers={"X-API-Key": "test-key"})
+        assert resp.status_code == 400
+        assert resp.json()["error"]["code"] == "INVALID_INPUT"
+
+
+def test_post_divination_batch_keeps_order_and_isolates_item_errors():
+    app = create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60)
+    client = TestClient(app)
+    items = [
+        {"coins": [6, 7, 8, 9, 7, 7]},
+        {"coins": [7, 7, 7, 8, 8, 8], "scene_type": "love"},
+        {"coins": [1, 2, 3]},
+        {"coins": [6, 7, 8, 9, 7, 7]},
+    ]
+    resp = client.post(
+        "/v1/divination/batch",
+        headers={"X-API-Key": "test-key", "X-Request-ID": "req-batch-001"},
+        json={"items": items},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["X-Request-ID"] == "req-batch-001"
+    results = resp.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert results[1]["data"]["scene_type"] == "love"
+    assert results[2]["error"]["code"] == "INVALID_INPUT"
+    assert results[0]["data"] == results[3]["data"]
+    # 相同条目只计算一次
+    assert app.state.response_caches["interpret"].stats()["size"] == 2
+    assert app.state.error_tracker.snapshot()["INVALID_INPUT"] == 1
+
+    single = client.post(
+        "/v1/divination/interpret",
+        headers={"X-API-Key": "test-key"},
+        json=items[1],
+    ).json()
+    # trace 含秒级时间，跨秒时可能不同
+    single.pop("trace")
+    results[1]["data"].pop("trace")
+    assert single == results[1]["data"]
+
+
+def test_post_divination_batch_rejects_oversized_batch():
+    client = TestClient(
+        create_app(api_key="test-key", rate_limit_max=10, divination_batch_max_items=2)
+    )
+    resp = client.post(
+        "/v1/divination/batch",
+        headers={"X-API-Key": "test-key"},
+        json={"items": [{"coins": [6, 7, 8, 9, 7, 7]}] * 3},
+    )
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "INVALID_INPUT"
+
+
+def test_gateway_headers_on_streaming_and_failed_requests():
+    app = create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60)
+
+    def boom() -> dict:
+        raise RuntimeError("boom")
+
+    app.add_api_route("/v1/boom", boom)
+    client = TestClient(app, raise_server_exceptions=False)
+
+    resp = client.get(
+        "/v1/almanac",
+        params={"start": "2026-01-01", "end": "2026-01-02"},
+        headers={"X-API-Key": "test-key", "X-Request-ID": "req-stream-001"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["X-Request-ID"] == "req-stream-001"
+    assert resp.headers["X-RateLimit-Limit"] == "10"
+    assert resp.headers["X-RateLimit-Remaining"] == "9"
+    assert len(resp.text.splitlines()) == 2
+
+    resp = client.get("/v1/boom", headers={"X-API-Key": "test-key", "X-Request-ID": "req-boom-001"})
+    assert resp.status_code == 500
+    assert resp.json()["error"]["request_id"] == "req-boom-001"
+    assert resp.headers["X-Request-ID"] == "req-boom-001"
+    lines = client.get("/metrics").text.splitlines()
+    assert 'cyberyj_http_requests_total{route="/v1/boom",method="GET",status="500"} 1' in lines
+    assert "cyberyj_http_requests_in_flight 1" in lines
+
+
 def test_post_interpret_scene_type_overrides_question_keyword():
     client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
     resp = client.post(
@@ -191,3 +384,304 @@ def test_post_interpret_rejects_invalid_scene_type():
     assert resp.status_code == 400
     assert resp.json()["error"]["code"] == "INVALID_INPUT"
     assert "scene_type" in resp.json()["error"]["message"]
+
+
+def test_get_almanac_streams_ndjson():
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    resp = client.get(
+        "/v1/almanac",
+        headers={"X-API-Key": "test-key"},
+        params={"start": "2026-02-01", "end": "2026-02-10"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert len(lines) == 10
+    assert lines[0]["date"] == "2026-02-01"
+    assert any(line["solar_term"] == "立春" for line in lines)
+
+
+def test_get_almanac_rejects_span_over_limit():
+    client = TestClient(
+        create_app(
+            api_key="test-key",
+            rate_limit_max=10,
+            rate_limit_window_seconds=60,
+            almanac_max_days=5,
+        )
+    )
+    resp = client.get(
+        "/v1/almanac",
+        headers={"X-API-Key": "test-key"},
+        params={"start": "2026-02-01", "end": "2026-02-10"},
+    )
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "INVALID_INPUT"
+
+
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [("0001-01-01", "0001-01-03"), ("9999-12-29", "9999-12-31")],
+)
+def test_get_almanac_rejects_dates_outside_supported_years(start, end):
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    resp = client.get(
+        "/v1/almanac",
+        headers={"X-API-Key": "test-key"},
+        params={"start": start, "end": end},
+    )
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "INVALID_INPUT"
+    assert "2-9998" in resp.json()["error"]["message"]
+
+
+def test_get_best_orientation_ranked():
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    resp = client.get(
+        "/v1/orientation/best",
+        headers={"X-API-Key": "test-key"},
+        params={"year": 2026, "building_type": "商铺", "owner_birth": "1990-05-01", "top_n": 3},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["period"] == 9
+    assert [item["rank"] for item in body["rankings"]] == [1, 2, 3]
+
+    resp = client.get(
+        "/v1/orientation/best",
+        headers={"X-API-Key": "test-key"},
+        params={"year": 2026, "resolution": 0},
+    )
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "INVALID_INPUT"
+
+
+def test_get_best_orientation_without_numpy(monkeypatch):
+    from cyberYJ.core import flying_star_engine
+
+    monkeypatch.setattr(flying_star_engine, "NUMPY_AVAILABLE", False)
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    resp = client.get("/v1/orientation/best", headers={"X-API-Key": "test-key"}, params={"year": 2026})
+    assert resp.status_code == 501
+    error = resp.json()["error"]
+    assert error["code"] == "FEATURE_UNAVAILABLE"
+    assert "numpy" in error["message"]
+
+
+def test_post_luopan_batch_streams_ndjson():
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    resp = client.post(
+        "/v1/luopan/batch",
+        headers={"X-API-Key": "test-key"},
+        json={
+            "items": [
+                {"sitting_direction": "坐北朝南", "building_type": "住宅"},
+                {"sitting_direction": "坐北朝南", "building_type": "别墅"},
+                {"sitting_direction": "坐亥向巳", "building_type": "商铺", "owner_birth": "1990-05-15"},
+            ],
+            "timestamp": "2026-02-10T00:00:00+08:00",
+        },
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["data"]["house_gua"] == "坎宅"
+    assert lines[1]["error"]["code"] == "INVALID_INPUT"
+    assert "ming_gua_match" in lines[2]["data"]
+
+
+def test_post_luopan_batch_reports_malformed_item_in_its_row():
+    client = TestClient(create_app(api_key="test-key", rate_limit_max=10, rate_limit_window_seconds=60))
+    resp = client.post(
+        "/v1/luopan/batch",
+        headers={"X-API-Key": "test-key"},
+        json={
+            "items": [
+                {"sitting_direction": "坐北朝南", "building_type": "住宅"},
+                {"sitting_direction": "坐北朝南"},
+                {"sitting_direction": "坐北朝南", "building_type": "住宅", "latitude": "north", "longitude": 116.4},
+            ],
+        },
+    )
+    assert resp.status_code == 200
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["data"]["house_gua"] == "坎宅"
+    assert lines[1]["error"] == {"code": "INVALID_INPUT", "message": "building_type: Field required"}
+    assert lines[2]["error"]["code"] == "INVALID_INPUT"
+    assert lines[2]["error"]["message"].startswith("latitude")
+
+
+def test_post_luopan_batch_rejects_oversized_batch():
+    client = TestClient(
+        create_app(
+            api_key="test-key",
+            rate_limit_max=10,
+            rate_limit_window_seconds=60,
+            luopan_batch_max_items=1,
+        )
+    )
+    item = {"sitting_direction": "坐北朝南", "building_type": "住宅"}
+    resp = client.post("/v1/luopan/batch", headers={"X-API-Key": "test-key"}, json={"items": [item, item]})
+    assert resp.status_code == 400
+    assert resp.json()["error"]["code"] == "INVALID_INPUT"
+
+
+def test_post_interpret_sheds_load_when_worker_pool_full():
+    app = create_app(
+        api_key="test-key",
+        rate_limit_max=10,
+        rate_limit_window_seconds=60,
+        worker_pool_size=1,
+        worker_queue_limit=0,
+    )
+    client = TestClient(app)
+    pool = app.state.worker_pool
+    started = threading.Event()
+    release = threading.Event()
+
+    def occupy() -> None:
+        started.set()
+        release.wait()
+
+    holder = threading.Thread(target=lambda: asyncio.run(pool.run(occupy)))
+    holder.start()
+    started.wait()
+    try:
+        resp = client.post(
+            "/v1/divination/interpret",
+            headers={"X-API-Key": "test-key"},
+            json={"coins": [6, 7, 8, 9, 7, 7]},
+        )
+    finally:
+        release.set()
+        holder.join()
+    assert resp.status_code == 503
+    assert resp.json()["error"]["code"] == "SERVER_BUSY"
+    assert resp.headers["Retry-After"] == "1"
+    assert app.state.error_tracker.snapshot()["SERVER_BUSY"] == 1
+
+    resp = client.post(
+        "/v1/divination/interpret",
+        headers={"X-API-Key": "test-key"},
+        json={"coins": [6, 7, 8, 9, 7, 7]},
+    )
+    assert resp.status_code == 200
+    pool.shutdown()
+
+
+def test_post_interpret_coalesces_identical_concurrent_requests():
+    app = create_app(
+        api_key="test-key",
+        rate_limit_max=100,
+        worker_pool_size=1,
+        worker_queue_limit=16,
+    )
+    pool = app.state.worker_pool
+    release = threading.Event()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # 占住唯一的执行位，让 8 个相同请求同时处于等待中
+            blocker = asyncio.ensure_future(pool.run(release.wait))
+            requests = [
+                asyncio.ensure_future(
+                    client.post(
+                        "/v1/divination/interpret",
+                        headers={"X-API-Key": "test-key"},
+                        json={"coins": [6, 7, 8, 9, 7, 7], "scene_type": "career"},
+                    )
+                )
+                for _ in range(8)
+            ]
+            for _ in range(500):
+                if "cyberyj_interpret_coalesced_total 7" in app.state.metrics.render():
+                    break
+                await asyncio.sleep(0.01)
+            release.set()
+            await blocker
+            responses = await asyncio.gather(*requests)
+            metrics_text = (await client.get("/metrics")).text
+        return responses, metrics_text
+
+    responses, metrics_text = asyncio.run(scenario())
+    pool.shutdown()
+    assert [resp.status_code for resp in responses] == [200] * 8
+    assert len({resp.content for resp in responses}) == 1
+    assert "cyberyj_interpret_coalesced_total 7" in metrics_text.splitlines()
+
+
+def test_post_interpret_with_process_pool():
+    app = create_app(
+        api_key="test-key",
+        rate_limit_max=10,
+        rate_limit_window_seconds=60,
+        worker_pool_size=1,
+        worker_pool_kind="process",
+    )
+    with TestClient(app) as client:
+        resp = client.post(
+            "/v1/learning/interpret",
+            headers={"X-API-Key": "test-key"},
+            json={"coins": [6, 7, 8, 9, 7, 7]},
+        )
+        invalid = client.post(
+            "/v1/divination/interpret",
+            headers={"X-API-Key": "test-key"},
+            json={"coins": [6, 7, 8, 9, 7, 5]},
+        )
+    assert resp.status_code == 200
+    assert "learning_points" in resp.json()
+    assert invalid.status_code == 400
+
+
+def test_post_interpret_served_from_precomputed_store():
+    app = create_app(
+        api_key="test-key",
+        rate_limit_max=10,
+        rate_limit_window_seconds=60,
+        precompute_responses=True,
+    )
+    store = app.state.response_store
+    store.build(combinations=[((6, 7, 8, 9, 7, 7), "career")])
+    client = TestClient(app)
+    resp = client.post(
+        "/v1/divination/interpret",
+        headers={"X-API-Key": "test-key", "X-Request-ID": "req-store-001"},
+        json={"coins": [6, 7, 8, 9, 7, 7], "scene_type": "career"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.headers["X-Request-ID"] == "req-store-001"
+    assert resp.json()["scene_type"] == "career"
+    assert store.stats()["hits"] == 1
+
+    resp = client.post(
+        "/v1/divination/interpret",
+        headers={"X-API-Key": "test-key"},
+        json={"coins": [6, 7, 8, 9, 7, 7], "question": "我会不会升职"},
+    )
+    assert resp.status_code == 200
+    assert store.stats()["misses"] == 1
+
+
+def test_shared_rate_limit_across_app_instances(tmp_path, monkeypatch):
+    monkeypatch.setenv("CYBERYJ_RATE_LIMIT_SHARED_PATH", str(tmp_path / "ratelimit.bin"))
+    workers = [
+        TestClient(
+            create_app(
+                api_key="test-key",
+                rate_limit_max=1,
+                rate_limit_window_seconds=60,
+                rate_limit_backend="shared",
+            )
+        )
+        for _ in range(2)
+    ]
+    headers = {"X-API-Key": "test-key"}
+    first = workers[0].post("/v1/divination/interpret", headers=headers, json={"coins": [6, 7, 8, 9, 7, 7]})
+    second = workers[1].post("/v1/divination/interpret", headers=headers, json={"coins": [6, 7, 8, 9, 7, 7]})
+    assert first.status_code == 200
+    assert second.status_code == 429
@@ -0,0 +1,23 @@
+import json
+
+from cyberYJ.api import json_codec
+
+
+def test_dumps_matches_starlette_encoding():
+    value = {"name": "讼卦", "score": 0.75, "lines": [1, 4], "empty": None, 3: "int key"}
+    expected = json.dumps(
+        {str(k) if isinstance(k, int) else k: v for k, v in value.items()},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    assert json_codec.dumps(value) == expected
+
+
+def test_dumps_falls_back_to_stdlib_for_unsupported_values():
+    big = 2 ** 70
+    assert json_codec.dumps({"big": big}) == f'{{"big":{big}}}'.encode()
+
+
+def test_stdlib_backend_without_orjson(monkeypatch):
+    monkeypatch.setattr(json_codec, "ORJSON_AVAILABLE", False)
+    assert json_codec.dumps({"卦": "乾"}) == '{"卦":"乾"}'.encode("utf-8")
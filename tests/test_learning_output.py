@@ -0,0 +1,32 @@
+import copy
+import random
+
+from cyberYJ.api.divination_service import DivinationService
+from cyberYJ.api.learning_output import _TEXT_REPLACEMENTS, sanitize_text, to_learning_response
+
+
+def _sequential(text: str) -> str:
+    for old, new in _TEXT_REPLACEMENTS:
+        text = text.replace(old, new)
+    return text
+
+
+def test_single_pass_matches_sequential_replacements():
+    fragments = [old for old, _ in _TEXT_REPLACEMENTS] + ["趋吉", "避凶", "会不", "宜", "忌", "：", " ", "卦", "能"]
+    rng = random.Random(48)
+    for _ in range(2000):
+        text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 12)))
+        assert sanitize_text(text) == _sequential(text)
+    assert sanitize_text("趋吉避凶，吉凶未定") == "学习建议，文本倾向未定"
+
+
+def test_in_place_transform_matches_copy():
+    raw = DivinationService().interpret([6, 7, 8, 9, 7, 7], question="我会不会升职")
+    original = copy.deepcopy(raw)
+
+    copied = to_learning_response(raw)
+    assert raw == original
+
+    transformed = to_learning_response(raw, in_place=True)
+    assert transformed is raw
+    assert transformed == copied
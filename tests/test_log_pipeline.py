@@ -0,0 +1,93 @@
+import json
+import logging
+import threading
+
+import pytest
+
+from cyberYJ.api.log_pipeline import StructuredLogPipeline
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+        self.threads.add(threading.get_ident())
+
+
+class BlockingHandler(ListHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblock = threading.Event()
+        self.entered = threading.Event()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.entered.set()
+        self.unblock.wait(5)
+        super().emit(record)
+
+
+def _logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def test_records_are_encoded_and_written_off_the_calling_thread():
+    handler = ListHandler()
+    pipeline = StructuredLogPipeline(_logger("test-log-pipeline-basic", handler), batch_size=4)
+    for index in range(10):
+        assert pipeline.log(logging.INFO, "request.completed", request_id=f"r{index}", status_code=200)
+    assert pipeline.flush()
+
+    payloads = [json.loads(record.getMessage()) for record in handler.records]
+    assert [payload["request_id"] for payload in payloads] == [f"r{index}" for index in range(10)]
+    assert all(payload["event"] == "request.completed" and "timestamp_ms" in payload for payload in payloads)
+    assert threading.get_ident() not in handler.threads
+    assert pipeline.stats()["emitted"] == 10
+    pipeline.close()
+    assert not pipeline.log(logging.INFO, "request.completed")
+
+
+def test_received_events_are_sampled():
+    handler = ListHandler()
+    pipeline = StructuredLogPipeline(
+        _logger("test-log-pipeline-sampling", handler), received_sample_rate=0.0
+    )
+    assert not pipeline.log(logging.INFO, "request.received", request_id="r1")
+    assert pipeline.log(logging.INFO, "request.completed", request_id="r1")
+    assert pipeline.log(logging.WARNING, "request.rejected", request_id="r2")
+    assert pipeline.flush()
+    assert [json.loads(r.getMessage())["event"] for r in handler.records] == [
+        "request.completed",
+        "request.rejected",
+    ]
+    assert pipeline.stats()["sampled_out"] == 1
+    pipeline.close()
+
+
+def test_full_queue_drops_and_reports_count():
+    handler = BlockingHandler()
+    pipeline = StructuredLogPipeline(_logger("test-log-pipeline-drops", handler), max_queue=2, batch_size=1)
+    pipeline.log(logging.INFO, "request.completed", request_id="first")
+    handler.entered.wait(5)
+    # 写出线程阻塞在第一条：队列只能再容纳两条
+    results = [pipeline.log(logging.INFO, "request.completed", request_id=f"r{i}") for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert pipeline.stats()["dropped"] == 3
+
+    handler.unblock.set()
+    assert pipeline.flush()
+    events = [json.loads(record.getMessage()) for record in handler.records]
+    assert {"event": "log.dropped", "count": 3}.items() <= events[1].items()
+    pipeline.close()
+
+
+def test_rejects_invalid_config():
+    with pytest.raises(ValueError):
+        StructuredLogPipeline(logging.getLogger("x"), received_sample_rate=1.5)
@@ -3,7 +3,7 @@
 """
 
 import pytest
-from datetime import datetime
+from datetime import date, datetime
 
 from cyberYJ.core.luopan_calculator import LuopanCalculator
 
@@ -98,6 +98,52 @@ class TestLuopanCalculator:
         with pytest.raises(ValueError, match="无法解析的坐向格式"):
             calculator.parse_sitting_direction("")
 
+    def test_parse_direction_cached_by_normalized_input(self, calculator):
+        """测试坐向解析按规范化输入缓存，且返回值互不影响"""
+        first = calculator.parse_sitting_direction("坐亥向巳")
+        first['sitting_mountain'] = '篡改'
+
+        # 全角数字、空白规范化后命中同一条缓存
+        assert calculator.parse_sitting_direction(" 坐 亥向巳 ")['sitting_mountain'] == '亥'
+        assert calculator.parse_sitting_direction("坐３４０度") == calculator.parse_sitting_direction("坐340度")
+
+        info = calculator.direction_cache_info()
+        assert info.hits == 2
+        assert info.misses == 2
+
+    def test_parse_degree_with_magnetic_declination(self, calculator):
+        """测试经纬度下角度格式按磁北读数修正"""
+        result = calculator.parse_sitting_direction("坐340向160", 39.9, 116.4, date(2026, 7, 1))
+        assert result['magnetic_sitting_degree'] == 340.0
+        assert result['magnetic_declination'] == pytest.approx(-7.6, abs=0.5)
+        assert result['sitting_degree'] == pytest.approx(340.0 + result['magnetic_declination'], abs=0.01)
+        assert result['sitting_mountain'] == '乾'
+        assert result['declination_model'] == 'WMM2025'
+
+        # 中文方位、干支山向以真北为准，不修正
+        result = calculator.parse_sitting_direction("坐亥向巳", 39.9, 116.4, date(2026, 7, 1))
+        assert result['sitting_mountain'] == '亥'
+        assert 'magnetic_declination' not in result
+
+        # 不修正的格式不查地磁模型，测量日期超出模型有效期也能解析
+        for survey_date in (date(2024, 6, 1), date(2031, 3, 1)):
+            result = calculator.parse_sitting_direction("坐北朝南", 39.9, 116.4, survey_date)
+            assert result['sitting_mountain'] == '壬'
+            assert 'magnetic_declination' not in result
+        with pytest.raises(ValueError, match="2025-2029"):
+            calculator.parse_sitting_direction("坐340度", 39.9, 116.4, date(2031, 3, 1))
+
+        with pytest.raises(ValueError, match="纬度与经度"):
+            calculator.parse_sitting_direction("坐340度", latitude=39.9)
+
+    def test_mountain_centres(self, calculator):
+        """测试二十四山中心角度表（含跨越0度的壬山）"""
+        centres = calculator.mountain_centres
+        assert len(centres) == 24
+        assert centres['壬'] == 0
+        assert centres['子'] == 15
+        assert centres['午'] == 195
+
     def test_get_mountain_by_degree(self, calculator):
         """测试根据角度获取山向"""
         # 测试子山（7.5-22.5度）
@@ -137,6 +183,17 @@ class TestLuopanCalculator:
         assert mountain is not None
         assert mountain['name'] == '壬'
 
+    def test_get_rings_by_degree(self, calculator):
+        """测试罗盘多层查询"""
+        rings = calculator.get_rings_by_degree(15)
+        assert rings['mountains_24']['name'] == '子'
+        assert rings['dragons_72']['mountain'] == '子'
+        assert rings['fen_jin_120']['name'] == '戊子'
+        assert rings['yao_384']['hexagram'] == '屯'
+
+        # 边界角度与 get_mountain_by_degree 一致
+        assert calculator.get_rings_by_degree(7.5)['mountains_24']['name'] == '壬'
+
     def test_calculate_house_gua(self, calculator):
         """测试宅卦计算"""
         # 坐北（子山）→ 坎宅
@@ -160,8 +160,8 @@ class TestLuopanOrientationTool:
 
     def test_degrade_when_house_rule_missing(self, monkeypatch):
         monkeypatch.setattr(
-            self.tool.data_loader,
-            "get_flying_star_house_rule",
+            self.tool.flying_star_tables,
+            "house_rule",
             lambda period, sitting_mountain: None
         )
         result = self.tool.execute(
@@ -173,7 +173,7 @@ class TestLuopanOrientationTool:
         assert any("宅盘规则缺失" in step for step in result["trace"])
 
     def test_scoring_fallback_strategy_passthrough(self, monkeypatch):
-        base_flying_stars = self.tool.data_loader.get_flying_stars_by_year(2026)
+        base_flying_stars = self.tool.flying_star_tables.annual_chart(2026)
 
         def fake_flying_stars(_year):
             patched = dict(base_flying_stars)
@@ -183,8 +183,8 @@ class TestLuopanOrientationTool:
             return patched
 
         monkeypatch.setattr(
-            self.tool.data_loader,
-            "get_flying_stars_by_year",
+            self.tool.flying_star_tables,
+            "annual_chart",
             fake_flying_stars
         )
         monkeypatch.setattr(
@@ -275,6 +275,64 @@ class TestLuopanOrientationTool:
         assert result["authoritative_notes"]["ba_zhai.rules"] == "八宅规则摘要：用于宅卦与方位判定。"
         assert all("权威补充:" not in tip for tip in result["layout_tips"])
 
+    def test_result_cache_reuses_body_per_mountain(self):
+        """测试同一坐山、年份、建筑类型、命卦命中缓存，逐请求字段独立"""
+        first = self.tool.execute(
+            sitting_direction="坐10度",
+            building_type="住宅",
+            owner_birth="1990-05-01",
+            timestamp="2026-06-01T10:00:00+08:00"
+        )
+        second = self.tool.execute(
+            sitting_direction="坐20度",
+            building_type="住宅",
+            owner_birth="1990-08-01",
+            timestamp="2026-07-01T10:00:00+08:00"
+        )
+        assert self.tool.cache_info()["hits"] == 1
+        assert self.tool.cache_info()["misses"] == 1
+
+        assert first["sitting_degree"] == 10
+        assert second["sitting_degree"] == 20
+        assert first["trace"][0] != second["trace"][0]
+        assert first["trace"][2:] == second["trace"][2:]
+        for key in ("house_gua", "combined_flying_stars", "layout_tips", "ming_gua_match"):
+            assert first[key] == second[key]
+
+        # 返回值是副本，修改不影响缓存
+        second["layout_tips"].append("x")
+        third = self.tool.execute(
+            sitting_direction="坐子",
+            building_type="住宅",
+            owner_birth="1990-05-01",
+            timestamp="2026-06-01T10:00:00+08:00"
+        )
+        assert third["layout_tips"] == first["layout_tips"]
+
+        self.tool.execute(
+            sitting_direction="坐10度",
+            building_type="商铺",
+            timestamp="2026-06-01T10:00:00+08:00"
+        )
+        assert self.tool.cache_info()["misses"] == 2
+
+    def test_result_cache_keeps_ming_failure_per_request(self):
+        ok = self.tool.execute(
+            sitting_direction="坐北朝南",
+            building_type="住宅",
+            timestamp="2026-06-01T10:00:00+08:00"
+        )
+        failed = self.tool.execute(
+            sitting_direction="坐北朝南",
+            building_type="住宅",
+            owner_birth="not-a-date",
+            timestamp="2026-06-01T10:00:00+08:00"
+        )
+        assert self.tool.cache_info()["hits"] == 1
+        assert not any("命卦计算失败" in step for step in ok["trace"])
+        assert any("命卦计算失败" in step for step in failed["trace"])
+        assert len(failed["trace"]) == len(ok["trace"]) + 1
+
     def test_layout_tips_generation(self):
         """测试布局建议生成"""
         result = self.tool.execute(
@@ -410,5 +468,25 @@ class TestLuopanOrientationIntegration:
         assert '收银' in tips_text or '入口' in tips_text or '财运' in tips_text
 
 
-if __name__ == '__main__':
+    def test_execute_batch_matches_single_calls(self):
+        """测试批量分析与逐条调用结果一致，且相同坐山只计算一次"""
+        tool = LuopanOrientationTool()
+        timestamp = "2026-03-01T10:00:00+08:00"
+        items = [
+            {"sitting_direction": "坐北朝南", "building_type": "住宅"},
+            {"sitting_direction": "坐0度", "building_type": "住宅"},
+            {"sitting_direction": "坐亥向巳", "building_type": "商铺", "owner_birth": "1990-05-15"},
+            {"sitting_direction": "无效格式", "building_type": "住宅"},
+        ]
+
+        records = list(tool.execute_batch(items, timestamp=timestamp))
+        assert [r["index"] for r in records] == [0, 1, 2, 3]
+        assert "坐向解析失败" in records[3]["error"]
+        # 坐北朝南与坐0度同属壬山，结果主体只计算一次
+        assert tool.cache_info()["misses"] == 2
+
+        for item, record in zip(items[:3], records):
+            single = tool.execute(timestamp=timestamp, **item)
+            assert record["result"] == single
+
     pytest.main([__file__, '-v'])
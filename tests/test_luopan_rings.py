@@ -0,0 +1,92 @@
+"""
+测试罗盘多层查询引擎
+"""
+
+import random
+
+import pytest
+
+from cyberYJ.core.luopan_rings import LuopanRingEngine, _scan
+from cyberYJ.utils.data_loader import DataLoader
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return LuopanRingEngine(data_loader=DataLoader())
+
+
+def _covers_circle_once(segments):
+    total = 0.0
+    for segment in segments:
+        total += (segment['end_deg'] - segment['start_deg']) % 360
+    return total
+
+
+def test_ring_data_sizes_and_coverage():
+    rings = {ring['id']: ring['segments'] for ring in DataLoader().get_luopan_rings()['rings']}
+    assert {ring_id: len(segments) for ring_id, segments in rings.items()} == {
+        'dragons_72': 72,
+        'fen_jin_120': 120,
+        'yao_384': 384,
+    }
+    for segments in rings.values():
+        assert _covers_circle_once(segments) == pytest.approx(360)
+
+    # 六十四卦各六爻
+    hexagram_ids = {segment['hexagram_id'] for segment in rings['yao_384']}
+    assert len(hexagram_ids) == 64
+    # 七十二龙：六十甲子各一次，另有十二个“正”位
+    dragon_names = [segment['name'] for segment in rings['dragons_72']]
+    assert len({name for name in dragon_names if not name.startswith('正')}) == 60
+    # 分金落在所属坐山之内
+    mountains = {m['name']: m for m in DataLoader().get_luopan()}
+    for segment in rings['fen_jin_120'] + rings['dragons_72']:
+        middle = (segment['start_deg'] + ((segment['end_deg'] - segment['start_deg']) % 360) / 2) % 360
+        assert _scan([mountains[segment['mountain']]], middle) == 0
+
+
+def test_grid_matches_scan_everywhere(engine):
+    assert engine.step * 16 == 1
+    assert engine.grid_cells == 5760
+
+    rng = random.Random(7)
+    degrees = [cell / 16 for cell in range(5760)] + [rng.uniform(0, 360) for _ in range(5000)]
+    for degree in degrees:
+        expected = {
+            ring['id']: _scan(ring['segments'], degree) for ring in engine.rings
+        }
+        result = engine.lookup(degree)
+        for ring in engine.rings:
+            index = expected[ring['id']]
+            assert result[ring['id']] is (ring['segments'][index] if index is not None else None)
+
+
+def test_lookup_wraps_and_single_ring(engine):
+    assert engine.lookup(-0.5) == engine.lookup(359.5)
+    assert engine.lookup(360) == engine.lookup(0)
+    assert engine.lookup_ring('yao_384', 0.5)['name'] == '复·初九'
+    assert engine.lookup_ring('yao_384', 359.5)['name'] == '坤·上六'
+    with pytest.raises(KeyError):
+        engine.lookup_ring('missing', 0)
+
+
+def test_custom_rings_and_scan_fallback():
+    rings = [
+        {"id": "halves", "name": "两仪", "segments": [
+            {"name": "阳", "start_deg": 0, "end_deg": 180},
+            {"name": "阴", "start_deg": 180, "end_deg": 0},
+        ]},
+        {"id": "odd", "name": "不可公约", "segments": [
+            {"name": "甲", "start_deg": 0, "end_deg": 1 / 3 + 1e-9},
+            {"name": "乙", "start_deg": 1 / 3 + 1e-9, "end_deg": 0},
+        ]},
+    ]
+    grid = LuopanRingEngine(rings=rings[:1])
+    assert grid.grid_cells == 2
+    assert grid.lookup(180)['halves']['name'] == '阳'
+    assert grid.lookup(270)['halves']['name'] == '阴'
+
+    fallback = LuopanRingEngine(rings=rings)
+    assert fallback.grid_cells == 0
+    assert fallback.lookup(0.2)['odd']['name'] == '甲'
+    assert fallback.lookup(0.5)['odd']['name'] == '乙'
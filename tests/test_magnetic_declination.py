@@ -0,0 +1,61 @@
+"""
+测试离线磁偏角模型
+"""
+
+from datetime import date
+
+import pytest
+
+from cyberYJ.core.magnetic_declination import MagneticDeclinationModel, decimal_year
+
+
+SURVEY_DATE = date(2026, 7, 1)
+
+
+@pytest.fixture(scope="module")
+def model():
+    return MagneticDeclinationModel()
+
+
+def test_decimal_year():
+    assert decimal_year(date(2026, 1, 1)) == 2026.0
+    assert decimal_year(date(2024, 7, 2)) == pytest.approx(2024.5)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, expected",
+    [
+        (39.9, 116.4, -7.6),    # 北京，西偏
+        (31.23, 121.47, -6.6),  # 上海
+        (-33.87, 151.2, 12.8),  # 悉尼，东偏
+        (40.0, -105.25, 7.6),   # 博尔德
+    ],
+)
+def test_declination_known_locations(model, latitude, longitude, expected):
+    assert model.compute(latitude, longitude, SURVEY_DATE) == pytest.approx(expected, abs=0.5)
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude",
+    [(39.9, 116.4), (22.3, 114.17), (-63.0, 134.0), (85.0, -120.0), (0.0, 179.9), (10.5, -179.9)],
+)
+def test_grid_interpolation_matches_direct_evaluation(model, latitude, longitude):
+    assert model.declination(latitude, longitude, SURVEY_DATE) == pytest.approx(
+        model.compute(latitude, longitude, SURVEY_DATE), abs=0.05
+    )
+
+
+def test_nearby_lookups_reuse_grid_corners():
+    model = MagneticDeclinationModel()
+    model.declination(39.2, 116.2, SURVEY_DATE)
+    misses = model.cache_info().misses
+    for offset in (0.01, 0.3, 0.6):
+        model.declination(39.2 + offset, 116.2 + offset, SURVEY_DATE)
+    assert model.cache_info().misses == misses
+
+
+def test_declination_rejects_out_of_range(model):
+    with pytest.raises(ValueError, match="纬度"):
+        model.declination(91, 0, SURVEY_DATE)
+    with pytest.raises(ValueError, match="WMM"):
+        model.declination(39.9, 116.4, date(2019, 1, 1))
@@ -7,7 +7,12 @@ import pytest
 
 pytest.importorskip("mcp")
 
-from cyberYJ.server import _format_fengshui_result, _format_luopan_result, _format_solar_terms_result
+from cyberYJ.server import (
+    _format_fengshui_result,
+    _format_luopan_batch_result,
+    _format_luopan_result,
+    _format_solar_terms_result,
+)
 
 
 class TestMCPServerFormatting:
@@ -66,6 +71,20 @@ class TestMCPServerFormatting:
         assert "trace" in payload["data"]
         assert "sources" in payload["data"]
 
+    def test_format_luopan_batch_result(self):
+        """测试格式化批量罗盘结果（NDJSON）"""
+        records = [
+            {"index": 0, "result": {"house_gua": "坎宅", "trace": ["步骤1"], "sources": []}},
+            {"index": 1, "error": "坐向解析失败: 无法解析的坐向格式: 无效格式"},
+        ]
+
+        output = _format_luopan_batch_result(records)
+        lines = [json.loads(line) for line in output.splitlines()]
+        assert [line["index"] for line in lines] == [0, 1]
+        assert lines[0]["data"]["house_gua"] == "坎宅"
+        assert lines[1]["meta"]["success"] is False
+        assert lines[1]["meta"]["error"]["type"] == "ValueError"
+
     def test_format_fengshui_with_changing_hexagram(self):
         """测试带变卦的格式化"""
         test_result = {
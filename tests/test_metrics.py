@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from cyberYJ.api.metrics import MetricsRegistry
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_counter_and_gauge_are_summed_across_threads():
+    metrics = MetricsRegistry()
+    requests = metrics.counter("requests_total", "Requests.", ("route",))
+    in_flight = metrics.gauge("in_flight", "In flight.")
+
+    def work() -> None:
+        for _ in range(1000):
+            requests.inc("/a")
+            in_flight.inc()
+        requests.inc("/b", amount=2)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    in_flight.dec(amount=3000)
+
+    samples = _samples(metrics.render())
+    assert samples['requests_total{route="/a"}'] == 4000
+    assert samples['requests_total{route="/b"}'] == 8
+    assert samples["in_flight"] == 1000
+
+
+def test_histogram_renders_cumulative_buckets():
+    metrics = MetricsRegistry()
+    latency = metrics.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/a")
+
+    text = metrics.render()
+    assert "# TYPE latency_seconds histogram" in text
+    samples = _samples(text)
+    assert samples['latency_seconds_bucket{route="/a",le="0.1"}'] == 2
+    assert samples['latency_seconds_bucket{route="/a",le="1"}'] == 3
+    assert samples['latency_seconds_bucket{route="/a",le="+Inf"}'] == 4
+    assert samples['latency_seconds_count{route="/a"}'] == 4
+    assert samples['latency_seconds_sum{route="/a"}'] == pytest.approx(3.65)
+
+
+def test_collectors_and_label_escaping():
+    metrics = MetricsRegistry()
+    counts = {'a"b\\c': 3}
+    metrics.collector(
+        "errors_total", "Errors.", "counter", lambda: [((code,), n) for code, n in counts.items()], ("code",)
+    )
+    counts['a"b\\c'] = 5
+    assert 'errors_total{code="a\\"b\\\\c"} 5' in metrics.render()
+
+    with pytest.raises(ValueError):
+        metrics.counter("errors_total", "Duplicate.")
+    with pytest.raises(ValueError):
+        metrics.collector("x", "X.", "histogram", lambda: [])
@@ -0,0 +1,59 @@
+"""
+测试命卦名册向量化计算
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from cyberYJ.core.luopan_calculator import LuopanCalculator
+from cyberYJ.core.ming_gua_roster import analyze_roster
+
+
+def test_roster_matches_scalar_calculation():
+    calculator = LuopanCalculator()
+    births = [date(year, 6, 1) for year in range(1900, 2100)]
+    for gender in ("male", "female"):
+        fit = analyze_roster(births, gender)
+        members = fit.members()
+        for index, birth in enumerate(births):
+            expected = calculator.calculate_ming_gua(datetime(birth.year, 6, 1), gender)
+            assert members[index] == expected
+            for h_index, house_gua in enumerate(fit.house_guas):
+                compatibility = calculator.check_house_compatibility(house_gua, expected)
+                assert bool(fit.compatibility[index, h_index]) == compatibility["compatible"]
+
+
+def test_roster_accepts_strings_and_years():
+    by_string = analyze_roster(["1990-05-15", "1985-01-01"], ["male", "female"])
+    by_year = analyze_roster([1990, 1985], ["male", "female"])
+    assert by_string.ming_numbers.tolist() == by_year.ming_numbers.tolist() == [1, 9]
+    assert [m["ming_gua"] for m in by_string.members()] == ["坎", "离"]
+
+
+def test_roster_house_scores_weighted():
+    # 坎命（东四）户主加权，兑命（西四）成员
+    fit = analyze_roster([1990, 1993], ["male", "male"], house_guas=["坎宅", "兑宅"], weights=[3, 1])
+    scores = fit.house_scores()
+    assert [s["house_gua"] for s in scores] == ["坎宅", "兑宅"]
+    assert scores[0]["fit_score"] == 0.75
+    assert scores[0]["compatible_count"] == 1
+    assert scores[0]["exact_count"] == 1
+    assert scores[1]["fit_score"] == 0.25
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"birth_dates": ["1990-13-01"]},
+        {"birth_dates": [1990, 1991], "genders": ["male"]},
+        {"birth_dates": [1990], "genders": ["unknown"]},
+        {"birth_dates": [1990], "house_guas": ["中宅"]},
+        {"birth_dates": []},
+    ],
+)
+def test_roster_invalid_input(kwargs):
+    with pytest.raises(ValueError):
+        analyze_roster(**kwargs)
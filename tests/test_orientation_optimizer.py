@@ -0,0 +1,61 @@
+"""
+测试最佳坐向搜索
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from cyberYJ.core.orientation_optimizer import OrientationOptimizer
+from cyberYJ.tools.luopan_orientation import LuopanOrientationTool
+
+
+@pytest.fixture(scope="module")
+def optimizer():
+    return OrientationOptimizer()
+
+
+def test_sweep_collapses_to_24_mountains(optimizer):
+    result = optimizer.optimize(2026, resolution=0.5)
+    rankings = result["rankings"]
+    assert len(rankings) == 24
+    assert len({r["sitting_mountain"] for r in rankings}) == 24
+    assert sum(r["sweep_points"] for r in rankings) == 720
+    assert [r["rank"] for r in rankings] == list(range(1, 25))
+    scores = [r["score"] for r in rankings]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_rankings_match_luopan_tool(optimizer):
+    tool = LuopanOrientationTool()
+    result = optimizer.optimize(2026, building_type="住宅", owner_birth="1990-05-01")
+
+    for item in result["rankings"][:3]:
+        expected = tool.execute(
+            sitting_direction=f"坐{item['sitting_degree']}度",
+            building_type="住宅",
+            owner_birth="1990-05-01",
+            timestamp="2026-06-01T12:00:00+08:00",
+        )
+        assert expected["house_gua"] == item["house_gua"]
+        assert expected["current_auspicious_positions"] == item["current_auspicious_positions"]
+        assert expected["current_inauspicious_positions"] == item["current_inauspicious_positions"]
+        assert ("不相配" not in expected["ming_gua_match"]) == item["compatible"]
+
+
+def test_building_type_weights_and_ba_zhai(optimizer):
+    home = {r["sitting_mountain"]: r for r in optimizer.optimize(2026, "住宅")["rankings"]}
+    shop = {r["sitting_mountain"]: r for r in optimizer.optimize(2026, "商铺")["rankings"]}
+    assert any(home[m]["flying_star_score"] != shop[m]["flying_star_score"] for m in home)
+    assert all(r["compatible"] is None and r["ba_zhai_score"] == 0 for r in home.values())
+
+    with_owner = optimizer.optimize(2026, "住宅", owner_birth="1990-05-01", top_n=5)
+    assert len(with_owner["rankings"]) == 5
+    assert with_owner["ming_gua"]["group"] == "东四命"
+    assert all(r["compatible"] is True for r in with_owner["rankings"])
+
+
+@pytest.mark.parametrize("kwargs", [{"resolution": 0}, {"resolution": 30}, {"owner_birth": "1990/05/01"}])
+def test_invalid_arguments(optimizer, kwargs):
+    with pytest.raises(ValueError):
+        optimizer.optimize(2026, **kwargs)
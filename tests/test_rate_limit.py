@@ -0,0 +1,161 @@
+import multiprocessing
+import sys
+import threading
+
+import pytest
+
+from cyberYJ.api.rate_limit import (
+    RedisRateLimiter,
+    SharedMemoryRateLimiter,
+    TokenBucketRateLimiter,
+    create_rate_limiter,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_limits_and_refills():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(max_requests=2, window_seconds=60, clock=clock)
+
+    assert limiter.allow("a") == (True, 1, 30)
+    assert limiter.allow("a") == (True, 0, 60)
+    allowed, remaining, retry_in = limiter.allow("a")
+    assert (allowed, remaining, retry_in) == (False, 0, 30)
+    assert limiter.allow("b")[0]
+
+    clock.now = 30.0
+    assert limiter.allow("a")[0]
+    assert not limiter.allow("a")[0]
+
+
+def test_idle_clients_are_evicted_after_a_window():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(max_requests=5, window_seconds=10, shards=1, clock=clock)
+    for index in range(100):
+        limiter.allow(f"client-{index}")
+    assert len(limiter) == 100
+
+    clock.now = 11.0
+    limiter.allow("client-new")
+    assert len(limiter) == 1
+
+
+def test_concurrent_clients_share_limit_correctly():
+    limiter = TokenBucketRateLimiter(max_requests=50, window_seconds=3600)
+    results = []
+
+    def worker() -> None:
+        results.extend(limiter.allow("shared")[0] for _ in range(20))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(results) == 50
+
+
+def _retained_bytes(limiter: TokenBucketRateLimiter) -> int:
+    total = 0
+    for shard in limiter._shards:
+        total += sys.getsizeof(shard.buckets)
+        for key, entry in shard.buckets.items():
+            total += sys.getsizeof(key) + sys.getsizeof(entry) + sum(sys.getsizeof(v) for v in entry)
+    return total
+
+
+def test_memory_stays_bounded_with_a_million_clients():
+    # 时钟不前进：没有客户端闲置满一个窗口，只能靠 LRU 上限回收
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(
+        max_requests=60, window_seconds=60, max_clients=10_000, clock=clock
+    )
+    allow = limiter.allow
+    for index in range(1_000_000):
+        allow(f"wx-key:10.{index >> 16}.{(index >> 8) & 255}.{index & 255}")
+
+    assert len(limiter) <= 10_000
+    assert _retained_bytes(limiter) < 4 * 1024 * 1024
+    # 最近的客户端仍保留已消耗的令牌
+    assert limiter.allow("wx-key:10.15.66.63")[1] == 58
+
+
+def test_rejects_invalid_config():
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(max_requests=0, window_seconds=60)
+    with pytest.raises(ValueError):
+        TokenBucketRateLimiter(max_requests=1, window_seconds=60, max_clients=0)
+
+
+def _shared_worker(path: str, attempts: int, results) -> None:
+    limiter = SharedMemoryRateLimiter(max_requests=50, window_seconds=3600, max_clients=1000, path=path)
+    shared = sum(limiter.allow("shared")[0] for _ in range(attempts))
+    own = sum(limiter.allow(f"own-{multiprocessing.current_process().pid}")[0] for _ in range(60))
+    results.put((shared, own))
+
+
+def test_shared_memory_limit_holds_across_processes(tmp_path):
+    path = str(tmp_path / "ratelimit.bin")
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_shared_worker, args=(path, 100, results)) for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    counts = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    assert sum(shared for shared, _ in counts) == 50
+    assert all(own == 50 for _, own in counts)
+
+
+def test_shared_memory_reuses_idle_slots(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "ratelimit.bin")
+    limiter = SharedMemoryRateLimiter(max_requests=1, window_seconds=10, max_clients=512, path=path, clock=clock)
+    for index in range(5000):
+        limiter.allow(f"client-{index}")
+    # 表已写满：最近的客户端仍在表内，被淘汰的是窗口中最久未访问的
+    assert not limiter.allow("client-4999")[0]
+
+    clock.now = 11.0
+    assert limiter.allow("client-4999")[0]
+    other = SharedMemoryRateLimiter(max_requests=1, window_seconds=10, max_clients=512, path=path, clock=clock)
+    assert not other.allow("client-4999")[0]
+    limiter.close()
+    other.close()
+
+    with pytest.raises(ValueError, match="different settings"):
+        SharedMemoryRateLimiter(max_requests=2, window_seconds=10, max_clients=512, path=path)
+
+
+def test_redis_backend_with_local_stand_in():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeRedis()
+    limiter = RedisRateLimiter(client, max_requests=2, window_seconds=60)
+    other_worker = RedisRateLimiter(client, max_requests=2, window_seconds=60)
+
+    assert limiter.allow("a") == (True, 1, 30)
+    assert other_worker.allow("a") == (True, 0, 60)
+    assert limiter.allow("a")[:2] == (False, 0)
+    assert client.ttl("cyberyj:ratelimit:a") == 60
+
+
+def test_create_rate_limiter_backends(tmp_path):
+    assert isinstance(create_rate_limiter("memory", 5, 60), TokenBucketRateLimiter)
+    shared = create_rate_limiter("shared", 5, 60, max_clients=100, shared_path=str(tmp_path / "rl.bin"))
+    assert isinstance(shared, SharedMemoryRateLimiter)
+    shared.close()
+    with pytest.raises(ValueError):
+        create_rate_limiter("redis", 5, 60)
+    with pytest.raises(ValueError):
+        create_rate_limiter("memcached", 5, 60)
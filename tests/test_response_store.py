@@ -0,0 +1,134 @@
+from datetime import datetime
+
+import pytest
+
+from cyberYJ.api.divination_service import DivinationService
+from cyberYJ.api.json_codec import dumps
+from cyberYJ.api.learning_output import sanitize_text, to_learning_response
+from cyberYJ.api.response_store import (
+    EncodedResponseCache,
+    InterpretResponseStore,
+    SCENE_KEYS,
+    SlotRenderer,
+    all_combinations,
+    resource_etag,
+)
+from cyberYJ.core.time_context import TimeContext, resolve_timezone
+
+
+TZ = "Asia/Shanghai"
+COINS = (6, 7, 8, 9, 7, 7)
+
+
+def _context(value: str) -> TimeContext:
+    local = datetime.fromisoformat(value).astimezone(resolve_timezone(TZ))
+    return TimeContext.from_datetime(local, TZ, explicit=False)
+
+
+@pytest.fixture(scope="module")
+def service():
+    return DivinationService()
+
+
+@pytest.fixture()
+def store(service):
+    store = InterpretResponseStore(service)
+    store.build(
+        time_context=_context("2026-10-19T09:00:00+08:00"),
+        combinations=[(COINS, scene) for scene in SCENE_KEYS] + [((7, 7, 7, 7, 7, 7), None)],
+    )
+    return store
+
+
+def test_all_combinations_cover_coins_and_scenes():
+    keys = list(all_combinations())
+    assert len(keys) == 4096 * 10
+    assert len(set(keys)) == len(keys)
+
+
+@pytest.mark.parametrize("scene_type", ["career", "love", None])
+def test_lookup_matches_live_response_bytes(service, store, scene_type):
+    later = _context("2026-10-20T18:30:05+08:00")
+    body = store.lookup(list(COINS), None, scene_type, now=later.epoch)
+    assert body == dumps(service.interpret(list(COINS), None, scene_type, time_context=later))
+
+
+def test_lookup_ignores_question_only_when_scene_given(service, store):
+    now = _context("2026-10-20T18:30:05+08:00").epoch
+    assert store.lookup(list(COINS), "最近工作顺利吗", "career", now=now) is not None
+    assert store.lookup(list(COINS), "最近工作顺利吗", None, now=now) is None
+    assert store.lookup([9, 9, 9, 9, 9, 9], None, "career", now=now) is None
+    assert store.stats()["hits"] == 1
+
+
+def test_lookup_misses_and_rebuilds_after_term_boundary(store, monkeypatch):
+    refreshes = []
+    monkeypatch.setattr(store, "refresh_in_background", lambda: refreshes.append(True))
+    assert store.snapshot.term == "霜降"
+    next_term = datetime(2026, 11, 20, 12, 0, tzinfo=resolve_timezone("UTC")).timestamp()
+    assert store.lookup(list(COINS), None, "career", now=next_term) is None
+    assert refreshes == [True]
+
+
+def test_encoded_cache_replays_learning_response(service):
+    cache = EncodedResponseCache(8, SlotRenderer(text_filter=sanitize_text))
+    key = cache.key(COINS, "我会不会升职", None)
+    first = _context("2026-10-19T09:00:00+08:00")
+    body = cache.put(
+        key,
+        to_learning_response(service.interpret(list(COINS), "我会不会升职", None, time_context=first)),
+        now=first.epoch,
+    )
+    assert body == dumps(
+        to_learning_response(service.interpret(list(COINS), "我会不会升职", None, time_context=first))
+    )
+
+    later = _context("2026-10-21T07:45:00+08:00")
+    assert cache.get(key, now=later.epoch) == dumps(
+        to_learning_response(service.interpret(list(COINS), "我会不会升职", None, time_context=later))
+    )
+    assert cache.get(cache.key(COINS, "别的问题", None), now=later.epoch) is None
+    assert cache.stats() == {"size": 1, "maxsize": 8, "hits": 1, "misses": 1}
+
+
+def test_encoded_cache_key_and_eviction():
+    cache = EncodedResponseCache(2)
+    assert cache.key(COINS, "问题", "career") == cache.key(COINS, None, "career")
+    assert cache.key(COINS, "", None) == cache.key(COINS, None, None)
+    assert cache.key(COINS, "问题", None) != cache.key(COINS, None, None)
+
+    for index in range(3):
+        cache.put(("k", index), {"trace": [], "value": index})
+    assert cache.get(("k", 0)) is None
+    assert cache.get(("k", 2)) == b'{"trace":[],"value":2}'
+    assert cache.stats()["size"] == 2
+
+
+@pytest.mark.parametrize(
+    "moment",
+    ["2026-10-19T09:00:00+08:00", "2026-11-07T00:30:00+08:00", "2027-01-03T18:00:00+08:00"],
+)
+def test_slot_lifetime_bounds_next_change_of_term_text(moment):
+    renderer = SlotRenderer()
+    start = _context(moment).epoch
+    term, slots = renderer.render(start)
+    lifetime = renderer.valid_for(start)
+    assert 0 < lifetime <= 2 * 86400
+
+    later_term, later_slots = renderer.render(start + lifetime)
+    assert later_term == term
+    assert later_slots[2] == slots[2]
+    assert resource_etag("snap", ("k",), term, later_slots) == resource_etag("snap", ("k",), term, slots)
+    # 估算偏保守但不会过短：再过两天倒计天数必然变化
+    assert renderer.render(start + 2 * 86400)[1][2] != slots[2]
+
+
+def test_resource_etag_is_weak_and_varies_with_inputs():
+    slots = (b'"t1"', b'"s1"', b'"a1"')
+    etag = resource_etag("snap", ("k",), "霜降", slots)
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert resource_etag("snap", ("k",), "霜降", (b'"t2"', b'"s2"', b'"a1"')) == etag
+    assert resource_etag("other", ("k",), "霜降", slots) != etag
+    assert resource_etag("snap", ("k2",), "霜降", slots) != etag
+    assert resource_etag("snap", ("k",), "立冬", slots) != etag
+    assert resource_etag("snap", ("k",), "霜降", slots[:2] + (b'"a2"',)) != etag
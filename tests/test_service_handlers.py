@@ -46,6 +46,73 @@ def test_luopan_orientation_missing_required():
         assert "sitting_direction" in str(exc)
 
 
+def test_luopan_orientation_magnetic_correction():
+    handler = CompassHandler()
+    result = handler.execute(
+        {
+            "sitting_direction": "坐340向160",
+            "building_type": "住宅",
+            "latitude": 39.9,
+            "longitude": 116.4,
+            "timestamp": "2026-02-10T00:00:00+08:00",
+        }
+    )
+    assert result["magnetic_declination"] < 0
+    assert any(line.startswith("磁偏角修正") for line in result["trace"])
+
+    # 流年分析时间不作为测量日期，超出地磁模型有效期也不影响解析
+    result = handler.execute(
+        {
+            "sitting_direction": "坐北朝南",
+            "building_type": "住宅",
+            "latitude": 39.9,
+            "longitude": 116.4,
+            "timestamp": "2031-03-01T00:00:00+08:00",
+        }
+    )
+    assert "magnetic_declination" not in result
+
+    try:
+        handler.execute({"sitting_direction": "坐340度", "building_type": "住宅", "latitude": 39.9})
+        assert False, "expected ValueError"
+    except ValueError as exc:
+        assert "longitude" in str(exc)
+
+
+def test_luopan_orientation_batch_item_errors():
+    handler = CompassHandler()
+    records = list(
+        handler.execute_batch(
+            {
+                "items": [
+                    {"sitting_direction": "坐北朝南", "building_type": "住宅"},
+                    {"sitting_direction": "坐北朝南", "building_type": "别墅"},
+                    {"building_type": "住宅"},
+                    {"sitting_direction": "坐亥向巳", "building_type": "办公室"},
+                ],
+                "timestamp": "2026-02-10T00:00:00+08:00",
+            }
+        )
+    )
+
+    assert [r["index"] for r in records] == [0, 1, 2, 3]
+    assert records[0]["result"]["house_gua"]
+    assert "building_type" in records[1]["error"]
+    assert "sitting_direction" in records[2]["error"]
+    assert records[3]["result"]["house_gua"]
+
+
+def test_luopan_orientation_batch_limits():
+    handler = CompassHandler()
+    item = {"sitting_direction": "坐北朝南", "building_type": "住宅"}
+    for arguments in ({"items": []}, {"items": [item] * 3}):
+        try:
+            handler.execute_batch(arguments, max_items=2)
+            assert False, "expected ValueError"
+        except ValueError as exc:
+            assert "items" in str(exc)
+
+
 def test_solar_terms_invalid_timezone():
     handler = SolarTermsHandler()
     try:
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from cyberYJ.api.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight(copy_result=True)
+    release = threading.Event()
+    calls = []
+
+    def compute(value: int) -> dict:
+        calls.append(value)
+        release.wait(5)
+        return {"value": value}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.run("key", compute, 1)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [{"value": 1}] * 5
+    # 等待方拿到各自的拷贝
+    assert len({id(result) for result in results}) == 5
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 4}
+
+
+def test_failure_is_shared_and_not_cached():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail() -> None:
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call() -> None:
+        try:
+            flight.run("key", fail)
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert errors == ["boom"] * 3
+    assert flight.run("key", lambda: "ok") == "ok"
+
+
+def test_async_callers_share_one_task_and_survive_leader_cancellation():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute(value: int) -> bytes:
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return b"result"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.run_async("key", compute, 1))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.run_async("key", compute, 1)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(scenario()) == [b"result"] * 3
+    assert calls == [1]
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 3}
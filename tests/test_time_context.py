@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+from cyberYJ.core.time_context import TimeContext, resolve_timezone
+from cyberYJ.server.handlers.compass import CompassHandler
+from cyberYJ.server.validation import build_time_context
+
+
+def test_resolve_timezone_is_cached():
+    assert resolve_timezone("Asia/Shanghai") is resolve_timezone("Asia/Shanghai")
+
+
+def test_parse_rfc3339_offset_and_utc():
+    ctx = TimeContext.parse("2026-02-10T08:00:00+08:00", "Asia/Shanghai")
+    assert ctx.explicit is True
+    assert ctx.utc == datetime(2026, 2, 10, 0, 0, tzinfo=pytz.UTC)
+    assert ctx.epoch == ctx.utc.timestamp()
+    assert ctx.local.utcoffset().total_seconds() == 8 * 3600
+
+    zulu = TimeContext.parse("2026-02-10T00:00:00Z", "Asia/Shanghai")
+    assert zulu.utc == ctx.utc
+
+
+def test_naive_timestamp_localized_to_timezone():
+    ctx = TimeContext.parse("2026-02-10T08:00:00", "Asia/Tokyo")
+    assert ctx.utc == datetime(2026, 2, 9, 23, 0, tzinfo=pytz.UTC)
+
+
+def test_now_is_not_explicit():
+    ctx = TimeContext.now("Asia/Shanghai")
+    assert ctx.explicit is False
+    assert ctx.local.tzinfo is not None
+
+
+def test_build_time_context_rejects_invalid_timestamp():
+    with pytest.raises(ValueError, match="RFC3339"):
+        build_time_context("not-a-time", "Asia/Shanghai")
+
+
+def test_handler_passes_single_time_context_to_tool():
+    captured = {}
+
+    class _Tool:
+        def execute(self, **kwargs):
+            captured.update(kwargs)
+            return {}
+
+    handler = CompassHandler(tool=_Tool())
+    handler.execute(
+        {
+            "sitting_direction": "坐北朝南",
+            "building_type": "住宅",
+            "timestamp": "2026-02-10T00:00:00+08:00",
+        }
+    )
+
+    ctx = captured["time_context"]
+    assert isinstance(ctx, TimeContext)
+    assert ctx.utc == datetime(2026, 2, 9, 16, 0, tzinfo=pytz.UTC)
+    assert "timestamp" not in captured
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+
+from cyberYJ.api.worker_pool import BlockingWorkerPool, WorkerPoolBusy
+
+
+def test_worker_pool_runs_blocking_call_off_event_loop():
+    pool = BlockingWorkerPool(max_workers=2, max_queue=0)
+    loop_thread = threading.get_ident()
+
+    async def main():
+        return await asyncio.gather(*(pool.run(threading.get_ident) for _ in range(2)))
+
+    try:
+        worker_threads = asyncio.run(main())
+    finally:
+        pool.shutdown()
+    assert loop_thread not in worker_threads
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_worker_pool_rejects_beyond_queue_limit():
+    pool = BlockingWorkerPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(WorkerPoolBusy):
+            await pool.run(release.wait)
+        release.set()
+        return await asyncio.gather(*blocked)
+
+    try:
+        assert asyncio.run(main()) == [True, True]
+    finally:
+        pool.shutdown()
+    assert pool.stats()["rejected"] == 1
+
+
+def test_worker_pool_rejects_invalid_config():
+    with pytest.raises(ValueError):
+        BlockingWorkerPool(max_workers=0, max_queue=1)
+    with pytest.raises(ValueError):
+        BlockingWorkerPool(max_workers=1, max_queue=1, kind="fiber")